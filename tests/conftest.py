@@ -19,6 +19,7 @@ import email_validator
 import pretend
 import pyramid.testing
 import pytest
+import redis
 import stripe
 import transaction
 import webtest as _webtest
@@ -48,7 +49,11 @@ from warehouse.admin.flags import AdminFlag, AdminFlagValue
 from warehouse.attestations import services as attestations_services
 from warehouse.attestations.interfaces import IIntegrityService
 from warehouse.cache import services as cache_services
-from warehouse.cache.interfaces import IQueryResultsCache
+from warehouse.cache.interfaces import (
+    IDocumentCache,
+    IQueryResultsCache,
+    IVerdictCache,
+)
 from warehouse.email import services as email_services
 from warehouse.email.interfaces import IEmailSender
 from warehouse.helpdesk import services as helpdesk_services
@@ -69,6 +74,7 @@ from warehouse.search import services as search_services
 from warehouse.search.interfaces import ISearchService
 from warehouse.subscriptions import services as subscription_services
 from warehouse.subscriptions.interfaces import IBillingService, ISubscriptionService
+from warehouse.utils import readme
 
 from .common.constants import REMOTE_ADDR, REMOTE_ADDR_HASHED
 from .common.db import Session
@@ -128,6 +134,14 @@ def guard_mock_sentinels():
     )
 
 
+@pytest.fixture(autouse=True)
+def clear_readme_render_cache():
+    # Rendered descriptions are memoized per process, which would otherwise leak
+    # cache hits (and their metrics) from one test into the next.
+    yield
+    readme._render_cache.clear()
+
+
 @pytest.fixture
 def metrics():
     """Real ``NullMetrics`` with each method wrapped to record calls.
@@ -217,6 +231,8 @@ def pyramid_services(
     helpdesk_service,
     notification_service,
     query_results_cache_service,
+    document_cache_service,
+    verdict_cache_service,
     search_service,
     domain_status_service,
     ratelimit_service,
@@ -245,6 +261,8 @@ def pyramid_services(
     services.register_service(helpdesk_service, IHelpDeskService, None)
     services.register_service(notification_service, IAdminNotificationService)
     services.register_service(query_results_cache_service, IQueryResultsCache)
+    services.register_service(document_cache_service, IDocumentCache)
+    services.register_service(verdict_cache_service, IVerdictCache)
     services.register_service(search_service, ISearchService)
     services.register_service(domain_status_service, IDomainStatusService)
     services.register_service(ratelimit_service, IRateLimiter, name="email.add")
@@ -606,6 +624,21 @@ def query_results_cache_service(mockredis):
     return cache_services.RedisQueryResults(redis_client=mockredis)
 
 
+@pytest.fixture
+def verdict_cache_service(mockredis):
+    return cache_services.RedisVerdictCache(redis_client=mockredis)
+
+
+@pytest.fixture
+def document_cache_service(mockredis):
+    return cache_services.RedisDocumentCache(redis_client=mockredis)
+
+
+@pytest.fixture
+def acl_cache_service(mockredis):
+    return cache_services.RedisACLCache(redis_client=mockredis)
+
+
 @pytest.fixture
 def search_service():
     return search_services.NullSearchService()
@@ -625,6 +658,7 @@ def ratelimit_service(mocker):
     mocker.spy(service, "hit")
     mocker.spy(service, "clear")
     mocker.spy(service, "resets_in")
+    mocker.spy(service, "hit_and_stats")
     return service
 
 
@@ -854,16 +888,41 @@ class _MockRedis:
         except KeyError:
             return None
 
+    def hgetall(self, hash_):
+        return dict(self.cache.get(hash_, {}))
+
     def hset(self, hash_, key, value, *_args, **_kwargs):
-        if hash_ not in self.cache:  # pragma: no cover
+        if hash_ not in self.cache:
             self.cache[hash_] = {}
         self.cache[hash_][key] = value
 
     def get(self, key):
         return self.cache.get(key)
 
+    def incr(self, key):
+        self.cache[key] = int(self.cache.get(key, 0)) + 1
+        return self.cache[key]
+
+    def mget(self, keys):
+        return [self.cache.get(key) for key in keys]
+
     def pipeline(self):
-        return self
+        return _MockRedisPipeline(self)
+
+    def sadd(self, key, *values):
+        self.cache.setdefault(key, set()).update(values)
+
+    def smembers(self, key):
+        return self.cache.get(key, set())
+
+    def spop(self, key, count=None):
+        members = self.cache.get(key, set())
+        return [members.pop() for _ in range(min(count or 1, len(members)))]
+
+    def rename(self, src, dst):
+        if src not in self.cache:
+            raise redis.exceptions.ResponseError("no such key")
+        self.cache[dst] = self.cache.pop(src)
 
     def register_script(self, script):
         return script  # pragma: no cover
@@ -888,6 +947,40 @@ class _MockRedis:
     def setex(self, key, value, _seconds):
         self.cache[key] = value
 
+    def unlink(self, *keys):
+        for key in keys:
+            self.cache.pop(key, None)
+
+
+class _MockRedisPipeline:
+    """
+    Queues commands against a _MockRedis until the pipeline is executed, and
+    returns their results from `execute`, as a real Redis pipeline does.
+    """
+
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._commands = []
+
+    def __getattr__(self, name):
+        method = getattr(self._redis, name)
+
+        def queue(*args, **kwargs):
+            self._commands.append(lambda: method(*args, **kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        commands, self._commands = self._commands, []
+        return [command() for command in commands]
+
 
 @pytest.fixture
 def mockredis():
@@ -1,12 +1,14 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import datetime
+import hashlib
 import uuid
 
 import freezegun
 import passlib.exc
 import pretend
 import pytest
+import redis
 import requests
 
 from webauthn.helpers import bytes_to_base64url
@@ -39,7 +41,7 @@ from warehouse.accounts.models import (
 )
 from warehouse.events.tags import EventTag
 from warehouse.metrics import IMetricsService, NullMetrics
-from warehouse.rate_limiting.interfaces import IRateLimiter
+from warehouse.rate_limiting.interfaces import IRateLimiter, RateLimitResult
 from warehouse.utils import otp, webauthn
 
 from ...common.constants import REMOTE_ADDR
@@ -125,8 +127,11 @@ class TestDatabaseUserService:
         user = UserFactory.create()
         resets = pretend.stub()
         limiter = pretend.stub(
-            test=pretend.call_recorder(lambda uid: False),
-            resets_in=pretend.call_recorder(lambda ipaddr: resets),
+            hit_and_stats=pretend.call_recorder(
+                lambda ipaddr, consume=True: RateLimitResult(
+                    allowed=False, stats=[], resets_in=resets
+                )
+            ),
             hit=pretend.call_recorder(lambda uid: None),
         )
         user_service.ratelimiters["ip.login"] = limiter
@@ -134,8 +139,7 @@ class TestDatabaseUserService:
 
         user_service.check_password(user.id, "password")
 
-        assert limiter.test.calls == []
-        assert limiter.resets_in.calls == []
+        assert limiter.hit_and_stats.calls == []
 
     def test_username_is_not_prohibited(self, user_service):
         assert user_service.username_is_prohibited("my_username") is False
@@ -160,7 +164,11 @@ class TestDatabaseUserService:
 
     def test_check_password_global_rate_limited(self, user_service, metrics):
         resets = pretend.stub()
-        limiter = pretend.stub(test=lambda: False, resets_in=lambda: resets)
+        limiter = pretend.stub(
+            hit_and_stats=lambda consume=True: RateLimitResult(
+                allowed=False, stats=[], resets_in=resets
+            )
+        )
         user_service.ratelimiters["global.login"] = limiter
 
         with pytest.raises(TooManyFailedLogins) as excinfo:
@@ -195,8 +203,11 @@ class TestDatabaseUserService:
         user = UserFactory.create()
         resets = pretend.stub()
         limiter = pretend.stub(
-            test=pretend.call_recorder(lambda uid: False),
-            resets_in=pretend.call_recorder(lambda uid: resets),
+            hit_and_stats=pretend.call_recorder(
+                lambda uid, consume=True: RateLimitResult(
+                    allowed=False, stats=[], resets_in=resets
+                )
+            ),
         )
         user_service.ratelimiters["user.login"] = limiter
 
@@ -204,8 +215,7 @@ class TestDatabaseUserService:
             user_service.check_password(user.id, None)
 
         assert excinfo.value.resets_in is resets
-        assert limiter.test.calls == [pretend.call(user.id)]
-        assert limiter.resets_in.calls == [pretend.call(user.id)]
+        assert limiter.hit_and_stats.calls == [pretend.call(user.id, consume=False)]
         assert metrics.increment.calls == [
             pretend.call(
                 "warehouse.authentication.start", tags=["mechanism:check_password"]
@@ -220,8 +230,11 @@ class TestDatabaseUserService:
         user = UserFactory.create()
         resets = pretend.stub()
         limiter = pretend.stub(
-            test=pretend.call_recorder(lambda uid: False),
-            resets_in=pretend.call_recorder(lambda ipaddr: resets),
+            hit_and_stats=pretend.call_recorder(
+                lambda ipaddr, consume=True: RateLimitResult(
+                    allowed=False, stats=[], resets_in=resets
+                )
+            ),
         )
         user_service.ratelimiters["ip.login"] = limiter
 
@@ -229,8 +242,7 @@ class TestDatabaseUserService:
             user_service.check_password(user.id, None)
 
         assert excinfo.value.resets_in is resets
-        assert limiter.test.calls == [pretend.call(REMOTE_ADDR)]
-        assert limiter.resets_in.calls == [pretend.call(REMOTE_ADDR)]
+        assert limiter.hit_and_stats.calls == [pretend.call(REMOTE_ADDR, consume=False)]
         assert metrics.increment.calls == [
             pretend.call(
                 "warehouse.authentication.start", tags=["mechanism:check_password"]
@@ -1802,6 +1814,10 @@ def test_token_service_factory_eq():
 
 
 class TestHaveIBeenPwnedPasswordBreachedService:
+    dataset = (
+        "1e4c9b93f3f0682250b6cf8331b7ee68fd8:5\r\na8ff7fcd473d321e0146afd9e26df395147:3"
+    )
+
     def test_verify_service(self):
         assert verifyClass(
             IPasswordBreachedService, services.HaveIBeenPwnedPasswordBreachedService
@@ -1898,6 +1914,126 @@ class TestHaveIBeenPwnedPasswordBreachedService:
             pretend.call("something"),
         ]
 
+    def test_memory_cache_hit(self, metrics):
+        range_cache = services.PwnedRangeCache()
+        range_cache.set("5baa6", services._parse_range(self.dataset))
+        session = pretend.stub(get=pretend.call_recorder(lambda url: None))
+
+        svc = services.HaveIBeenPwnedPasswordBreachedService(
+            session=session, metrics=metrics, range_cache=range_cache
+        )
+
+        assert svc.check_password("password", tags=["method:new_password"])
+        assert session.get.calls == []
+        assert (
+            pretend.call(
+                "warehouse.compromised_password_check.cache_hit",
+                tags=["method:new_password", "tier:memory"],
+            )
+            in metrics.increment.calls
+        )
+
+    def test_redis_cache_hit(self, metrics):
+        range_cache = services.PwnedRangeCache()
+        redis_client = pretend.stub(
+            get=pretend.call_recorder(lambda key: services._parse_range(self.dataset))
+        )
+        session = pretend.stub(get=pretend.call_recorder(lambda url: None))
+
+        svc = services.HaveIBeenPwnedPasswordBreachedService(
+            session=session,
+            metrics=metrics,
+            range_cache=range_cache,
+            redis_client=redis_client,
+        )
+
+        assert svc.check_password("password")
+        assert session.get.calls == []
+        assert redis_client.get.calls == [pretend.call("hibp:range:5baa6")]
+        assert range_cache.get("5baa6") == services._parse_range(self.dataset)
+        assert (
+            pretend.call(
+                "warehouse.compromised_password_check.cache_hit", tags=["tier:redis"]
+            )
+            in metrics.increment.calls
+        )
+
+    def test_cache_miss_populates_caches(self):
+        range_cache = services.PwnedRangeCache()
+        redis_client = pretend.stub(
+            get=pretend.call_recorder(lambda key: None),
+            set=pretend.call_recorder(lambda key, value, ex: None),
+        )
+        response = pretend.stub(text=self.dataset, raise_for_status=lambda: None)
+        session = pretend.stub(get=pretend.call_recorder(lambda url: response))
+
+        svc = services.HaveIBeenPwnedPasswordBreachedService(
+            session=session,
+            metrics=NullMetrics(),
+            range_cache=range_cache,
+            redis_client=redis_client,
+        )
+
+        assert svc.check_password("password")
+        assert svc.check_password("password")
+        assert session.get.calls == [
+            pretend.call("https://api.pwnedpasswords.com/range/5baa6")
+        ]
+        assert redis_client.get.calls == [pretend.call("hibp:range:5baa6")]
+        assert redis_client.set.calls == [
+            pretend.call(
+                "hibp:range:5baa6",
+                b"1E4C9B93F3F0682250B6CF8331B7EE68FD8A8FF7FCD473D321E0146AFD9E26DF395147",
+                ex=services._HIBP_RANGE_CACHE_TTL,
+            )
+        ]
+
+    def test_redis_errors_fall_through(self):
+        def raiser(*args, **kwargs):
+            raise redis.exceptions.ConnectionError
+
+        redis_client = pretend.stub(get=raiser, set=raiser)
+        response = pretend.stub(text=self.dataset, raise_for_status=lambda: None)
+        session = pretend.stub(get=pretend.call_recorder(lambda url: response))
+
+        svc = services.HaveIBeenPwnedPasswordBreachedService(
+            session=session, metrics=NullMetrics(), redis_client=redis_client
+        )
+
+        assert svc.check_password("password")
+        assert len(session.get.calls) == 1
+
+    @pytest.mark.parametrize(
+        ("password", "expected"), [("password", True), ("hunter3", False)]
+    )
+    def test_offline_dataset(self, tmp_path, password, expected):
+        dataset = tmp_path / "pwned-passwords.bin"
+        dataset.write_bytes(
+            b"".join(
+                sorted(
+                    hashlib.sha1(p, usedforsecurity=False).digest()
+                    for p in [b"password", b"123456", b"hunter2"]
+                )
+            )
+        )
+        session = pretend.stub(get=pretend.call_recorder(lambda url: None))
+
+        svc = services.HaveIBeenPwnedPasswordBreachedService(
+            session=session,
+            metrics=NullMetrics(),
+            offline_dataset=services.PwnedPasswordsDataset(str(dataset)),
+        )
+
+        assert svc.check_password(password) == expected
+        assert session.get.calls == []
+
+    def test_offline_dataset_invalid(self, tmp_path):
+        dataset = tmp_path / "pwned-passwords.txt"
+        dataset.write_bytes(b"5BAA61E4C9B93F3F0682250B6CF8331B7EE68FD8:5\n")
+
+        with pytest.raises(ValueError, match="is not a sorted file of SHA-1 digests"):
+            services.PwnedPasswordsDataset(str(dataset))
+
     def test_factory(self):
         context = pretend.stub()
         request = pretend.stub(
@@ -1906,6 +2042,7 @@ class TestHaveIBeenPwnedPasswordBreachedService:
                 (IMetricsService, None): NullMetrics()
             }[(iface, context)],
             help_url=lambda _anchor=None: f"http://localhost/help/#{_anchor}",
+            registry=pretend.stub(settings={}),
         )
         svc = services.HaveIBeenPwnedPasswordBreachedService.create_service(
             context, request
@@ -1914,6 +2051,44 @@ class TestHaveIBeenPwnedPasswordBreachedService:
         assert svc._http is request.http
         assert isinstance(svc._metrics, NullMetrics)
         assert svc._help_url == "http://localhost/help/#compromised-password"
+        assert svc._range_cache is services._pwned_range_cache
+        assert svc._redis is None
+        assert svc._offline_dataset is None
+
+    def test_factory_with_caches(self, monkeypatch):
+        redis_client = pretend.stub()
+        from_url = pretend.call_recorder(lambda url: redis_client)
+        monkeypatch.setattr(services.redis.StrictRedis, "from_url", from_url)
+        services._pwned_range_redis.cache_clear()
+        offline_dataset = pretend.stub()
+        dataset_cls = pretend.call_recorder(lambda path: offline_dataset)
+        monkeypatch.setattr(services, "PwnedPasswordsDataset", dataset_cls)
+        services._open_pwned_passwords_dataset.cache_clear()
+
+        request = pretend.stub(
+            http=pretend.stub(),
+            find_service=lambda iface, context: NullMetrics(),
+            help_url=lambda _anchor=None: None,
+            registry=pretend.stub(
+                settings={
+                    "db_results_cache.url": "redis://localhost:6379/5",
+                    "hibp.offline_dataset": "/srv/hibp/pwned-passwords.bin",
+                }
+            ),
+        )
+        for _ in range(2):
+            svc = services.HaveIBeenPwnedPasswordBreachedService.create_service(
+                pretend.stub(), request
+            )
+
+            assert svc._redis is redis_client
+            assert svc._offline_dataset is offline_dataset
+
+        assert from_url.calls == [pretend.call("redis://localhost:6379/5")]
+        assert dataset_cls.calls == [pretend.call("/srv/hibp/pwned-passwords.bin")]
+
+        services._pwned_range_redis.cache_clear()
+        services._open_pwned_passwords_dataset.cache_clear()
 
     @pytest.mark.parametrize(
         ("help_url", "expected"),
@@ -1944,6 +2119,7 @@ class TestHaveIBeenPwnedPasswordBreachedService:
                 (IMetricsService, None): NullMetrics()
             }[(iface, context)],
             help_url=lambda _anchor=None: help_url,
+            registry=pretend.stub(settings={}),
         )
         svc = services.HaveIBeenPwnedPasswordBreachedService.create_service(
             context, request
@@ -1951,6 +2127,30 @@ class TestHaveIBeenPwnedPasswordBreachedService:
         assert svc.failure_message == expected
 
 
+class TestPwnedRangeCache:
+    def test_evicts_least_recently_used(self):
+        cache = services.PwnedRangeCache(maxsize=2)
+        cache.set("00000", b"a")
+        cache.set("00001", b"b")
+        assert cache.get("00000") == b"a"
+        cache.set("00002", b"c")
+
+        assert cache.get("00001") is None
+        assert cache.get("00000") == b"a"
+        assert cache.get("00002") == b"c"
+
+    def test_expires(self, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(services.time, "monotonic", lambda: now)
+        cache = services.PwnedRangeCache(ttl=60)
+        cache.set("00000", b"a")
+        assert cache.get("00000") == b"a"
+
+        now += 60
+        assert cache.get("00000") is None
+        assert cache.get("00000") is None
+
+
 class TestNullPasswordBreachedService:
     def test_verify_service(self):
         assert verifyClass(
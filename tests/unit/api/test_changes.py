@@ -0,0 +1,119 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import pretend
+import pytest
+
+from pyramid.httpexceptions import HTTPBadRequest
+
+from warehouse.api import changes
+
+from ...common.db.packaging import JournalEntryFactory
+
+
+def _assert_has_cors_headers(headers):
+    assert headers["Access-Control-Allow-Origin"] == "*"
+    assert headers["Access-Control-Allow-Methods"] == "GET"
+    assert headers["Access-Control-Expose-Headers"] == "X-PyPI-Last-Serial"
+
+
+class TestCursor:
+    @pytest.mark.parametrize("serial", [0, 1, 1234567890])
+    def test_round_trip(self, serial):
+        cursor = changes.encode_cursor(serial)
+        assert cursor != str(serial)
+        assert changes.decode_cursor(cursor) == serial
+
+    @pytest.mark.parametrize(
+        "cursor",
+        ["not a cursor", "bm90IGEgc2VyaWFs", changes.encode_cursor(-1), "☃"],
+    )
+    def test_invalid(self, cursor):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            changes.decode_cursor(cursor)
+
+
+class TestChanges:
+    @pytest.fixture
+    def db_request(self, db_request):
+        db_request.route_path = pretend.call_recorder(
+            lambda name, _query: f"/api/changes/?cursor={_query['cursor']}"
+        )
+        return db_request
+
+    def test_empty(self, db_request):
+        assert changes.changes(db_request) == {
+            "projects": [],
+            "last_serial": 0,
+            "next": f"/api/changes/?cursor={changes.encode_cursor(0)}",
+        }
+        assert db_request.route_path.calls == [
+            pretend.call("api.changes", _query={"cursor": changes.encode_cursor(0)})
+        ]
+        assert db_request.response.etag == "0-0"
+        assert db_request.response.cache_control.max_age == changes.PARTIAL_PAGE_TTL
+        assert not hasattr(db_request.response, "override_ttl")
+        _assert_has_cors_headers(db_request.response.headers)
+
+    def test_coalesces_projects(self, db_request):
+        foo_1 = JournalEntryFactory.create(name="foo")
+        bar = JournalEntryFactory.create(name="Bar")
+        JournalEntryFactory.create(name=None)
+        foo_2 = JournalEntryFactory.create(name="Foo")
+        last = JournalEntryFactory.create(name=None)
+
+        db_request.params = {"since": str(foo_1.id - 1)}
+
+        assert changes.changes(db_request) == {
+            "projects": [
+                {"name": "Bar", "serial": bar.id},
+                {"name": "Foo", "serial": foo_2.id},
+            ],
+            "last_serial": last.id,
+            "next": f"/api/changes/?cursor={changes.encode_cursor(last.id)}",
+        }
+        assert db_request.response.etag == f"{foo_1.id - 1}-{last.id}"
+
+    def test_follows_cursor(self, db_request):
+        first = JournalEntryFactory.create()
+        second = JournalEntryFactory.create()
+
+        db_request.params = {"cursor": changes.encode_cursor(first.id)}
+
+        assert changes.changes(db_request)["projects"] == [
+            {"name": second.name, "serial": second.id}
+        ]
+
+    def test_full_page(self, db_request, monkeypatch):
+        monkeypatch.setattr(changes, "PAGE_SIZE", 2)
+        first = JournalEntryFactory.create(name="foo")
+        second = JournalEntryFactory.create(name="bar")
+        JournalEntryFactory.create(name="baz")
+
+        assert changes.changes(db_request) == {
+            "projects": [
+                {"name": "foo", "serial": first.id},
+                {"name": "bar", "serial": second.id},
+            ],
+            "last_serial": second.id,
+            "next": f"/api/changes/?cursor={changes.encode_cursor(second.id)}",
+        }
+        assert db_request.response.override_ttl == changes.FULL_PAGE_TTL
+        assert db_request.response.cache_control.max_age == changes.FULL_PAGE_TTL
+        assert db_request.response.cache_control.public
+
+    def test_prevent_http_cache(self, db_request):
+        db_request.registry.settings = {"pyramid.prevent_http_cache": True}
+
+        changes.changes(db_request)
+
+        assert db_request.response.cache_control.max_age is None
+
+    @pytest.mark.parametrize(
+        "params",
+        [{"cursor": "not a cursor"}, {"since": "nope"}, {"since": "-1"}],
+    )
+    def test_invalid_params(self, db_request, params):
+        db_request.params = params
+
+        with pytest.raises(HTTPBadRequest):
+            changes.changes(db_request)
@@ -77,6 +77,46 @@ class TestPurgeKey:
         )
 
 
+class TestPurgePendingKeys:
+    def test_purges_successfully(self, pyramid_request, mocker, metrics):
+        cacher = mocker.Mock(spec=["purge_pending"])
+        mocker.patch.object(
+            pyramid_request,
+            "find_service",
+            side_effect=lambda svc, context=None, name=None: {
+                IOriginCache: cacher,
+                IMetricsService: metrics,
+            }.get(svc),
+        )
+
+        fastly.purge_pending_keys(mocker.sentinel.task, pyramid_request)
+
+        cacher.purge_pending.assert_called_once_with(metrics=metrics)
+
+    def test_purges_fails(self, pyramid_request, mocker, metrics):
+        exc = fastly.UnsuccessfulPurgeError()
+        cacher = mocker.Mock(spec=["purge_pending"])
+        cacher.purge_pending.side_effect = exc
+        task = mocker.Mock(spec=["retry"])
+        task.retry.side_effect = celery.exceptions.Retry
+        mocker.patch.object(
+            pyramid_request,
+            "find_service",
+            side_effect=lambda svc, context=None, name=None: {
+                IOriginCache: cacher,
+                IMetricsService: metrics,
+            }.get(svc),
+        )
+
+        with pytest.raises(celery.exceptions.Retry):
+            fastly.purge_pending_keys(task, pyramid_request)
+
+        task.retry.assert_called_once_with(exc=exc)
+        pyramid_request.log.error.assert_called_once_with(
+            "Error purging pending cache keys", error=str(exc)
+        )
+
+
 class TestFastlyCache:
     def test_verify_service(self):
         assert verifyClass(IOriginCache, fastly.FastlyCache)
@@ -98,8 +138,32 @@ class TestFastlyCache:
         assert cacher.api_key == "the api key"
         assert cacher.service_id == "the service id"
         assert cacher._purger is task.delay
+        assert cacher.purge_batch_window is None
         pyramid_request.task.assert_called_once_with(fastly.purge_key)
 
+    def test_create_service_purge_batch_window(self, pyramid_request, mocker):
+        task = mocker.Mock(spec=["delay", "apply_async"])
+        mocker.patch.object(pyramid_request, "task", return_value=task)
+        redis_client = mocker.sentinel.redis_client
+        from_url = mocker.patch("redis.StrictRedis.from_url", return_value=redis_client)
+        pyramid_request.registry.settings.update(
+            {
+                "origin_cache.api_key": "the api key",
+                "origin_cache.service_id": "the service id",
+                "origin_cache.purge_batch_window": "5",
+                "db_results_cache.url": "redis://redis/5",
+            }
+        )
+        cacher = fastly.FastlyCache.create_service(None, pyramid_request)
+        assert cacher.purge_batch_window == 5
+        assert cacher.redis_client is redis_client
+        assert cacher._batch_purger is task.apply_async
+        from_url.assert_called_once_with("redis://redis/5")
+        assert pyramid_request.task.call_args_list == [
+            call(fastly.purge_pending_keys),
+            call(fastly.purge_key),
+        ]
+
     def test_create_service_default_endpoint(self, pyramid_request, mocker):
         task = mocker.Mock(spec=["delay"])
         mocker.patch.object(pyramid_request, "task", return_value=task)
@@ -247,6 +311,185 @@ class TestFastlyCache:
 
         assert purge_delay.call_args_list == [call("one"), call("two")]
 
+    def test_purge_batched(self, mocker, mockredis):
+        batch_purger = mocker.Mock()
+        cacher = fastly.FastlyCache(
+            api_endpoint=None,
+            api_connect_via=None,
+            api_key="an api key",
+            service_id="the-service-id",
+            purger=None,
+            purge_batch_window=5,
+            redis_client=mockredis,
+            batch_purger=batch_purger,
+        )
+
+        cacher.purge(["one", "two"])
+        cacher.purge(["two", "three"])
+        cacher.purge([])
+
+        assert mockredis.smembers(fastly.PENDING_PURGES_KEY) == {"one", "two", "three"}
+        # Only the first purge in the window schedules a batch.
+        batch_purger.assert_called_once_with(countdown=5)
+
+    def test_purge_pending(self, mocker, mockredis, metrics):
+        mocker.patch.object(fastly, "PURGE_BATCH_SIZE", 2)
+        cacher = fastly.FastlyCache(
+            api_endpoint=None,
+            api_connect_via=None,
+            api_key="an api key",
+            service_id="the-service-id",
+            purger=None,
+            purge_batch_window=5,
+            redis_client=mockredis,
+            batch_purger=lambda countdown: None,
+        )
+        cacher.purge([b"one", b"two", b"three"])
+        cacher.purge_keys = mocker.Mock()
+
+        cacher.purge_pending(metrics=metrics)
+
+        assert not mockredis.exists(fastly.PURGE_SCHEDULED_KEY)
+        assert mockredis.smembers(fastly.PENDING_PURGES_KEY) == set()
+        purged = [c.args[0] for c in cacher.purge_keys.call_args_list]
+        assert sorted(len(keys) for keys in purged) == [1, 2]
+        assert sorted(key for keys in purged for key in keys) == [
+            "one",
+            "three",
+            "two",
+        ]
+        assert sorted(c.args[1] for c in metrics.histogram.call_args_list) == [1, 2]
+        assert {c.args[0] for c in metrics.timing.call_args_list} == {
+            "warehouse.cache.origin.fastly.purge_batch.duration"
+        }
+
+    def test_purge_pending_fails(self, mocker, mockredis, metrics):
+        cacher = fastly.FastlyCache(
+            api_endpoint=None,
+            api_connect_via=None,
+            api_key="an api key",
+            service_id="the-service-id",
+            purger=None,
+            purge_batch_window=5,
+            redis_client=mockredis,
+            batch_purger=lambda countdown: None,
+        )
+        cacher.purge(["one", "two"])
+        cacher.purge_keys = mocker.Mock(side_effect=fastly.UnsuccessfulPurgeError)
+
+        with pytest.raises(fastly.UnsuccessfulPurgeError):
+            cacher.purge_pending(metrics=metrics)
+
+        # The keys are put back for the retry.
+        assert mockredis.smembers(fastly.PENDING_PURGES_KEY) == {"one", "two"}
+        cacher.purge_keys.assert_called_once_with(["one", "two"], metrics=metrics)
+
+    @pytest.mark.parametrize(
+        ("connect_via", "forced_ip_https_adapter_calls"),
+        [(None, []), ("172.16.0.1", [call(dest_ip="172.16.0.1")])],
+    )
+    def test__purge_keys_ok(self, mocker, connect_via, forced_ip_https_adapter_calls):
+        forced_ip_https_adapter = mocker.patch.object(
+            forcediphttpsadapter.adapters, "ForcedIPHTTPSAdapter", autospec=True
+        )
+
+        cacher = fastly.FastlyCache(
+            api_endpoint="https://api.fastly.com",
+            api_connect_via=connect_via,
+            api_key="an api key",
+            service_id="the-service-id",
+            purger=None,
+        )
+
+        response = mocker.Mock(spec=["raise_for_status", "json"])
+        response.json.return_value = {"one": "108-1391560174-974124", "two": "1"}
+        session_cls = mocker.patch.object(requests, "Session", autospec=True)
+        session_cls.return_value.post.return_value = response
+
+        cacher._purge_keys(["one", "two"], connect_via=connect_via)
+
+        assert forced_ip_https_adapter.call_args_list == forced_ip_https_adapter_calls
+        session_cls.return_value.post.assert_called_once_with(
+            "https://api.fastly.com/service/the-service-id/purge",
+            headers={
+                "Accept": "application/json",
+                "Fastly-Key": "an api key",
+                "Fastly-Soft-Purge": "1",
+            },
+            json={"surrogate_keys": ["one", "two"]},
+        )
+        response.raise_for_status.assert_called_once_with()
+
+    def test__purge_keys_unsuccessful(self, mocker):
+        cacher = fastly.FastlyCache(
+            api_endpoint="https://api.fastly.com",
+            api_connect_via=None,
+            api_key="an api key",
+            service_id="the-service-id",
+            purger=None,
+        )
+
+        response = mocker.Mock(spec=["raise_for_status", "json"])
+        response.json.return_value = {"one": "108-1391560174-974124"}
+        session_cls = mocker.patch.object(requests, "Session", autospec=True)
+        session_cls.return_value.post.return_value = response
+
+        with pytest.raises(fastly.UnsuccessfulPurgeError):
+            cacher._purge_keys(["one", "two"])
+
+    @pytest.mark.parametrize(
+        ("connect_via", "purge_keys_effects", "purge_keys_calls", "increments"),
+        [
+            (None, [None], [call(["one"], connect_via=None)], 0),
+            (
+                "172.16.0.1",
+                [requests.ConnectionError, None, None],
+                [
+                    call(["one"], connect_via="172.16.0.1"),
+                    call(["one"], connect_via=None),
+                    call(["one"], connect_via=None),
+                ],
+                1,
+            ),
+        ],
+    )
+    def test_purge_keys(
+        self,
+        mocker,
+        metrics,
+        connect_via,
+        purge_keys_effects,
+        purge_keys_calls,
+        increments,
+    ):
+        mocker.patch("time.sleep")
+        cacher = fastly.FastlyCache(
+            api_endpoint="https://api.fastly.com",
+            api_connect_via=connect_via,
+            api_key="an api key",
+            service_id="the-service-id",
+            purger=None,
+        )
+        cacher._purge_keys = mocker.Mock(side_effect=purge_keys_effects)
+
+        cacher.purge_keys(["one"], metrics=metrics)
+
+        assert cacher._purge_keys.call_args_list == purge_keys_calls
+        assert len(metrics.increment.call_args_list) == increments
+
+    def test_purge_keys_no_fallback(self, mocker, metrics):
+        cacher = fastly.FastlyCache(
+            api_endpoint="https://api.fastly.com",
+            api_connect_via=None,
+            api_key="an api key",
+            service_id="the-service-id",
+            purger=None,
+        )
+        cacher._purge_keys = mocker.Mock(side_effect=requests.ConnectionError)
+
+        with pytest.raises(requests.ConnectionError):
+            cacher.purge_keys(["one"], metrics=metrics)
+
     @pytest.mark.parametrize(
         ("connect_via", "forced_ip_https_adapter_calls"),
         [(None, []), ("172.16.0.1", [call(dest_ip="172.16.0.1")])],
@@ -579,5 +822,27 @@ class TestNullFastlyCache:
 Origin cache purge issued:
 * URL: 'https://api.example.com/service/the service id/purge/one'
 * Headers: {'Accept': 'application/json', 'Fastly-Key': 'the api key', 'Fastly-Soft-Purge': '1'}
+"""  # noqa: E501
+        assert captured.out.strip() == expected.strip()
+
+    def test_purge_keys_prints(self, pyramid_request, mocker, capsys, metrics):
+        task = mocker.Mock(spec=["delay"])
+        mocker.patch.object(pyramid_request, "task", return_value=task)
+        pyramid_request.registry.settings.update(
+            {
+                "origin_cache.api_endpoint": "https://api.example.com",
+                "origin_cache.api_key": "the api key",
+                "origin_cache.service_id": "the service id",
+            }
+        )
+        cacher = fastly.NullFastlyCache.create_service(None, pyramid_request)
+        cacher.purge_keys(["one", "two"], metrics=metrics)
+
+        captured = capsys.readouterr()
+        expected = """
+Origin cache bulk purge issued:
+* URL: 'https://api.example.com/service/the service id/purge'
+* Headers: {'Accept': 'application/json', 'Fastly-Key': 'the api key', 'Fastly-Soft-Purge': '1'}
+* Keys: ['one', 'two']
 """  # noqa: E501
         assert captured.out.strip() == expected.strip()
@@ -14,6 +14,7 @@ from tests.common.db.packaging import (
 )
 from warehouse.accounts.models import User
 from warehouse.cache import origin
+from warehouse.cache.interfaces import IDocumentCache
 from warehouse.cache.origin.derivers import html_cache_deriver
 from warehouse.cache.origin.interfaces import IOriginCache
 from warehouse.observations.models import ObservationKind
@@ -173,10 +174,17 @@ def test_store_purge_keys_skips_project_dirty_on_releases_change(
 
 
 def test_execute_purge_success(app_config, mocker):
+    document_cache = mocker.Mock(spec=["purge"])
     cacher = mocker.Mock(spec=["purge"])
-    factory = mocker.Mock(return_value=cacher)
+    factories = {
+        IDocumentCache: mocker.Mock(return_value=document_cache),
+        IOriginCache: mocker.Mock(return_value=cacher),
+    }
     mocker.patch.object(
-        app_config, "find_service_factory", autospec=True, return_value=factory
+        app_config,
+        "find_service_factory",
+        autospec=True,
+        side_effect=lambda iface: factories[iface],
     )
     session = types.SimpleNamespace(
         info={"warehouse.cache.origin.purges": {"type_1", "type_2", "foobar"}}
@@ -184,7 +192,9 @@ def test_execute_purge_success(app_config, mocker):
 
     origin.execute_purge(app_config, session)
 
-    factory.assert_called_once_with(None, app_config)
+    factories[IDocumentCache].assert_called_once_with(None, app_config)
+    factories[IOriginCache].assert_called_once_with(None, app_config)
+    document_cache.purge.assert_called_once_with({"type_1", "type_2", "foobar"})
     cacher.purge.assert_called_once_with({"type_1", "type_2", "foobar"})
     assert "warehouse.cache.origin.purges" not in session.info
 
@@ -206,7 +216,10 @@ def test_execute_purge_no_backend(app_config, mocker):
 
     origin.execute_purge(app_config, session)
 
-    find_service_factory.assert_called_once_with(origin.IOriginCache)
+    assert find_service_factory.call_args_list == [
+        mocker.call(IDocumentCache),
+        mocker.call(origin.IOriginCache),
+    ]
     assert "warehouse.cache.origin.purges" not in session.info
 
 
@@ -1,8 +1,18 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from warehouse.cache import includeme
-from warehouse.cache.interfaces import IQueryResultsCache
-from warehouse.cache.services import RedisQueryResults
+from warehouse.cache.interfaces import (
+    IACLCache,
+    IDocumentCache,
+    IQueryResultsCache,
+    IVerdictCache,
+)
+from warehouse.cache.services import (
+    RedisACLCache,
+    RedisDocumentCache,
+    RedisQueryResults,
+    RedisVerdictCache,
+)
 
 
 def test_includeme(mocker):
@@ -10,6 +20,9 @@ def test_includeme(mocker):
 
     includeme(config)
 
-    config.register_service_factory.assert_called_once_with(
-        RedisQueryResults.create_service, IQueryResultsCache
-    )
+    assert config.register_service_factory.call_args_list == [
+        mocker.call(RedisQueryResults.create_service, IQueryResultsCache),
+        mocker.call(RedisDocumentCache.create_service, IDocumentCache),
+        mocker.call(RedisVerdictCache.create_service, IVerdictCache),
+        mocker.call(RedisACLCache.create_service, IACLCache),
+    ]
@@ -3,10 +3,22 @@
 import datetime
 import uuid
 
+import redis
+
 from zope.interface.verify import verifyClass
 
-from warehouse.cache.interfaces import IQueryResultsCache
-from warehouse.cache.services import RedisQueryResults
+from warehouse.cache.interfaces import (
+    IACLCache,
+    IDocumentCache,
+    IQueryResultsCache,
+    IVerdictCache,
+)
+from warehouse.cache.services import (
+    RedisACLCache,
+    RedisDocumentCache,
+    RedisQueryResults,
+    RedisVerdictCache,
+)
 
 
 class TestRedisQueryResults:
@@ -59,3 +71,161 @@ class TestRedisQueryResults:
         assert isinstance(result["dict"], dict)
         assert isinstance(result["uuid"], str)
         assert isinstance(result["datetime"], str)
+
+
+class TestRedisDocumentCache:
+    def test_interface_matches(self):
+        assert verifyClass(IDocumentCache, RedisDocumentCache)
+
+    def test_create_service(self, pyramid_request):
+        pyramid_request.registry.settings["db_results_cache.url"] = "redis://"
+        service = RedisDocumentCache.create_service(None, pyramid_request)
+
+        assert isinstance(service, RedisDocumentCache)
+        assert service.expires == 24 * 60 * 60
+        # Every service shares the same client, rather than a new connection
+        # pool for each request.
+        other = RedisDocumentCache.create_service(None, pyramid_request)
+        assert other.redis_client is service.redis_client
+
+    def test_get_missing(self, document_cache_service):
+        assert document_cache_service.get("missing_key") is None
+
+    def test_set_get(self, document_cache_service):
+        document_cache_service.set("test_key", b'{"foo":"bar"}')
+
+        assert document_cache_service.get("test_key") == b'{"foo":"bar"}'
+
+    def test_purge(self, document_cache_service):
+        document_cache_service.set("one", b"1", tags=["project/foo", "all"])
+        document_cache_service.set("two", b"2", tags=["project/bar", "all"])
+        document_cache_service.set("three", b"3", tags=["project/bar"])
+
+        document_cache_service.purge({"project/foo"})
+
+        assert document_cache_service.get("one") is None
+        assert document_cache_service.get("two") == b"2"
+        assert document_cache_service.get("three") == b"3"
+
+        document_cache_service.purge({"all", "unknown"})
+
+        assert document_cache_service.get("two") is None
+        assert document_cache_service.get("three") == b"3"
+
+    def test_purge_nothing(self, document_cache_service):
+        document_cache_service.set("one", b"1", tags=["project/foo"])
+
+        document_cache_service.purge(set())
+
+        assert document_cache_service.get("one") == b"1"
+
+    def test_redis_errors_are_misses(self, mocker):
+        redis_client = mocker.Mock()
+        redis_client.get.side_effect = redis.exceptions.ConnectionError
+        redis_client.pipeline.side_effect = redis.exceptions.ConnectionError
+        redis_client.smembers.side_effect = redis.exceptions.ConnectionError
+        service = RedisDocumentCache(redis_client)
+
+        service.set("one", b"1", tags=["project/foo"])
+        assert service.get("one") is None
+        service.purge({"project/foo"})
+
+
+class TestRedisVerdictCache:
+    def test_interface_matches(self):
+        assert verifyClass(IVerdictCache, RedisVerdictCache)
+
+    def test_create_service(self, pyramid_request):
+        pyramid_request.registry.settings["db_results_cache.url"] = "redis://"
+        service = RedisVerdictCache.create_service(None, pyramid_request)
+
+        assert isinstance(service, RedisVerdictCache)
+        assert service.expires == 7 * 24 * 60 * 60
+        other = RedisVerdictCache.create_service(None, pyramid_request)
+        assert other.redis_client is service.redis_client
+
+    def test_get_clean_nothing(self, verdict_cache_service):
+        assert verdict_cache_service.get_clean("rules", []) == set()
+
+    def test_set_get_clean(self, verdict_cache_service):
+        verdict_cache_service.set_clean("rules", ["aaa", "bbb"])
+
+        assert verdict_cache_service.get_clean("rules", ["aaa", "ccc"]) == {"aaa"}
+        # Verdicts are scoped to the ruleset they were made under.
+        assert verdict_cache_service.get_clean("other-rules", ["aaa"]) == set()
+
+    def test_redis_errors_are_misses(self, mocker):
+        redis_client = mocker.Mock()
+        redis_client.mget.side_effect = redis.exceptions.ConnectionError
+        redis_client.pipeline.side_effect = redis.exceptions.ConnectionError
+        service = RedisVerdictCache(redis_client)
+
+        service.set_clean("rules", ["aaa"])
+        assert service.get_clean("rules", ["aaa"]) == set()
+
+
+class TestRedisACLCache:
+    def test_interface_matches(self):
+        assert verifyClass(IACLCache, RedisACLCache)
+
+    def test_create_service(self, pyramid_request):
+        pyramid_request.registry.settings["db_results_cache.url"] = "redis://"
+        service = RedisACLCache.create_service(None, pyramid_request)
+
+        assert isinstance(service, RedisACLCache)
+        assert service.expires == 5 * 60
+        other = RedisACLCache.create_service(None, pyramid_request)
+        assert other.redis_client is service.redis_client
+
+    def test_get_nothing(self, acl_cache_service):
+        assert acl_cache_service.get("key") == (0, None)
+
+    def test_set_get(self, acl_cache_service):
+        acl_cache_service.set("key", 0, {"some": ["value"]})
+
+        assert acl_cache_service.get("key") == (0, {"some": ["value"]})
+
+    def test_bump_invalidates(self, acl_cache_service):
+        acl_cache_service.set("key", 0, "stale")
+        acl_cache_service.set("other", 0, "fresh")
+
+        acl_cache_service.bump(["key"])
+        acl_cache_service.bump([])
+
+        assert acl_cache_service.get("key") == (1, None)
+        assert acl_cache_service.get("other") == (0, "fresh")
+
+    def test_set_after_bump_is_ignored(self, acl_cache_service):
+        # A value computed before a bump, but only written after it, must
+        # never be served.
+        version, _ = acl_cache_service.get("key")
+        acl_cache_service.bump(["key"])
+        acl_cache_service.set("key", version, "stale")
+
+        assert acl_cache_service.get("key") == (1, None)
+
+    def test_redis_errors_are_misses(self, mocker):
+        redis_client = mocker.Mock()
+        redis_client.mget.side_effect = redis.exceptions.ConnectionError
+        redis_client.set.side_effect = redis.exceptions.ConnectionError
+        service = RedisACLCache(redis_client)
+
+        service.set("key", 0, "value")
+        assert service.get("key") == (0, None)
+
+    def test_bump_error_drops_entries(self, mocker):
+        redis_client = mocker.Mock()
+        redis_client.pipeline.side_effect = redis.exceptions.ConnectionError
+        service = RedisACLCache(redis_client)
+
+        service.bump(["key", "other"])
+
+        redis_client.unlink.assert_called_once_with("acl:key", "acl:other")
+
+    def test_bump_errors_are_ignored(self, mocker):
+        redis_client = mocker.Mock()
+        redis_client.pipeline.side_effect = redis.exceptions.ConnectionError
+        redis_client.unlink.side_effect = redis.exceptions.ConnectionError
+        service = RedisACLCache(redis_client)
+
+        service.bump(["key"])
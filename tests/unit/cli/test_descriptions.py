@@ -0,0 +1,38 @@
+# SPDX-License-Identifier: Apache-2.0
+
+from warehouse.cli.descriptions import rerender
+from warehouse.packaging.tasks import rerender_descriptions
+from warehouse.tasks import WarehouseTask
+
+
+class TestCLIDescriptions:
+    def test_rerender(self, cli, mocker):
+        task = mocker.create_autospec(WarehouseTask, instance=True)
+        config = mocker.Mock()
+        config.task.return_value = task
+
+        result = cli.invoke(
+            rerender, ["--partition-size", "500", "--processes", "4"], obj=config
+        )
+
+        assert result.exit_code == 0
+        assert config.task.call_args_list == [
+            mocker.call(rerender_descriptions),
+            mocker.call(rerender_descriptions),
+        ]
+        task.get_request.assert_called_once_with()
+        task.run.assert_called_once_with(
+            task.get_request.return_value, partition_size=500, processes=4
+        )
+
+    def test_rerender_defaults(self, cli, mocker):
+        task = mocker.create_autospec(WarehouseTask, instance=True)
+        config = mocker.Mock()
+        config.task.return_value = task
+
+        result = cli.invoke(rerender, obj=config)
+
+        assert result.exit_code == 0
+        task.run.assert_called_once_with(
+            task.get_request.return_value, partition_size=1000, processes=None
+        )
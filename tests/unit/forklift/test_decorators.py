@@ -145,3 +145,43 @@ class TestEnsureUploadsAllowed:
             "403 Invalid or non-existent authentication information. "
             "See /path/to/help/ for more information."
         )
+
+
+class TestProfileUpload:
+    @pytest.mark.parametrize(
+        ("settings", "sample"),
+        [({}, 0.0), ({"forklift.upload_profile_rate": 0.1}, 0.5)],
+    )
+    def test_not_profiled(self, monkeypatch, settings, sample):
+        req = pretend.stub(registry=pretend.stub(settings=settings))
+        resp = pretend.stub()
+        monkeypatch.setattr(decorators.random, "random", lambda: sample)
+        info = pretend.call_recorder(lambda *a, **kw: None)
+        monkeypatch.setattr(decorators.logger, "info", info)
+
+        @decorators.profile_upload
+        def wrapped(context, request):
+            return resp
+
+        assert wrapped(pretend.stub(), req) is resp
+        assert info.calls == []
+
+    def test_profiled(self, monkeypatch):
+        req = pretend.stub(
+            registry=pretend.stub(settings={"forklift.upload_profile_rate": 0.1}),
+            POST={"content": pretend.stub(filename="foo-1.0.tar.gz")},
+        )
+        resp = pretend.stub()
+        monkeypatch.setattr(decorators.random, "random", lambda: 0.05)
+        info = pretend.call_recorder(lambda *a, **kw: None)
+        monkeypatch.setattr(decorators.logger, "info", info)
+
+        @decorators.profile_upload
+        def wrapped(context, request):
+            return resp
+
+        assert wrapped(pretend.stub(), req) is resp
+        assert len(info.calls) == 1
+        assert info.calls[0].args == ("upload_profile",)
+        assert info.calls[0].kwargs["filename"] == "foo-1.0.tar.gz"
+        assert "wrapped" in info.calls[0].kwargs["profile"]
@@ -2,6 +2,7 @@
 
 import base64
 import builtins
+import concurrent.futures
 import datetime
 import hashlib
 import io
@@ -32,6 +33,7 @@ import warehouse.constants
 
 from warehouse.accounts.utils import UserContext
 from warehouse.attestations.interfaces import IIntegrityService
+from warehouse.cache.interfaces import IVerdictCache
 from warehouse.classifiers.models import Classifier
 from warehouse.constants import MAX_FILESIZE, MAX_PROJECT_SIZE
 from warehouse.events.models import HasEvents
@@ -44,6 +46,7 @@ from warehouse.oidc.interfaces import SignedClaims
 from warehouse.oidc.utils import PublisherTokenContext
 from warehouse.packaging.interfaces import IFileStorage, IProjectService
 from warehouse.packaging.models import (
+    JOURNALS_SESSION_KEY,
     Dependency,
     DependencyKind,
     File,
@@ -205,11 +208,75 @@ class TestCloseUploadTempfiles:
         assert body_file.close.calls == []
 
 
+class TestUploadStageTimer:
+    def test_mark(self, monkeypatch, metrics):
+        times = iter([1.0, 1.5, 3.0])
+        monkeypatch.setattr(legacy.time, "perf_counter", lambda: next(times))
+
+        stages = legacy._UploadStageTimer(metrics, "sdist")
+        stages.mark("one")
+        stages.mark("two")
+
+        assert metrics.histogram.calls == [
+            pretend.call(
+                "warehouse.upload.stage.duration",
+                500.0,
+                tags=["stage:one", "filetype:sdist"],
+            ),
+            pretend.call(
+                "warehouse.upload.stage.duration",
+                1500.0,
+                tags=["stage:two", "filetype:sdist"],
+            ),
+        ]
+
+
 class TestFileValidation:
     def test_open_dist_file_rejects_unsupported_extension(self):
         with pytest.raises(ValueError, match="Unsupported distribution file"):
             legacy._open_dist_file("test.exe", ExitStack())
 
+    def test_open_dist_file_zip(self, tmpdir):
+        f = str(tmpdir.join("test.whl"))
+        with zipfile.ZipFile(f, "w") as zfp:
+            zfp.writestr("test-1.0.dist-info/WHEEL", "")
+
+        with ExitStack() as stack:
+            archive = legacy._open_dist_file(f, stack)
+
+            assert isinstance(archive, zipfile.ZipFile)
+            assert archive.namelist() == ["test-1.0.dist-info/WHEEL"]
+
+    def test_open_dist_file_tar(self, tmpdir):
+        f = str(tmpdir.join("test.tar.gz"))
+        with tarfile.open(f, "w:gz") as tar:
+            tar.addfile(tarfile.TarInfo("test-1.0/PKG-INFO"), io.BytesIO(b""))
+
+        with ExitStack() as stack:
+            archive = legacy._open_dist_file(f, stack)
+
+            assert isinstance(archive, tarfile.TarFile)
+            assert archive.getnames() == ["test-1.0/PKG-INFO"]
+
+    def test_open_dist_file_empty(self, tmpdir):
+        f = str(tmpdir.join("test.whl"))
+        open(f, "wb").close()
+
+        with ExitStack() as stack, pytest.raises(zipfile.BadZipFile):
+            legacy._open_dist_file(f, stack)
+
+    def test_update_hashes(self):
+        hashers = [hashlib.sha256(), hashlib.md5(usedforsecurity=False)]
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            legacy._update_hashes(hashers, b"some data", executor)
+            legacy._update_hashes(hashers, b" and more", executor)
+
+        assert [h.hexdigest() for h in hashers] == [
+            hashlib.sha256(b"some data and more").hexdigest(),
+            hashlib.md5(b"some data and more", usedforsecurity=False).hexdigest(),
+        ]
+
     def test_defaults_to_true(self):
         assert legacy._is_valid_dist_file("", "", NullMetrics()) == (True, None)
 
@@ -483,6 +550,32 @@ class TestFileValidation:
             "Content not allowed.",
         )
 
+    @pytest.mark.parametrize("filetype", ["bdist_wheel", "sdist"])
+    def test_yara_scan_uses_verdict_cache(self, tmpdir, monkeypatch, filetype):
+        if filetype == "bdist_wheel":
+            f = str(tmpdir.join("test-1.0-py3-none-any.whl"))
+            with zipfile.ZipFile(f, "w") as zfp:
+                zfp.writestr("test-1.0.dist-info/WHEEL", b"Wheel-Version: 1.0")
+                zfp.writestr("pkg/__init__.py", b"content")
+        else:
+            f = str(tmpdir.join("test.tar.gz"))
+            data_file = str(tmpdir.join("dummy_data"))
+            with open(data_file, "wb") as fp:
+                fp.write(b"content")
+            with tarfile.open(f, "w:gz") as tar:
+                tar.add(data_file, arcname="package/PKG-INFO")
+                tar.add(data_file, arcname="package/__init__.py")
+
+        verdict_cache = pretend.stub()
+        check_members = pretend.call_recorder(lambda *a, **kw: None)
+        monkeypatch.setattr("warehouse.utils.scanner.check_members", check_members)
+
+        assert legacy._is_valid_dist_file(
+            f, filetype, NullMetrics(), verdict_cache=verdict_cache
+        ) == (True, None)
+        assert len(check_members.calls) == 1
+        assert check_members.calls[0].kwargs["verdict_cache"] is verdict_cache
+
     def test_scan_disabled_skips_yara_in_wheel(self, tmpdir, monkeypatch):
         f = str(tmpdir.join("test-1.0-py3-none-any.whl"))
         with zipfile.ZipFile(f, "w") as zfp:
@@ -1244,6 +1337,7 @@ class TestFileUpload:
 
         assert resp.status_code == 200
         assert db_request.find_service.calls == [
+            pretend.call(IVerdictCache),
             pretend.call(IIntegrityService, context=None),
             pretend.call(IFileStorage, name="archive"),
         ]
@@ -1350,6 +1444,7 @@ class TestFileUpload:
 
         assert db_request.metrics.increment.calls == [
             pretend.call("warehouse.upload.attempt"),
+            pretend.call("warehouse.readme.render.cache_miss"),
             pretend.call("warehouse.upload.ok", tags=["filetype:sdist"]),
         ]
 
@@ -3121,6 +3216,7 @@ class TestFileUpload:
 
         assert resp.status_code == 200
         assert db_request.find_service.calls == [
+            pretend.call(IVerdictCache),
             pretend.call(IIntegrityService, context=None),
             pretend.call(IFileStorage, name="archive"),
         ]
@@ -3470,6 +3566,7 @@ class TestFileUpload:
 
         assert resp.status_code == 200
         assert db_request.find_service.calls == [
+            pretend.call(IVerdictCache),
             pretend.call(IIntegrityService, context=None),
             pretend.call(IFileStorage, name="archive"),
         ]
@@ -6862,37 +6959,22 @@ def test_missing_trailing_slash_redirect(pyramid_request):
     assert resp.headers["Location"] == "/legacy/"
 
 
-class TestFileUploadAdvisoryLockTiming:
+class TestFileUploadJournalSequencing:
     """
-    Tests that JournalEntries are isolated from other flush operations,
-    minimizing advisory lock hold time and preventing deadlocks.
-
-    The ensure_monotonic_journals listener acquires a global advisory lock
-    whenever a JournalEntry is flushed. If JournalEntries are flushed
-    alongside other objects (File INSERT, etc.), the advisory lock is held
-    while those other operations execute, which can deadlock with concurrent
-    transactions waiting for the same advisory lock.
-
-    The fix: ensure_monotonic_journals automatically defers JournalEntries
-    to a separate flush cycle when other objects are also pending, so the
-    advisory lock is only held during the JournalEntry-only flush.
+    Tests that uploads don't take the journal lock while they do their work.
+
+    ensure_monotonic_journals only takes the global advisory lock that keeps
+    journal serials monotonic when the transaction commits, so concurrent
+    uploads don't serialize through it for the whole request.
     """
 
-    def test_journal_entries_deferred_until_final_flush(
+    def test_journal_lock_not_taken_during_upload(
         self,
         tmpdir,
         monkeypatch,
         pyramid_config,
         db_request,
     ):
-        """Verify that JournalEntries are automatically separated from other
-        objects into their own flush cycle, and only appear after storage upload.
-
-        ensure_monotonic_journals expunges JournalEntries when other objects
-        are pending in the same flush, then re-adds them via after_flush for a
-        subsequent flush cycle. This ensures the advisory lock is only acquired
-        in a flush containing exclusively JournalEntries.
-        """
         monkeypatch.setattr(tempfile, "tempdir", str(tmpdir))
 
         user = UserFactory.create()
@@ -6925,13 +7007,7 @@ class TestFileUploadAdvisoryLockTiming:
             }
         )
 
-        # Track storage calls to know when S3 upload happened relative to flushes
-        storage_calls = []
-
-        def track_store(path, filepath, meta):
-            storage_calls.append(path)
-
-        storage_service = pretend.stub(store=track_store)
+        storage_service = pretend.stub(store=lambda path, filepath, meta: None)
         db_request.find_service = pretend.call_recorder(
             lambda svc, name=None, context=None: {
                 IFileStorage: storage_service,
@@ -6943,59 +7019,22 @@ class TestFileUploadAdvisoryLockTiming:
         delay = pretend.call_recorder(lambda a: None)
         db_request.task = pretend.call_recorder(lambda a: pretend.stub(delay=delay))
 
-        # Track what's actually in the session when each flush executes.
-        flush_log = []
+        statements = []
 
-        @event.listens_for(db_request.db, "before_flush")
-        def log_flush_contents(session, flush_context, instances):
-            flush_log.append(
-                {
-                    "new_types": sorted(type(o).__name__ for o in session.new),
-                    "has_journal": any(
-                        isinstance(obj, JournalEntry) for obj in session.new
-                    ),
-                    "storage_uploaded": len(storage_calls) > 0,
-                }
-            )
+        @event.listens_for(db_request.db.connection(), "before_cursor_execute")
+        def log_statement(conn, cursor, statement, *args):
+            statements.append(statement)
 
         resp = legacy.file_upload(db_request)
 
         assert resp.status_code == 200
-        assert storage_calls, "Expected at least one storage.store() call"
+        assert not any("pg_advisory_xact_lock" in s for s in statements)
 
-        # The ensure_monotonic_journals listener defers JournalEntries when
-        # other objects are also pending. They're re-added to session.new
-        # via after_flush and flushed in a subsequent cycle (normally at
-        # commit time via zope.sqlalchemy). Trigger that flush here.
+        # The journal entries are waiting to be given their serial on commit.
         db_request.db.flush()
-
-        # Find flushes that contain JournalEntry
-        journal_flushes = [f for f in flush_log if f["has_journal"]]
-        assert journal_flushes, "Expected at least one flush containing a JournalEntry"
-
-        # The key assertion: every flush that contains a JournalEntry must
-        # happen AFTER the storage upload.
-        for f in journal_flushes:
-            assert f["storage_uploaded"], (
-                "JournalEntry was flushed BEFORE storage upload completed. "
-                "This means the advisory lock (from ensure_monotonic_journals) "
-                "would be held through the entire S3 upload, "
-                "serializing all concurrent uploads. "
-                f"Flush log: {flush_log}"
-            )
-
-        # The JournalEntry flush must NOT also contain File or other
-        # non-JournalEntry objects. ensure_monotonic_journals should
-        # automatically separate them to prevent deadlocks.
-        for f in journal_flushes:
-            non_journal_types = [
-                t for t in f["new_types"] if t != JournalEntry.__name__
-            ]
-            assert not non_journal_types, (
-                "JournalEntry was flushed alongside other objects: "
-                f"{non_journal_types}. ensure_monotonic_journals should "
-                "automatically defer JournalEntries to a separate flush cycle "
-                "to prevent deadlocks from holding the advisory lock while "
-                "other INSERT/UPDATE operations execute. "
-                f"Flush log: {flush_log}"
-            )
+        assert [
+            (je.name, je.action) for je in db_request.db.info[JOURNALS_SESSION_KEY]
+        ] == [
+            (project.name, "new release"),
+            (project.name, f"add source file {filename}"),
+        ]
@@ -1,9 +1,11 @@
 # SPDX-License-Identifier: Apache-2.0
 
+import orjson
 import pytest
 
 from pyramid.httpexceptions import HTTPMovedPermanently, HTTPNotFound
 
+from warehouse.cache.interfaces import IDocumentCache
 from warehouse.legacy.api import json
 from warehouse.packaging.models import LifecycleStatus, ReleaseURL
 
@@ -41,6 +43,55 @@ def _assert_same_calls(actual, expected):
     assert all(c in actual for c in expected)
 
 
+class TestCachedJSONData:
+    @pytest.mark.parametrize(
+        ("all_releases", "version"),
+        [(True, ""), (False, "1.0")],
+    )
+    def test_miss_stores_document(self, db_request, mocker, all_releases, version):
+        project = ProjectFactory.create()
+        release = ReleaseFactory.create(project=project, version="1.0")
+        data = {"info": {"name": project.name}}
+        json_data = mocker.patch.object(
+            json, "_json_data", autospec=True, return_value=data
+        )
+        document_cache = db_request.find_service(IDocumentCache)
+        set_ = mocker.spy(document_cache, "set")
+
+        result = json._cached_json_data(
+            db_request, project, release, all_releases=all_releases
+        )
+
+        assert result is data
+        json_data.assert_called_once_with(
+            db_request, project, release, all_releases=all_releases
+        )
+        key = f"legacy-json/{project.normalized_name}/{version}/{project.last_serial}"
+        set_.assert_called_once_with(
+            key,
+            orjson.dumps(data, option=orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE),
+            tags=[f"project/{project.normalized_name}"],
+        )
+        assert document_cache.get(key) is not None
+
+    def test_hit_returns_document(self, db_request, mocker):
+        project = ProjectFactory.create()
+        release = ReleaseFactory.create(project=project, version="1.0")
+        json_data = mocker.patch.object(json, "_json_data", autospec=True)
+        document_cache = db_request.find_service(IDocumentCache)
+        document_cache.set(
+            f"legacy-json/{project.normalized_name}//{project.last_serial}",
+            b'{"cached":true}\n',
+        )
+
+        result = json._cached_json_data(db_request, project, release, all_releases=True)
+
+        assert result is db_request.response
+        assert result.body == b'{"cached":true}\n'
+        assert result.content_type == "application/json"
+        json_data.assert_not_called()
+
+
 class TestLatestReleaseFactory:
     def test_missing_release(self, db_request):
         project = ProjectFactory.create()
@@ -16,6 +16,7 @@ from warehouse.legacy.api.xmlrpc.cache import (
     RedisLru,
     RedisXMLRPCCache,
     cached_return_view,
+    fncache,
     services,
 )
 from warehouse.legacy.api.xmlrpc.cache.fncache import StubMetricReporter
@@ -265,7 +266,7 @@ class TestRedisLru:
         down_redis = mocker.create_autospec(redis.StrictRedis, instance=True)
         down_redis.hget.side_effect = redis.exceptions.RedisError
         down_redis.pipeline.side_effect = redis.exceptions.RedisError
-        down_redis.scan_iter.side_effect = redis.exceptions.RedisError
+        down_redis.spop.side_effect = redis.exceptions.RedisError
         redis_lru = RedisLru(down_redis, metric_reporter=metrics)
 
         expected = func_test(0, 1, kwarg0=2, kwarg1=3)
@@ -289,6 +290,102 @@ class TestRedisLru:
             mocker.call("warehouse.lru.cache.error"),  # Failed purge
         ]
 
+    def test_redis_purge_only_touches_tagged_keys(self, mockredis, mocker):
+        redis_lru = RedisLru(mockredis)
+        other_func = mocker.Mock(return_value=[], __name__="other_func")
+
+        redis_lru.fetch(func_test, [0, 1], {}, None, "project/foo", None)
+        redis_lru.fetch(other_func, [0, 1], {}, None, "project/foo", None)
+        redis_lru.fetch(func_test, [0, 1], {}, None, "project/bar", None)
+        assert mockredis.cache["lru-index:project/foo"] == {
+            "lru:project/foo:func_test",
+            "lru:project/foo:other_func",
+        }
+
+        redis_lru.purge("project/foo")
+
+        assert set(mockredis.cache) == {
+            "lru-index:project/foo",  # Left empty by our fake SPOP
+            "lru:project/bar:func_test",
+            "lru-index:project/bar",
+        }
+        assert mockredis.cache["lru-index:project/foo"] == set()
+
+    def test_redis_purge_in_batches(self, mockredis, mocker):
+        mocker.patch.object(fncache, "PURGE_BATCH_SIZE", 1)
+        unlink = mocker.spy(mockredis, "unlink")
+        redis_lru = RedisLru(mockredis)
+        other_func = mocker.Mock(return_value=[], __name__="other_func")
+
+        redis_lru.fetch(func_test, [0, 1], {}, None, "test", None)
+        redis_lru.fetch(other_func, [0, 1], {}, None, "test", None)
+        unlink.reset_mock()
+        redis_lru.purge("test")
+
+        assert sorted(c.args for c in unlink.call_args_list) == [
+            ("lru:test:func_test",),
+            ("lru:test:other_func",),
+        ]
+        assert not any(key.startswith("lru:test:") for key in mockredis.cache)
+
+    def test_waits_for_concurrent_miss(self, metrics, mockredis, mocker):
+        func = mocker.Mock(return_value=["computed"], __name__="func")
+        redis_lru = RedisLru(mockredis, metric_reporter=metrics)
+        # Someone else is already computing this key.
+        mockredis.set("lru:test:func:key:lock", b"", nx=True)
+
+        def sleep(_seconds):
+            # ...and fills the cache in while we wait on them.
+            mockredis.hset("lru:test:func", "key", b'["cached"]')
+
+        mocker.patch.object(fncache.time, "sleep", side_effect=sleep)
+
+        assert redis_lru.fetch(func, [], {}, "key", "test", None) == ["cached"]
+        func.assert_not_called()
+        assert metrics.increment.call_args_list == [
+            mocker.call("warehouse.lru.cache.wait"),
+            mocker.call("warehouse.lru.cache.hit"),
+        ]
+
+    def test_wait_for_concurrent_miss_times_out(self, metrics, mockredis, mocker):
+        func = mocker.Mock(return_value=["computed"], __name__="func")
+        redis_lru = RedisLru(mockredis, metric_reporter=metrics, lock_timeout=1)
+        mockredis.set("lru:test:func:key:lock", b"", nx=True)
+        monotonic = mocker.patch.object(
+            fncache.time, "monotonic", side_effect=[0, 0.5, 1.5]
+        )
+        sleep = mocker.patch.object(fncache.time, "sleep")
+
+        assert redis_lru.fetch(func, [], {}, "key", "test", None) == ["computed"]
+        func.assert_called_once_with()
+        assert monotonic.call_count == 3
+        sleep.assert_called_once_with(fncache.LOCK_POLL_INTERVAL)
+        assert metrics.increment.call_args_list == [
+            mocker.call("warehouse.lru.cache.wait"),
+            mocker.call("warehouse.lru.cache.miss"),
+        ]
+
+    def test_releases_lock(self, mockredis):
+        redis_lru = RedisLru(mockredis)
+
+        redis_lru.fetch(func_test, [0, 1], {}, "key", "test", None)
+
+        assert "lru:test:func_test:key:lock" not in mockredis.cache
+
+    def test_lock_errors_compute(self, metrics, mocker):
+        down_redis = mocker.create_autospec(redis.StrictRedis, instance=True)
+        down_redis.hget.return_value = None
+        down_redis.set.side_effect = redis.exceptions.RedisError
+        down_redis.unlink.side_effect = redis.exceptions.RedisError
+        redis_lru = RedisLru(down_redis, metric_reporter=metrics)
+
+        expected = func_test(0, 1)
+
+        assert redis_lru.fetch(func_test, [0, 1], {}, "key", "test", None) == expected
+        assert metrics.increment.call_args_list == [
+            mocker.call("warehouse.lru.cache.miss"),
+        ]
+
 
 class TestDeriver:
     @pytest.mark.parametrize(
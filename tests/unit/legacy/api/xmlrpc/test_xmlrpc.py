@@ -1,6 +1,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import datetime
+import xmlrpc.client as xmlrpclib
 
 import pytest
 
@@ -321,7 +322,45 @@ def test_changelog_since_serial(db_request):
 
     serial = entries[int(len(entries) / 2) - 1].id
 
-    assert xmlrpc.changelog_since_serial(db_request, serial) == expected
+    resp = xmlrpc.changelog_since_serial(db_request, serial)
+
+    assert resp.content_type == "text/xml"
+    assert resp.body == xmlrpclib.dumps(
+        (expected,), methodresponse=True, allow_none=True
+    ).encode("utf8")
+
+
+def test_changelog_since_serial_streams_partitions(db_request, monkeypatch):
+    monkeypatch.setattr(xmlrpc, "_CHANGELOG_PARTITION_SIZE", 2)
+    entries = JournalEntryFactory.create_batch(
+        5, name=ProjectFactory.create().name, action="add <thing> & \x0bstuff"
+    )
+
+    resp = xmlrpc.changelog_since_serial(db_request, entries[0].id - 1)
+
+    # The response is built from one chunk per partition, plus its framing.
+    assert len(resp.app_iter) == 5
+    assert xmlrpclib.loads(resp.body) == (
+        (
+            [
+                [
+                    e.name,
+                    e.version,
+                    int(e.submitted_date.replace(tzinfo=datetime.UTC).timestamp()),
+                    "add <thing> & stuff",
+                    e.id,
+                ]
+                for e in entries
+            ],
+        ),
+        None,
+    )
+
+
+def test_changelog_since_serial_empty(db_request):
+    resp = xmlrpc.changelog_since_serial(db_request, 0)
+
+    assert xmlrpclib.loads(resp.body) == (([],), None)
 
 
 def test_changelog(pyramid_request):
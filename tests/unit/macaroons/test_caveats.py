@@ -25,6 +25,7 @@ from warehouse.macaroons.caveats import (
     deserialize,
     serialize,
     verify,
+    verify_caveats,
 )
 from warehouse.macaroons.caveats._core import _CaveatRegistry
 from warehouse.oidc.utils import PublisherTokenContext
@@ -497,3 +498,48 @@ class TestVerification:
         )
         assert not status
         assert status.msg == "unknown error"
+
+
+class TestCaveatVerification:
+    def test_no_caveats(self, mocker):
+        m = Macaroon(location="somewhere", identifier="something", key=b"a secure key")
+        status = verify_caveats(
+            m,
+            mocker.sentinel.request,
+            mocker.sentinel.context,
+            mocker.sentinel.permission,
+        )
+        assert status
+        assert status.msg == "signature and caveats OK"
+
+    def test_caveat_returns_false(self, mocker):
+        now = int(time.time())
+        m = Macaroon(location="somewhere", identifier="something", key=b"a secure key")
+        m.add_first_party_caveat(serialize(Expiration(expires_at=10, not_before=0)))
+        m.add_first_party_caveat(
+            serialize(Expiration(expires_at=now + 1000, not_before=now - 1000))
+        )
+        m.add_first_party_caveat(b"[]")
+        status = verify_caveats(
+            m,
+            mocker.sentinel.request,
+            mocker.sentinel.context,
+            mocker.sentinel.permission,
+        )
+        assert not status
+        assert status.msg == "token is expired, caveat array cannot be empty"
+
+    def test_valid_caveat(self, mocker):
+        now = int(time.time())
+        m = Macaroon(location="somewhere", identifier="something", key=b"a secure key")
+        m.add_first_party_caveat(
+            serialize(Expiration(expires_at=now + 1000, not_before=now - 1000))
+        )
+        status = verify_caveats(
+            m,
+            mocker.sentinel.request,
+            mocker.sentinel.context,
+            mocker.sentinel.permission,
+        )
+        assert status
+        assert status.msg == "signature and caveats OK"
@@ -2,11 +2,14 @@
 
 import binascii
 import struct
+import time
 
 from uuid import uuid4
 
+import pretend
 import pymacaroons
 import pytest
+import redis
 
 from pymacaroons.exceptions import MacaroonDeserializationException
 
@@ -18,9 +21,15 @@ from ...common.db.accounts import UserFactory
 from ...common.db.oidc import GitHubPublisherFactory
 
 
-def test_database_macaroon_factory(db_request):
+def test_database_macaroon_factory(db_request, mocker):
+    db_request.registry.settings["db_results_cache.url"] = "redis://"
+    shared_redis_client = mocker.patch.object(services, "_shared_redis_client")
+
     service = services.database_macaroon_factory(None, db_request)
+
     assert service.db is db_request.db
+    assert service.redis_client is shared_redis_client.return_value
+    shared_redis_client.assert_called_once_with("redis://")
 
 
 class TestDatabaseMacaroonService:
@@ -29,6 +38,8 @@ class TestDatabaseMacaroonService:
         service = services.DatabaseMacaroonService(session)
 
         assert service.db is session
+        assert service.redis_client is None
+        assert service.verified_ttl == services.VERIFIED_TTL
 
     @pytest.mark.parametrize(
         ("raw_macaroon", "result"),
@@ -365,3 +376,197 @@ class TestDatabaseMacaroonService:
                 [{"version": 1, "permissions": "user"}],
                 user_id=user.id,
             )
+
+
+class TestCachedDatabaseMacaroonService:
+    @pytest.fixture
+    def macaroon_service(self, db_session, mockredis):
+        return services.DatabaseMacaroonService(db_session, mockredis)
+
+    @pytest.fixture
+    def raw_macaroon(self, macaroon_service):
+        user = UserFactory.create()
+        raw_macaroon, _ = macaroon_service.create_macaroon(
+            "fake location",
+            "fake description",
+            [caveats.RequestUser(user_id=str(user.id))],
+            user_id=user.id,
+        )
+        return raw_macaroon
+
+    def test_verify_caches_verification(self, mocker, macaroon_service, raw_macaroon):
+        mocker.patch.object(caveats, "verify", autospec=True, return_value=True)
+        mocker.patch.object(caveats, "verify_caveats", autospec=True, return_value=True)
+        find_macaroon = mocker.spy(macaroon_service, "find_macaroon")
+
+        request = mocker.sentinel.request
+        context = mocker.sentinel.context
+        permissions = mocker.sentinel.permissions
+
+        assert macaroon_service.verify(raw_macaroon, request, context, permissions)
+        assert macaroon_service.verify(raw_macaroon, request, context, permissions)
+
+        assert find_macaroon.call_count == 1
+        caveats.verify.assert_called_once_with(
+            mocker.ANY, mocker.ANY, request, context, permissions
+        )
+        caveats.verify_caveats.assert_called_once_with(
+            mocker.ANY, request, context, permissions
+        )
+
+    def test_verify_cached_caveats_fail(self, mocker, macaroon_service, raw_macaroon):
+        mocker.patch.object(caveats, "verify", autospec=True, return_value=True)
+        mocker.patch.object(
+            caveats,
+            "verify_caveats",
+            autospec=True,
+            return_value=WarehouseDenied("foo"),
+        )
+
+        args = (mocker.sentinel.request, mocker.sentinel.context, mocker.sentinel.perm)
+        assert macaroon_service.verify(raw_macaroon, *args)
+        with pytest.raises(services.InvalidMacaroonError, match="foo"):
+            macaroon_service.verify(raw_macaroon, *args)
+
+    def test_verify_does_not_cache_failures(
+        self, mocker, macaroon_service, raw_macaroon
+    ):
+        verify = mocker.patch.object(
+            caveats, "verify", autospec=True, return_value=WarehouseDenied("foo")
+        )
+
+        args = (mocker.sentinel.request, mocker.sentinel.context, mocker.sentinel.perm)
+        for _ in range(2):
+            with pytest.raises(services.InvalidMacaroonError, match="foo"):
+                macaroon_service.verify(raw_macaroon, *args)
+
+        assert verify.call_count == 2
+
+    def test_verify_cache_is_per_serialization(
+        self, mocker, macaroon_service, raw_macaroon
+    ):
+        mocker.patch.object(caveats, "verify", autospec=True, return_value=True)
+
+        m = services.deserialize_raw_macaroon(raw_macaroon)
+        args = (mocker.sentinel.request, mocker.sentinel.context, mocker.sentinel.perm)
+        assert macaroon_service.verify(raw_macaroon, *args)
+
+        # Dropping the caveats, while keeping the signature, must not be able to
+        # reuse the earlier verification.
+        stripped = pymacaroons.Macaroon(
+            location=m.location,
+            identifier=m.identifier,
+            key=b"not the key",
+            version=pymacaroons.MACAROON_V2,
+        )
+        stripped.signature = m.signature
+        assert macaroon_service.verify(f"pypi-{stripped.serialize()}", *args)
+
+        assert caveats.verify.call_count == 2
+
+    def test_verify_cache_expires(self, mocker, macaroon_service, raw_macaroon):
+        mocker.patch.object(caveats, "verify", autospec=True, return_value=True)
+        args = (mocker.sentinel.request, mocker.sentinel.context, mocker.sentinel.perm)
+
+        assert macaroon_service.verify(raw_macaroon, *args)
+        mocker.patch.object(
+            services.time, "time", return_value=time.time() + services.VERIFIED_TTL
+        )
+        assert macaroon_service.verify(raw_macaroon, *args)
+
+        assert caveats.verify.call_count == 2
+
+    def test_delete_macaroon_invalidates(
+        self, mocker, macaroon_service, mockredis, raw_macaroon
+    ):
+        mocker.patch.object(caveats, "verify", autospec=True, return_value=True)
+        args = (mocker.sentinel.request, mocker.sentinel.context, mocker.sentinel.perm)
+        macaroon_id = services.deserialize_raw_macaroon(raw_macaroon).identifier
+        key = f"macaroons:verified:{macaroon_id.decode()}"
+
+        assert macaroon_service.verify(raw_macaroon, *args)
+        macaroon_service.delete_macaroon(macaroon_id.decode())
+
+        # The cached verification is only dropped once the deletion commits,
+        # but it's already ignored by the transaction that deleted it.
+        assert mockredis.hgetall(key)
+        assert macaroon_service.db.info[services.DELETED_SESSION_KEY] == {
+            macaroon_id.decode()
+        }
+        with pytest.raises(
+            services.InvalidMacaroonError, match="deleted or nonexistent macaroon"
+        ):
+            macaroon_service.verify(raw_macaroon, *args)
+
+        config = pretend.stub(
+            registry=pretend.stub(settings={"db_results_cache.url": "redis://"})
+        )
+        mocker.patch.object(services, "_shared_redis_client", return_value=mockredis)
+        services.drop_deleted_verifications(config, macaroon_service.db)
+
+        assert not mockredis.hgetall(key)
+        assert services.DELETED_SESSION_KEY not in macaroon_service.db.info
+
+    def test_drop_deleted_verifications_nothing_deleted(self, mocker):
+        shared_redis_client = mocker.patch.object(services, "_shared_redis_client")
+        session = pretend.stub(info={})
+
+        services.drop_deleted_verifications(pretend.stub(), session)
+
+        assert not shared_redis_client.called
+
+    def test_drop_deleted_verifications_redis_down(self, mocker):
+        redis_client = mocker.Mock()
+        redis_client.unlink.side_effect = redis.exceptions.ConnectionError
+        mocker.patch.object(services, "_shared_redis_client", return_value=redis_client)
+        config = pretend.stub(
+            registry=pretend.stub(settings={"db_results_cache.url": "redis://"})
+        )
+        session = pretend.stub(info={services.DELETED_SESSION_KEY: {"some-id"}})
+
+        services.drop_deleted_verifications(config, session)
+
+        redis_client.unlink.assert_called_once_with("macaroons:verified:some-id")
+        assert session.info == {}
+
+    def test_verify_buffers_last_used(
+        self, mocker, macaroon_service, mockredis, raw_macaroon
+    ):
+        mocker.patch.object(caveats, "verify", autospec=True, return_value=True)
+        mocker.patch.object(services.time, "time", return_value=1234.5)
+        macaroon_id = services.deserialize_raw_macaroon(raw_macaroon).identifier
+        dm = macaroon_service.find_macaroon(macaroon_id.decode())
+
+        assert macaroon_service.verify(
+            raw_macaroon,
+            mocker.sentinel.request,
+            mocker.sentinel.context,
+            mocker.sentinel.perm,
+        )
+
+        assert mockredis.hgetall(services.LAST_USED_KEY) == {
+            macaroon_id.decode(): 1234.5
+        }
+        assert dm.last_used is None
+
+    def test_verify_redis_down(self, mocker, db_session, raw_macaroon):
+        redis_client = mocker.Mock()
+        redis_client.hget.side_effect = redis.exceptions.ConnectionError
+        redis_client.hset.side_effect = redis.exceptions.ConnectionError
+        redis_client.pipeline.side_effect = redis.exceptions.ConnectionError
+        macaroon_service = services.DatabaseMacaroonService(db_session, redis_client)
+        mocker.patch.object(caveats, "verify", autospec=True, return_value=True)
+
+        macaroon_id = services.deserialize_raw_macaroon(raw_macaroon).identifier
+        dm = macaroon_service.find_macaroon(macaroon_id.decode())
+
+        assert macaroon_service.verify(
+            raw_macaroon,
+            mocker.sentinel.request,
+            mocker.sentinel.context,
+            mocker.sentinel.perm,
+        )
+
+        # Without the buffer, the use is written straight to the database.
+        db_session.refresh(dm)
+        assert dm.last_used is not None
@@ -0,0 +1,73 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import datetime
+
+import pytest
+
+from warehouse.macaroons import tasks
+from warehouse.macaroons.services import LAST_USED_KEY
+
+from ...common.db.accounts import UserFactory
+from ...common.db.macaroons import MacaroonFactory
+
+
+class TestFlushLastUsed:
+    @pytest.fixture
+    def redis_client(self, db_request, mockredis, mocker):
+        db_request.registry.settings["db_results_cache.url"] = "redis://"
+        mocker.patch.object(tasks.redis.StrictRedis, "from_url", return_value=mockredis)
+        return mockredis
+
+    def test_nothing_buffered(self, db_request, redis_client):
+        tasks.flush_last_used(db_request)
+
+        assert redis_client.cache == {}
+
+    def test_flushes_buffered_uses(self, db_request, redis_client):
+        user = UserFactory.create()
+        never_used = MacaroonFactory.create(user_id=user.id)
+        used_earlier = MacaroonFactory.create(
+            user_id=user.id, last_used=datetime.datetime(2024, 1, 1)
+        )
+        used_later = MacaroonFactory.create(
+            user_id=user.id, last_used=datetime.datetime(2030, 1, 1)
+        )
+        untouched = MacaroonFactory.create(user_id=user.id)
+
+        last_used = datetime.datetime(2025, 1, 1)
+        for macaroon in [never_used, used_earlier, used_later]:
+            redis_client.hset(
+                LAST_USED_KEY, str(macaroon.id).encode(), str(last_used.timestamp())
+            )
+
+        tasks.flush_last_used(db_request)
+
+        for macaroon in [never_used, used_earlier, used_later, untouched]:
+            db_request.db.refresh(macaroon)
+        assert never_used.last_used == last_used
+        assert used_earlier.last_used == last_used
+        # A use that is older than the one we already have isn't written.
+        assert used_later.last_used == datetime.datetime(2030, 1, 1)
+        assert untouched.last_used is None
+        assert redis_client.cache == {}
+
+    def test_retries_unfinished_flush(self, db_request, redis_client):
+        user = UserFactory.create()
+        unfinished = MacaroonFactory.create(user_id=user.id)
+        pending = MacaroonFactory.create(user_id=user.id)
+
+        last_used = datetime.datetime(2025, 1, 1)
+        redis_client.hset(
+            tasks.LAST_USED_FLUSHING_KEY, str(unfinished.id), last_used.timestamp()
+        )
+        redis_client.hset(LAST_USED_KEY, str(pending.id), last_used.timestamp())
+
+        tasks.flush_last_used(db_request)
+
+        db_request.db.refresh(unfinished)
+        db_request.db.refresh(pending)
+        assert unfinished.last_used == last_used
+        assert pending.last_used is None
+        assert redis_client.hgetall(LAST_USED_KEY) == {
+            str(pending.id): last_used.timestamp()
+        }
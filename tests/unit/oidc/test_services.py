@@ -45,6 +45,10 @@ def test_oidc_publisher_service_factory(metrics):
     assert service.audience == "fakeaudience"
     assert service.cache_url == "rediss://another.example.com"
     assert service.metrics == metrics
+    assert service.jwk_cache is factory.jwk_cache
+
+    # Services created by the same factory share its Redis client.
+    assert factory(pretend.stub(), request).redis is service.redis
 
     assert factory != object()
     assert factory != services.OIDCPublisherServiceFactory(
@@ -721,7 +725,12 @@ class TestOIDCPublisherService:
         assert isinstance(key, PyJWK)
         assert key.key_id == "fake-key-id"
 
-        assert metrics.increment.calls == []
+        assert metrics.increment.calls == [
+            pretend.call(
+                "warehouse.oidc.get_key.cache_miss",
+                tags=["publisher:example", "issuer_url:https://example.com"],
+            )
+        ]
 
     def test_get_key_uncached(self, metrics, monkeypatch):
         service = services.OIDCPublisherService(
@@ -752,7 +761,52 @@ class TestOIDCPublisherService:
         assert isinstance(key, PyJWK)
         assert key.key_id == "fake-key-id"
 
-        assert metrics.increment.calls == []
+        assert metrics.increment.calls == [
+            pretend.call(
+                "warehouse.oidc.get_key.cache_miss",
+                tags=["publisher:example", "issuer_url:https://example.com"],
+            )
+        ]
+
+    def test_get_key_memoized(self, metrics, monkeypatch):
+        service = services.OIDCPublisherService(
+            session=pretend.stub(),
+            publisher="example",
+            issuer_url="https://example.com",
+            audience="fakeaudience",
+            cache_url="rediss://fake.example.com",
+            metrics=metrics,
+        )
+
+        keyset = {
+            "fake-key-id": {
+                "kid": "fake-key-id",
+                "n": "ZHVtbXkK",
+                "kty": "RSA",
+                "alg": "RS256",
+                "e": "AQAB",
+                "use": "sig",
+                "x5c": ["dummy"],
+                "x5t": "dummy",
+            }
+        }
+        get_keyset = pretend.call_recorder(lambda issuer_url=None: (keyset, True))
+        monkeypatch.setattr(service, "_get_keyset", get_keyset)
+
+        key = service._get_key("fake-key-id", "https://example.com")
+        assert service._get_key("fake-key-id", "https://example.com") is key
+
+        assert get_keyset.calls == [pretend.call("https://example.com")]
+        assert metrics.increment.calls == [
+            pretend.call(
+                "warehouse.oidc.get_key.cache_miss",
+                tags=["publisher:example", "issuer_url:https://example.com"],
+            ),
+            pretend.call(
+                "warehouse.oidc.get_key.cache_hit",
+                tags=["publisher:example", "issuer_url:https://example.com"],
+            ),
+        ]
 
     def test_get_key_refresh_fails(self, metrics, monkeypatch):
         service = services.OIDCPublisherService(
@@ -774,6 +828,10 @@ class TestOIDCPublisherService:
             service._get_key("fake-key-id", "https://example.com")
 
         assert metrics.increment.calls == [
+            pretend.call(
+                "warehouse.oidc.get_key.cache_miss",
+                tags=["publisher:example", "issuer_url:https://example.com"],
+            ),
             pretend.call(
                 "warehouse.oidc.get_key.error",
                 tags=[
@@ -781,7 +839,7 @@ class TestOIDCPublisherService:
                     "key_id:fake-key-id",
                     "issuer_url:https://example.com",
                 ],
-            )
+            ),
         ]
 
     def test_get_key_id_fails_with_empty_jwt(self, monkeypatch):
@@ -1017,6 +1075,23 @@ class TestOIDCPublisherService:
         assert service.jwt_identifier_exists(jwt_identifier) is False
 
 
+class TestJWKCache:
+    def test_get_set(self, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(services.time, "monotonic", lambda: now)
+        cache = services.JWKCache(ttl=60)
+        key = pretend.stub()
+
+        assert cache.get("https://example.com", "fake-key-id") is None
+        cache.set("https://example.com", "fake-key-id", key)
+        assert cache.get("https://example.com", "fake-key-id") is key
+        assert cache.get("https://other.example.com", "fake-key-id") is None
+
+        now += 60
+        assert cache.get("https://example.com", "fake-key-id") is None
+        assert cache._entries == {}
+
+
 class TestNullOIDCPublisherService:
     def test_interface_matches(self):
         assert verifyClass(
@@ -19,7 +19,9 @@ from warehouse.packaging.services import project_service_factory
 from warehouse.packaging.tasks import (
     check_file_cache_tasks_outstanding,
     reconcile_file_storages,
+    refresh_top_dependents_corpus,
     update_description_html,
+    update_simple_index,
 )
 
 
@@ -162,10 +164,18 @@ def test_includeme(monkeypatch, mocker):
         mocker.call(crontab(minute="*/15"), reconcile_file_storages)
         in config.add_periodic_task.call_args_list
     )
+    assert (
+        mocker.call(crontab(minute="*/15"), refresh_top_dependents_corpus)
+        in config.add_periodic_task.call_args_list
+    )
     assert (
         mocker.call(crontab(minute="*/5"), update_description_html)
         in config.add_periodic_task.call_args_list
     )
+    assert (
+        mocker.call(crontab(minute="*/1"), update_simple_index)
+        in config.add_periodic_task.call_args_list
+    )
     assert (
         mocker.call(crontab(minute="*/5"), update_role_invitation_status)
         in config.add_periodic_task.call_args_list
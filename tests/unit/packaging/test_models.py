@@ -7,21 +7,31 @@ import pytest
 
 from pyramid.authorization import Allow, Authenticated
 from pyramid.location import lineage
+from sqlalchemy import delete, event, func, select, update
 
 from warehouse.authnz import Permissions
 from warehouse.constants import MAX_FILESIZE, MAX_PROJECT_SIZE, ONE_GIB, ONE_MIB
 from warehouse.macaroons import caveats
 from warehouse.macaroons.models import Macaroon
 from warehouse.oidc.models import GitHubPublisher
-from warehouse.organizations.models import OrganizationType, TeamProjectRoleType
+from warehouse.organizations.models import (
+    OrganizationRole,
+    OrganizationType,
+    TeamProjectRoleType,
+)
+from warehouse.packaging import models as packaging_models
 from warehouse.packaging.models import (
+    ACL_BUMPS_SESSION_KEY,
+    JOURNALS_SESSION_KEY,
     Description,
     File,
+    JournalEntry,
     LifecycleStatus,
     Project,
     ProjectFactory,
     ProjectMacaroonWarningAssociation,
     ReleaseURL,
+    Role,
 )
 
 from ...common.db.oidc import GitHubPublisherFactory
@@ -37,6 +47,7 @@ from ...common.db.packaging import (
     DependencyFactory as DBDependencyFactory,
     FileEventFactory as DBFileEventFactory,
     FileFactory as DBFileFactory,
+    JournalEntryFactory as DBJournalEntryFactory,
     ProjectFactory as DBProjectFactory,
     ReleaseFactory as DBReleaseFactory,
     RoleFactory as DBRoleFactory,
@@ -405,6 +416,60 @@ class TestProject:
             ),
         ]
 
+    def test_acl_uses_cache(self, db_session, acl_cache_service, monkeypatch, mocker):
+        project = DBProjectFactory.create()
+        owner = DBRoleFactory.create(project=project)
+        db_session.info.pop(ACL_BUMPS_SESSION_KEY)
+
+        request = pretend.stub(find_service=lambda iface: acl_cache_service)
+        monkeypatch.setattr(packaging_models, "get_current_request", lambda: request)
+        compute = mocker.spy(Project, "_compute_acl_grants")
+
+        first = project.__acl__()
+        second = project.__acl__()
+
+        assert first == second
+        assert (Allow, f"user:{owner.user.id}", mocker.ANY) in second
+        assert compute.call_count == 1
+        assert acl_cache_service.get(str(project.id)) == (
+            0,
+            {"users": [[str(owner.user.id), "Administer"]], "oidc": []},
+        )
+
+        acl_cache_service.bump([str(project.id)])
+        project.__acl__()
+
+        assert compute.call_count == 2
+
+    def test_acl_skips_cache_with_pending_changes(
+        self, db_session, acl_cache_service, monkeypatch, mocker
+    ):
+        project = DBProjectFactory.create()
+        DBRoleFactory.create(project=project)
+
+        request = pretend.stub(find_service=lambda iface: acl_cache_service)
+        monkeypatch.setattr(packaging_models, "get_current_request", lambda: request)
+        compute = mocker.spy(Project, "_compute_acl_grants")
+
+        # The new role has been flushed, but the version bump for it won't
+        # happen until it has been committed.
+        project.__acl__()
+
+        assert compute.call_count == 1
+        assert acl_cache_service.get(str(project.id)) == (0, None)
+
+    def test_acl_without_cache_service(self, db_session, monkeypatch):
+        project = DBProjectFactory.create()
+        db_session.info.pop(ACL_BUMPS_SESSION_KEY, None)
+
+        def find_service(iface):
+            raise LookupError
+
+        request = pretend.stub(find_service=find_service)
+        monkeypatch.setattr(packaging_models, "get_current_request", lambda: request)
+
+        assert project._acl_grants() == {"users": [], "oidc": []}
+
     def test_repr(self, db_request):
         project = DBProjectFactory()
         assert isinstance(repr(project), str)
@@ -1524,3 +1589,198 @@ class TestProjectLimitProperties:
         expected = max(MAX_PROJECT_SIZE, 5000 * ONE_GIB, large_limit)
         assert project.total_size_limit_value == expected
         assert project.total_size_limit_value == large_limit
+
+
+class TestACLBumps:
+    def test_role_changes(self, db_session):
+        project = DBProjectFactory.create()
+        db_session.info.pop(ACL_BUMPS_SESSION_KEY, None)
+
+        DBRoleFactory.create(project=project)
+
+        assert db_session.info[ACL_BUMPS_SESSION_KEY] == {project.id}
+
+    def test_team_membership_changes(self, db_session):
+        team = DBTeamFactory.create()
+        project = DBProjectFactory.create()
+        DBProjectFactory.create()
+        DBTeamProjectRoleFactory.create(team=team, project=project)
+        db_session.info.pop(ACL_BUMPS_SESSION_KEY, None)
+
+        DBTeamRoleFactory.create(team=team)
+
+        assert db_session.info[ACL_BUMPS_SESSION_KEY] == {project.id}
+
+    def test_organization_owner_changes(self, db_session):
+        organization = DBOrganizationFactory.create()
+        project = DBProjectFactory.create()
+        DBOrganizationProjectFactory.create(organization=organization, project=project)
+        db_session.info.pop(ACL_BUMPS_SESSION_KEY, None)
+
+        DBOrganizationRoleFactory.create(organization=organization)
+
+        assert db_session.info[ACL_BUMPS_SESSION_KEY] == {project.id}
+
+    def test_oidc_publisher_changes(self, db_session):
+        project = DBProjectFactory.create()
+        db_session.info.pop(ACL_BUMPS_SESSION_KEY, None)
+
+        GitHubPublisherFactory.create(projects=[project])
+
+        assert project.id in db_session.info[ACL_BUMPS_SESSION_KEY]
+
+    def test_unrelated_project_changes(self, db_session):
+        project = DBProjectFactory.create()
+        db_session.info.pop(ACL_BUMPS_SESSION_KEY, None)
+
+        project.total_size_limit = ONE_GIB
+        db_session.flush()
+
+        assert db_session.info[ACL_BUMPS_SESSION_KEY] == set()
+
+    def test_team_deleted(self, db_session, organization_service):
+        team = DBTeamFactory.create()
+        project = DBProjectFactory.create()
+        DBProjectFactory.create()
+        DBTeamProjectRoleFactory.create(team=team, project=project)
+        DBTeamRoleFactory.create(team=team)
+        db_session.info.pop(ACL_BUMPS_SESSION_KEY, None)
+
+        organization_service.delete_team(team.id)
+
+        assert db_session.info[ACL_BUMPS_SESSION_KEY] == {project.id}
+
+    def test_organization_deleted(self, db_session, organization_service):
+        organization = DBOrganizationFactory.create()
+        project = DBProjectFactory.create()
+        DBProjectFactory.create()
+        DBOrganizationProjectFactory.create(organization=organization, project=project)
+        DBOrganizationRoleFactory.create(organization=organization)
+        db_session.info.pop(ACL_BUMPS_SESSION_KEY, None)
+
+        organization_service.delete_organization(organization.id)
+
+        assert db_session.info[ACL_BUMPS_SESSION_KEY] == {project.id}
+
+    def test_bulk_organization_role_deleted(self, db_session):
+        organization = DBOrganizationFactory.create()
+        project = DBProjectFactory.create()
+        DBOrganizationProjectFactory.create(organization=organization, project=project)
+        DBOrganizationRoleFactory.create(organization=organization)
+        db_session.info.pop(ACL_BUMPS_SESSION_KEY, None)
+
+        db_session.execute(
+            delete(OrganizationRole).where(
+                OrganizationRole.organization_id == organization.id
+            )
+        )
+
+        assert db_session.info[ACL_BUMPS_SESSION_KEY] == {project.id}
+
+    def test_bulk_role_changed(self, db_session):
+        project = DBProjectFactory.create()
+        DBRoleFactory.create(project=project)
+        DBRoleFactory.create()
+        db_session.info.pop(ACL_BUMPS_SESSION_KEY, None)
+
+        db_session.execute(
+            update(Role).where(Role.project_id == project.id).values(role_name="Owner")
+        )
+
+        assert db_session.info[ACL_BUMPS_SESSION_KEY] == {project.id}
+
+    def test_unrelated_bulk_changes(self, db_session):
+        DBJournalEntryFactory.create()
+        db_session.info.pop(ACL_BUMPS_SESSION_KEY, None)
+
+        db_session.execute(delete(JournalEntry))
+        db_session.execute(delete(JournalEntry.__table__))
+        db_session.execute(select(Role))
+
+        assert ACL_BUMPS_SESSION_KEY not in db_session.info
+
+    def test_execute_acl_bumps(self, acl_cache_service):
+        config = pretend.stub(
+            find_service_factory=lambda iface: (
+                lambda context, request: acl_cache_service
+            )
+        )
+        session = pretend.stub(info={ACL_BUMPS_SESSION_KEY: {"project-id"}})
+
+        packaging_models.execute_acl_bumps(config, session)
+
+        assert session.info == {}
+        assert acl_cache_service.get("project-id") == (1, None)
+
+    def test_execute_acl_bumps_nothing_pending(self):
+        config = pretend.stub(find_service_factory=pretend.raiser(AssertionError))
+        session = pretend.stub(info={})
+
+        packaging_models.execute_acl_bumps(config, session)
+
+    def test_execute_acl_bumps_no_service(self):
+        config = pretend.stub(find_service_factory=pretend.raiser(LookupError))
+        session = pretend.stub(info={ACL_BUMPS_SESSION_KEY: {"project-id"}})
+
+        packaging_models.execute_acl_bumps(config, session)
+
+        assert session.info == {}
+
+
+class TestJournalSequencing:
+    @pytest.fixture
+    def statements(self, db_session):
+        statements = []
+        connection = db_session.connection()
+
+        def log_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(connection, "before_cursor_execute", log_statement)
+        yield statements
+        event.remove(connection, "before_cursor_execute", log_statement)
+
+    def test_serials_assigned_at_commit(self, db_session, statements):
+        project = DBProjectFactory.create()
+        first = JournalEntry(name=project.name, action="first")
+        second = JournalEntry(name=project.name, action="second")
+        db_session.add_all([first, second])
+        db_session.flush()
+        provisional = (first.id, second.id)
+
+        # Nothing is locked while the transaction is still doing its work.
+        assert not any("pg_advisory_xact_lock" in s for s in statements)
+        assert db_session.info[JOURNALS_SESSION_KEY][-2:] == [first, second]
+
+        # Another transaction allocates a serial before we commit.
+        other = db_session.scalar(
+            select(func.nextval(func.pg_get_serial_sequence("journals", "id")))
+        )
+
+        packaging_models.ensure_monotonic_journals(pretend.stub(), db_session)
+
+        assert any("pg_advisory_xact_lock" in s for s in statements)
+        assert JOURNALS_SESSION_KEY not in db_session.info
+        # The serials are allocated at commit, so they are after everything
+        # that was allocated before then, and keep their relative order.
+        assert max(provisional) < other < first.id < second.id
+        db_session.refresh(project)
+        assert project.last_serial == second.id
+
+    def test_no_journals(self, db_session, statements):
+        DBProjectFactory.create()
+        db_session.info.pop(JOURNALS_SESSION_KEY, None)
+
+        packaging_models.ensure_monotonic_journals(pretend.stub(), db_session)
+
+        assert not any("pg_advisory_xact_lock" in s for s in statements)
+
+    def test_deleted_journals(self, db_session, statements):
+        journal = DBJournalEntryFactory.create()
+        db_session.delete(journal)
+        db_session.flush()
+
+        packaging_models.ensure_monotonic_journals(pretend.stub(), db_session)
+
+        assert JOURNALS_SESSION_KEY not in db_session.info
+        assert not any("pg_advisory_xact_lock" in s for s in statements)
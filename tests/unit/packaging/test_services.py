@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: Apache-2.0
 
+import datetime
 import hashlib
 import io
 import os.path
@@ -7,6 +8,7 @@ import os.path
 import b2sdk.v2.exception
 import boto3.session
 import botocore.exceptions
+import google.api_core.exceptions
 import pretend
 import pytest
 
@@ -30,6 +32,8 @@ from warehouse.packaging.interfaces import (
     TooManyProjectsCreated,
 )
 from warehouse.packaging.services import (
+    TOP_DEPENDENTS_CORPUS_KEY,
+    TOP_DEPENDENTS_CORPUS_VERSION_KEY,
     B2FileStorage,
     GCSFileStorage,
     GCSSimpleStorage,
@@ -42,9 +46,10 @@ from warehouse.packaging.services import (
     S3ArchiveFileStorage,
     S3DocsStorage,
     S3FileStorage,
+    _TypoIndexLoader,
     project_service_factory,
 )
-from warehouse.rate_limiting.interfaces import WindowStats
+from warehouse.rate_limiting.interfaces import RateLimitResult, WindowStats
 
 from ...common.db.accounts import UserFactory
 from ...common.db.packaging import ProhibitedProjectFactory, ProjectFactory
@@ -929,10 +934,24 @@ class TestGCSSimpleStorage:
         assert request.find_service.calls == [pretend.call(name="gcloud.gcs")]
         assert service.get_bucket.calls == [pretend.call("froblob")]
 
-    def test_gets_file_raises(self):
-        storage = GCSSimpleStorage(pretend.stub())
+    def test_gets_file(self):
+        blob = pretend.stub(download_as_bytes=lambda: b"my contents")
+        bucket = pretend.stub(blob=pretend.call_recorder(lambda path: blob))
+        storage = GCSSimpleStorage(bucket, prefix="myprefix/")
 
-        with pytest.raises(NotImplementedError):
+        assert storage.get("file.txt").read() == b"my contents"
+        assert bucket.blob.calls == [pretend.call("myprefix/file.txt")]
+
+    def test_raises_when_file_non_existent(self):
+        blob = pretend.stub(
+            download_as_bytes=pretend.raiser(
+                google.api_core.exceptions.NotFound("not found")
+            )
+        )
+        bucket = pretend.stub(blob=lambda path: blob)
+        storage = GCSSimpleStorage(bucket)
+
+        with pytest.raises(FileNotFoundError):
             storage.get("file.txt")
 
     def test_stores_file(self, tmpdir):
@@ -951,6 +970,21 @@ class TestGCSSimpleStorage:
         assert bucket.blob.calls == [pretend.call("foo/bar.txt")]
         assert blob.upload_from_filename.calls == [pretend.call(filename)]
 
+    def test_overwrites_existing_file(self, tmpdir):
+        filename = str(tmpdir.join("testfile.txt"))
+        with open(filename, "wb") as fp:
+            fp.write(b"Test File!")
+
+        blob = pretend.stub(
+            upload_from_filename=pretend.call_recorder(lambda file_path: None),
+            exists=lambda: True,
+        )
+        bucket = pretend.stub(blob=pretend.call_recorder(lambda path: blob))
+        storage = GCSSimpleStorage(bucket)
+        storage.store("foo/index.html", filename)
+
+        assert blob.upload_from_filename.calls == [pretend.call(filename)]
+
     def test_stores_two_files(self, tmpdir):
         filename1 = str(tmpdir.join("testfile1.txt"))
         with open(filename1, "wb") as fp:
@@ -1045,12 +1079,12 @@ class TestProjectService:
         )
 
     @pytest.mark.parametrize(
-        ("enforce", "limiter_method", "limiter_name", "keyed_on_creator"),
+        ("enforce", "consume", "limiter_name", "keyed_on_creator"),
         [
-            (ProjectService._check_ratelimits, "test", "project.create.ip", False),
-            (ProjectService._check_ratelimits, "test", "project.create.user", True),
-            (ProjectService._hit_ratelimits, "hit", "project.create.user", True),
-            (ProjectService._hit_ratelimits, "hit", "project.create.ip", False),
+            (ProjectService._check_ratelimits, False, "project.create.ip", False),
+            (ProjectService._check_ratelimits, False, "project.create.user", True),
+            (ProjectService._hit_ratelimits, True, "project.create.user", True),
+            (ProjectService._hit_ratelimits, True, "project.create.ip", False),
         ],
         ids=["check-ip", "check-user", "hit-user", "hit-ip"],
     )
@@ -1061,27 +1095,40 @@ class TestProjectService:
         ratelimit_service,
         mocker,
         enforce,
-        limiter_method,
+        consume,
         limiter_name,
         keyed_on_creator,
     ):
         """A limiter reporting its threshold is reached refuses the creation.
 
-        Both the optimistic ``_check_ratelimits`` gate (via ``test``) and the
-        enforcing ``_hit_ratelimits`` gate (via ``hit``) raise, and the reset
-        hint is keyed on the identifier that tripped the limit: the creator's id
-        for the user limit, the request IP for the IP limit.
+        Both the optimistic ``_check_ratelimits`` gate (which only tests) and
+        the enforcing ``_hit_ratelimits`` gate (which records a hit) raise, and
+        the reset hint is the one reported for the identifier that tripped the
+        limit: the creator's id for the user limit, the request IP for the IP
+        limit.
         """
         creator = UserFactory.create()
+        resets_in = datetime.timedelta(seconds=30)
         # Trip just the limiter under test; the other auto-creates and passes.
         project_service.ratelimiters[limiter_name] = ratelimit_service
-        mocker.patch.object(ratelimit_service, limiter_method, return_value=False)
+        mocker.patch.object(
+            ratelimit_service,
+            "hit_and_stats",
+            return_value=RateLimitResult(allowed=False, stats=[], resets_in=resets_in),
+        )
 
-        with pytest.raises(TooManyProjectsCreated):
+        with pytest.raises(TooManyProjectsCreated) as excinfo:
             enforce(project_service, db_request, creator)
 
+        assert excinfo.value.resets_in == resets_in
         expected = creator.id if keyed_on_creator else db_request.remote_addr
-        ratelimit_service.resets_in.assert_called_once_with(expected)
+        if consume:
+            ratelimit_service.hit_and_stats.assert_called_once_with(expected)
+        else:
+            ratelimit_service.hit_and_stats.assert_called_once_with(
+                expected, consume=False
+            )
+        ratelimit_service.resets_in.assert_not_called()
 
     def test_hit_ratelimits_skips_ip_limiter_without_remote_addr(
         self, project_service, db_request, ratelimit_service
@@ -1096,21 +1143,25 @@ class TestProjectService:
 
         project_service._hit_ratelimits(db_request, creator)
 
-        ratelimit_service.hit.assert_not_called()
+        ratelimit_service.hit_and_stats.assert_not_called()
 
     def test_create_project_rejects_when_hit_exceeds_limit(
         self, project_service, db_request, ratelimit_service, mocker
     ):
-        """The atomic ``hit`` enforces the limit even when ``test`` passed.
+        """The atomic hit enforces the limit even when the test passed.
 
-        A burst of concurrent uploads can each clear the optimistic ``test``
-        check before any of them records a hit, so the per-request ``hit`` is
-        what actually caps creation: a request that pushes the counter past the
+        A burst of concurrent uploads can each clear the optimistic test
+        before any of them records a hit, so the per-request hit is what
+        actually caps creation: a request that pushes the counter past the
         limit is rejected, rolling back the project just created.
         """
         creator = UserFactory.create()
         project_service.ratelimiters["project.create.user"] = ratelimit_service
-        mocker.patch.object(ratelimit_service, "hit", return_value=False)
+
+        def hit_and_stats(*identifiers, consume=True):
+            return RateLimitResult(allowed=not consume, stats=[], resets_in=None)
+
+        mocker.patch.object(ratelimit_service, "hit_and_stats", hit_and_stats)
 
         with pytest.raises(TooManyProjectsCreated):
             project_service.create_project("some-new-project", creator, db_request)
@@ -1127,17 +1178,24 @@ class TestProjectService:
                 amount=4, window_seconds=86400, remaining=3, resets_in_seconds=0
             )
         ]
-        mocker.patch.object(ratelimit_service, "get_window_stats", return_value=stats)
+        mocker.patch.object(
+            ratelimit_service,
+            "hit_and_stats",
+            return_value=RateLimitResult(allowed=True, stats=stats, resets_in=None),
+        )
+        mocker.spy(ratelimit_service, "get_window_stats")
         project_service.ratelimiters["project.create.user"] = ratelimit_service
         project_service.ratelimiters["project.create.ip"] = ratelimit_service
 
         project_service._check_ratelimits(db_request, creator)
 
-        # Keyed on the request IP and the creator's id, in that order.
-        assert ratelimit_service.get_window_stats.call_args_list == [
-            mocker.call(db_request.remote_addr),
-            mocker.call(creator.id),
+        # Keyed on the request IP and the creator's id, in that order, and the
+        # stats come from the same call that checked the limit.
+        assert ratelimit_service.hit_and_stats.call_args_list == [
+            mocker.call(db_request.remote_addr, consume=False),
+            mocker.call(creator.id, consume=False),
         ]
+        ratelimit_service.get_window_stats.assert_not_called()
         snapshots = db_request._rate_limit_snapshots
         assert [(s.name, s.partition_key, s.stats) for s in snapshots] == [
             ("project.create.ip", "ip", stats),
@@ -1196,6 +1254,50 @@ class TestProjectService:
         service.check_project_name("foo")
 
 
+class TestTypoIndexLoader:
+    def test_no_corpus(self):
+        loader = _TypoIndexLoader()
+
+        assert loader({}) is None
+        assert loader({TOP_DEPENDENTS_CORPUS_VERSION_KEY: {"version": "a"}}) is None
+
+    def test_unversioned_corpus(self):
+        loader = _TypoIndexLoader()
+        cache = {TOP_DEPENDENTS_CORPUS_KEY: {"numpy": 10}}
+
+        index = loader(cache)
+        assert set(index.names) == {"numpy"}
+
+        # The unversioned corpus isn't indexed again on every call.
+        cache[TOP_DEPENDENTS_CORPUS_KEY] = {"numpy": 10, "requests": 5}
+        assert loader(cache) is index
+
+        # Once the corpus has been stamped, it is indexed again.
+        cache[TOP_DEPENDENTS_CORPUS_VERSION_KEY] = {"version": "a", "serial": 1}
+        rebuilt = loader(cache)
+        assert rebuilt is not index
+        assert set(rebuilt.names) == {"numpy", "requests"}
+
+    def test_reuses_index_until_version_changes(self):
+        loader = _TypoIndexLoader()
+        cache = {
+            TOP_DEPENDENTS_CORPUS_KEY: {"numpy": 10},
+            TOP_DEPENDENTS_CORPUS_VERSION_KEY: {"version": "a", "serial": 1},
+        }
+
+        index = loader(cache)
+        assert set(index.names) == {"numpy"}
+
+        # The corpus isn't read again while the version stays the same.
+        cache[TOP_DEPENDENTS_CORPUS_KEY] = {"numpy": 10, "requests": 5}
+        assert loader(cache) is index
+
+        cache[TOP_DEPENDENTS_CORPUS_VERSION_KEY] = {"version": "b", "serial": 2}
+        rebuilt = loader(cache)
+        assert rebuilt is not index
+        assert set(rebuilt.names) == {"numpy", "requests"}
+
+
 def test_project_service_factory(db_request, ratelimit_service):
     service = project_service_factory(pretend.stub(), db_request)
 
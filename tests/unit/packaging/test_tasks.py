@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: Apache-2.0
 
+import concurrent.futures
 import tempfile
 
 from contextlib import contextmanager
@@ -13,16 +14,26 @@ from wtforms import Field, Form, StringField
 import warehouse.packaging.tasks
 
 from warehouse.accounts.models import WebAuthn
+from warehouse.cache.interfaces import IQueryResultsCache
 from warehouse.packaging.models import DependencyKind, Description
+from warehouse.packaging.services import (
+    TOP_DEPENDENTS_CORPUS_KEY,
+    TOP_DEPENDENTS_CORPUS_VERSION_KEY,
+)
 from warehouse.packaging.tasks import (
+    RERENDER_DESCRIPTIONS_CHECKPOINT_KEY,
     check_file_cache_tasks_outstanding,
     compute_2fa_metrics,
     compute_packaging_metrics,
     compute_top_dependents_corpus,
+    refresh_top_dependents_corpus,
+    render_simple_details_batch,
+    rerender_descriptions,
     sync_file_to_cache,
     update_bigquery_release_files,
     update_description_html,
     update_release_description,
+    update_simple_index,
 )
 from warehouse.utils import readme
 from warehouse.utils.row_counter import compute_row_counts
@@ -31,6 +42,7 @@ from ...common.db.packaging import (
     DependencyFactory,
     DescriptionFactory,
     FileFactory,
+    JournalEntryFactory,
     ProjectFactory,
     ReleaseFactory,
     UserFactory,
@@ -379,6 +391,125 @@ def test_update_description_html(monkeypatch, db_request):
     }
 
 
+class TestRerenderDescriptions:
+    @pytest.fixture(autouse=True)
+    def _setup(self, monkeypatch, db_request):
+        # Render on threads, so that everything stays within this test's database
+        # transaction, and don't let partition commits actually commit it.
+        monkeypatch.setattr(
+            concurrent.futures,
+            "ProcessPoolExecutor",
+            concurrent.futures.ThreadPoolExecutor,
+        )
+        monkeypatch.setattr(readme, "renderer_version", lambda: "24.0")
+        db_request.tm = pretend.stub(
+            commit=pretend.call_recorder(lambda: None),
+            begin=pretend.call_recorder(lambda: None),
+        )
+
+    def _rendered(self, db_request):
+        return set(
+            db_request.db.query(
+                Description.raw, Description.html, Description.rendered_by
+            ).all()
+        )
+
+    def test_rerenders_outdated(self, db_request, metrics):
+        current = DescriptionFactory.create(html="rendered", rendered_by="24.0")
+        outdated = sorted(
+            [
+                DescriptionFactory.create(html="not this one", rendered_by="23.0"),
+                DescriptionFactory.create(html="not this one", rendered_by="23.0"),
+                DescriptionFactory.create(html="", rendered_by=""),
+            ],
+            key=lambda description: description.id,
+        )
+
+        rerender_descriptions(db_request, partition_size=2, processes=2)
+
+        assert self._rendered(db_request) == {
+            (current.raw, "rendered", "24.0"),
+            *((d.raw, readme.render(d.raw), "24.0") for d in outdated),
+        }
+        assert db_request.tm.commit.calls == [pretend.call(), pretend.call()]
+        assert db_request.tm.begin.calls == [pretend.call(), pretend.call()]
+        assert (
+            db_request.find_service(IQueryResultsCache).get(
+                RERENDER_DESCRIPTIONS_CHECKPOINT_KEY
+            )
+            is None
+        )
+        assert metrics.increment.calls == [
+            pretend.call("warehouse.packaging.rerender_descriptions.rendered", 2),
+            pretend.call("warehouse.packaging.rerender_descriptions.rendered", 1),
+        ]
+
+    def test_resumes_from_checkpoint(self, db_request, monkeypatch):
+        outdated = sorted(
+            DescriptionFactory.create_batch(3, html="", rendered_by="23.0"),
+            key=lambda description: description.id,
+        )
+        cache = db_request.find_service(IQueryResultsCache)
+        cache.set(
+            RERENDER_DESCRIPTIONS_CHECKPOINT_KEY,
+            {"renderer_version": "24.0", "last_id": str(outdated[0].id)},
+        )
+        monkeypatch.setattr(cache, "set", pretend.call_recorder(cache.set))
+
+        rerender_descriptions(db_request, partition_size=1)
+
+        # Everything after the checkpoint is rendered first, and then the run
+        # wraps around to pick up what came before it.
+        assert self._rendered(db_request) == {
+            (d.raw, readme.render(d.raw), "24.0") for d in outdated
+        }
+        assert cache.set.calls == [
+            *(
+                pretend.call(
+                    RERENDER_DESCRIPTIONS_CHECKPOINT_KEY,
+                    {"renderer_version": "24.0", "last_id": str(d.id)},
+                )
+                for d in [outdated[1], outdated[2], outdated[0]]
+            ),
+            pretend.call(RERENDER_DESCRIPTIONS_CHECKPOINT_KEY, None),
+        ]
+
+    def test_ignores_checkpoint_for_other_version(self, db_request):
+        outdated = sorted(
+            DescriptionFactory.create_batch(2, html="", rendered_by="23.0"),
+            key=lambda description: description.id,
+        )
+        db_request.find_service(IQueryResultsCache).set(
+            RERENDER_DESCRIPTIONS_CHECKPOINT_KEY,
+            {"renderer_version": "23.0", "last_id": str(outdated[-1].id)},
+        )
+
+        rerender_descriptions(db_request)
+
+        assert self._rendered(db_request) == {
+            (d.raw, readme.render(d.raw), "24.0") for d in outdated
+        }
+        assert (
+            db_request.find_service(IQueryResultsCache).get(
+                RERENDER_DESCRIPTIONS_CHECKPOINT_KEY
+            )
+            is None
+        )
+
+    def test_nothing_to_render(self, db_request):
+        DescriptionFactory.create(html="rendered", rendered_by="24.0")
+
+        rerender_descriptions(db_request)
+
+        assert db_request.tm.commit.calls == []
+        assert (
+            db_request.find_service(IQueryResultsCache).get(
+                RERENDER_DESCRIPTIONS_CHECKPOINT_KEY
+            )
+            is None
+        )
+
+
 def test_update_release_description(db_request):
     description = DescriptionFactory.create(
         raw="rst\n===\n\nbody text",
@@ -395,6 +526,36 @@ def test_update_release_description(db_request):
     assert updated_description.rendered_by == readme.renderer_version()
 
 
+def test_update_simple_index(monkeypatch, db_request):
+    render_simple_index = pretend.call_recorder(lambda request, store=False: {})
+    monkeypatch.setattr(
+        warehouse.packaging.tasks, "render_simple_index", render_simple_index
+    )
+
+    update_simple_index(db_request)
+
+    assert render_simple_index.calls == [pretend.call(db_request, store=True)]
+
+
+def test_render_simple_details_batch(monkeypatch, db_request):
+    projects = ProjectFactory.create_batch(2)
+    ProjectFactory.create()
+    render_simple_details = pretend.call_recorder(
+        lambda projects, request, store=False: {}
+    )
+    monkeypatch.setattr(
+        warehouse.packaging.tasks, "render_simple_details", render_simple_details
+    )
+
+    render_simple_details_batch(db_request, [p.id for p in projects])
+
+    assert len(render_simple_details.calls) == 1
+    call = render_simple_details.calls[0]
+    assert set(call.args[0]) == set(projects)
+    assert call.args[1] is db_request
+    assert call.kwargs == {"store": True}
+
+
 bq_schema = [
     SchemaField("metadata_version", "STRING", "NULLABLE"),
     SchemaField("name", "STRING", "REQUIRED"),
@@ -751,3 +912,79 @@ def test_compute_top_dependents_corpus(db_request, project_name, specifier_strin
     results = compute_top_dependents_corpus(db_request)
 
     assert results == {base_proj.normalized_name: 2}
+
+    cache = db_request.find_service(IQueryResultsCache)
+    assert cache.get(TOP_DEPENDENTS_CORPUS_KEY) == results
+    assert cache.get(TOP_DEPENDENTS_CORPUS_VERSION_KEY).keys() == {"version", "serial"}
+
+
+class TestRefreshTopDependentsCorpus:
+    def test_computes_without_stored_corpus(self, db_request, monkeypatch):
+        compute = pretend.call_recorder(lambda request: {"numpy": 1})
+        monkeypatch.setattr(
+            warehouse.packaging.tasks, "compute_top_dependents_corpus", compute
+        )
+
+        assert refresh_top_dependents_corpus(db_request) == {"numpy": 1}
+        assert compute.calls == [pretend.call(db_request)]
+
+    def test_no_changes(self, db_request):
+        base_proj = ProjectFactory.create()
+        release = ReleaseFactory.create()
+        DependencyFactory.create(
+            release=release, kind=DependencyKind.requires_dist, specifier=base_proj.name
+        )
+        JournalEntryFactory.create(name=release.project.name)
+        corpus = compute_top_dependents_corpus(db_request)
+
+        assert refresh_top_dependents_corpus(db_request) == corpus
+
+    def test_recounts_changed_projects(self, db_request):
+        base_proj = ProjectFactory.create()
+        dropped_proj = ProjectFactory.create()
+
+        release_a = ReleaseFactory.create()
+        DependencyFactory.create(
+            release=release_a,
+            kind=DependencyKind.requires_dist,
+            specifier=base_proj.name,
+        )
+        release_b = ReleaseFactory.create()
+        DependencyFactory.create(
+            release=release_b,
+            kind=DependencyKind.requires_dist,
+            specifier=dropped_proj.name,
+        )
+        JournalEntryFactory.create(name=release_b.project.name)
+
+        compute_top_dependents_corpus(db_request)
+        cache = db_request.find_service(IQueryResultsCache)
+        # A name that no changed project depends upon is left untouched.
+        cache.set(
+            TOP_DEPENDENTS_CORPUS_KEY,
+            {
+                base_proj.normalized_name: 1,
+                dropped_proj.normalized_name: 1,
+                "unaffected": 7,
+            },
+        )
+        version = cache.get(TOP_DEPENDENTS_CORPUS_VERSION_KEY)["version"]
+
+        # A new project depending on base_proj, and release_b being yanked.
+        release_c = ReleaseFactory.create()
+        DependencyFactory.create(
+            release=release_c,
+            kind=DependencyKind.requires_dist,
+            specifier=base_proj.name,
+        )
+        release_b.yanked = True
+        JournalEntryFactory.create(name=release_c.project.name)
+        journal = JournalEntryFactory.create(name=release_b.project.name)
+
+        results = refresh_top_dependents_corpus(db_request)
+
+        assert results == {"unaffected": 7, base_proj.normalized_name: 2}
+        assert cache.get(TOP_DEPENDENTS_CORPUS_KEY) == results
+        stamp = cache.get(TOP_DEPENDENTS_CORPUS_VERSION_KEY)
+        assert stamp["serial"] == journal.id
+        assert stamp["version"] != version
@@ -2,7 +2,7 @@
 
 import pytest
 
-from warehouse.packaging.typosnyper import typo_check_name
+from warehouse.packaging.typosnyper import TypoIndex, typo_check_name
 
 
 @pytest.mark.parametrize(
@@ -22,7 +22,8 @@ from warehouse.packaging.typosnyper import typo_check_name
         ("python-dateutil", None),  # Pass, swapped_words same as original
     ],
 )
-def test_typo_check_name(name, expected):
+@pytest.mark.parametrize("as_index", [False, True])
+def test_typo_check_name(name, expected, as_index):
     # Set known entries corpus entries for testing
     test_names_corpus = {
         "numpy",
@@ -32,5 +33,35 @@ def test_typo_check_name(name, expected):
         "jinja2",
         "python-dateutil",
     }
+    if as_index:
+        test_names_corpus = TypoIndex(test_names_corpus)
 
     assert typo_check_name(name, corpus=test_names_corpus) == expected
+
+
+@pytest.mark.parametrize(
+    ("name", "expected"),
+    [
+        ("sphnx", ("omitted_characters", "sphinx")),
+        ("core-django-extra", ("swapped_words", "django-core-extra")),
+        ("pandas", None),
+    ],
+)
+def test_typo_check_name_index_matches_set(name, expected):
+    corpus = {"sphinx", "sphinxx", "extra-core-django", "django-core-extra"}
+
+    assert typo_check_name(name, corpus=corpus) == expected
+    assert typo_check_name(name, corpus=TypoIndex(corpus)) == expected
+
+
+def test_typo_index():
+    index = TypoIndex(["numpy", "requests", "numpy"])
+
+    assert len(index) == 2
+    assert "numpy" in index
+    assert "pandas" not in index
+
+
+def test_typo_check_name_default_corpus():
+    assert typo_check_name("numpy") is None
+    assert typo_check_name("nuumpy") == ("repeated_characters", "numpy")
@@ -1,18 +1,37 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import hashlib
+import io
+import json
 import tempfile
 
+import google.api_core.exceptions
 import pretend
+import pytest
 
+import warehouse.packaging.utils
+
+from warehouse.metrics import IMetricsService
 from warehouse.packaging.interfaces import ISimpleStorage
+from warehouse.packaging.services import GCSSimpleStorage
 from warehouse.packaging.utils import (
+    API_VERSION,
+    _load_simple_index,
+    _patch_simple_index,
     _simple_detail,
+    _simple_index_changes,
     _valid_simple_detail_context,
     render_simple_detail,
+    render_simple_details,
+    render_simple_index,
 )
 
-from ...common.db.packaging import FileFactory, ProjectFactory, ReleaseFactory
+from ...common.db.packaging import (
+    FileFactory,
+    JournalEntryFactory,
+    ProjectFactory,
+    ReleaseFactory,
+)
 
 
 def test_simple_detail_empty_string(db_request):
@@ -26,6 +45,45 @@ def test_simple_detail_empty_string(db_request):
     assert expected_content["files"][0]["requires-python"] is None
 
 
+def test_simple_detail_uses_pypi_ordering(db_request):
+    project = ProjectFactory.create()
+    # The stored ordering is authoritative, even if it disagrees with parsing.
+    release1 = ReleaseFactory.create(project=project, version="2.0", _pypi_ordering=0)
+    release2 = ReleaseFactory.create(project=project, version="1.0", _pypi_ordering=1)
+    FileFactory.create(release=release2, filename="b-1.0.tar.gz")
+    FileFactory.create(release=release1, filename="b-2.0.tar.gz")
+    FileFactory.create(release=release1, filename="a-2.0.tar.gz")
+
+    db_request.route_url = lambda *a, **kw: "the-url"
+    context = _simple_detail(project, db_request)
+
+    assert context["versions"] == ["2.0", "1.0"]
+    assert [f["filename"] for f in context["files"]] == [
+        "a-2.0.tar.gz",
+        "b-2.0.tar.gz",
+        "b-1.0.tar.gz",
+    ]
+
+
+def test_simple_detail_without_pypi_ordering(db_request):
+    project = ProjectFactory.create()
+    release1 = ReleaseFactory.create(
+        project=project, version="10.0", _pypi_ordering=None
+    )
+    release2 = ReleaseFactory.create(project=project, version="9.0", _pypi_ordering=0)
+    FileFactory.create(release=release1, filename="a-10.0.tar.gz")
+    FileFactory.create(release=release2, filename="a-9.0.tar.gz")
+
+    db_request.route_url = lambda *a, **kw: "the-url"
+    context = _simple_detail(project, db_request)
+
+    assert context["versions"] == ["9.0", "10.0"]
+    assert [f["filename"] for f in context["files"]] == [
+        "a-9.0.tar.gz",
+        "a-10.0.tar.gz",
+    ]
+
+
 def test_render_simple_detail(db_request, monkeypatch, jinja):
     project = ProjectFactory.create()
     release1 = ReleaseFactory.create(project=project, version="1.0")
@@ -143,3 +201,297 @@ def test_render_simple_detail_with_store(db_request, monkeypatch, jinja):
         f"{project.normalized_name}/deadbeefdeadbeefdeadbeefdeadbeef"
         f".{project.normalized_name}.html"
     )
+
+
+def test_simple_index_changes_none(db_request):
+    ProjectFactory.create()
+    je = JournalEntryFactory.create()
+
+    assert _simple_index_changes(db_request, je.id) == {}
+
+
+def test_simple_index_changes(db_request):
+    old = JournalEntryFactory.create(name="unchanged")
+    ProjectFactory.create(name="unchanged")
+    ProjectFactory.create(name="Changed.Project")
+    ProjectFactory.create(name="quarantined", lifecycle_status="quarantine-enter")
+    je = JournalEntryFactory.create(name="Changed.Project")
+    JournalEntryFactory.create(name="quarantined")
+    JournalEntryFactory.create(name="deleted")
+
+    assert _simple_index_changes(db_request, old.id) == {
+        "changed-project": {"name": "Changed.Project", "_last-serial": je.id},
+        "quarantined": None,
+        "deleted": None,
+    }
+
+
+def test_patch_simple_index():
+    index = {
+        "meta": {"api-version": API_VERSION, "_last-serial": 5},
+        "projects": [
+            {"name": "Bar", "_last-serial": 3},
+            {"name": "deleted", "_last-serial": 4},
+            {"name": "foo", "_last-serial": 5},
+        ],
+    }
+    changes = {
+        "deleted": None,
+        "never-existed": None,
+        "foo": {"name": "Foo", "_last-serial": 7},
+        "aardvark": {"name": "aardvark", "_last-serial": 8},
+    }
+
+    assert _patch_simple_index(index, changes, 8) == {
+        "meta": {"api-version": API_VERSION, "_last-serial": 8},
+        "projects": [
+            {"name": "aardvark", "_last-serial": 8},
+            {"name": "Bar", "_last-serial": 3},
+            {"name": "Foo", "_last-serial": 7},
+        ],
+    }
+
+
+def test_load_simple_index_missing():
+    def get(path):
+        raise FileNotFoundError(path)
+
+    assert _load_simple_index(pretend.stub(get=get)) is None
+
+
+@pytest.mark.parametrize(
+    ("api_version", "expected"),
+    [(API_VERSION, True), ("0.1", False)],
+)
+def test_load_simple_index(api_version, expected):
+    index = {
+        "meta": {"api-version": api_version, "_last-serial": 1},
+        "projects": [],
+    }
+    storage = pretend.stub(
+        get=pretend.call_recorder(
+            lambda path: io.BytesIO(json.dumps(index).encode("utf-8"))
+        )
+    )
+
+    assert _load_simple_index(storage) == (index if expected else None)
+    assert storage.get.calls == [pretend.call("index.json")]
+
+
+def test_render_simple_index_full(db_request, monkeypatch):
+    ProjectFactory.create(name="foo")
+    je = JournalEntryFactory.create()
+
+    storage_service = pretend.stub()
+    db_request.find_service = lambda svc, name=None, context=None: {
+        ISimpleStorage: storage_service
+    }.get(svc)
+    monkeypatch.setattr(
+        warehouse.packaging.utils, "_load_simple_index", lambda storage: None
+    )
+
+    assert render_simple_index(db_request) == {
+        "meta": {"api-version": API_VERSION, "_last-serial": je.id},
+        "projects": [{"name": "foo", "_last-serial": 0}],
+    }
+
+
+@pytest.mark.parametrize("store", [True, False])
+def test_render_simple_index_unchanged(db_request, monkeypatch, store):
+    je = JournalEntryFactory.create()
+    previous = {
+        "meta": {"api-version": API_VERSION, "_last-serial": je.id},
+        "projects": [{"name": "foo", "_last-serial": je.id}],
+    }
+
+    storage_service = pretend.stub(store=pretend.call_recorder(lambda *a, **kw: None))
+    db_request.find_service = lambda svc, name=None, context=None: {
+        ISimpleStorage: storage_service
+    }.get(svc)
+    monkeypatch.setattr(
+        warehouse.packaging.utils, "_load_simple_index", lambda storage: previous
+    )
+
+    assert render_simple_index(db_request, store=store) is previous
+    assert storage_service.store.calls == []
+
+
+def test_render_simple_index_patched_with_store(db_request, monkeypatch):
+    first = JournalEntryFactory.create(name="foo")
+    ProjectFactory.create(name="foo")
+    ProjectFactory.create(name="bar")
+    second = JournalEntryFactory.create(name="bar")
+    previous = {
+        "meta": {"api-version": API_VERSION, "_last-serial": first.id},
+        "projects": [{"name": "foo", "_last-serial": 0}],
+    }
+    expected = {
+        "meta": {"api-version": API_VERSION, "_last-serial": second.id},
+        "projects": [
+            {"name": "bar", "_last-serial": second.id},
+            {"name": "foo", "_last-serial": 0},
+        ],
+    }
+
+    stored = []
+
+    def store(path, file_path, *, meta=None):
+        with open(file_path, "rb") as fp:
+            stored.append((path, fp.read(), meta))
+
+    storage_service = pretend.stub(store=store)
+    db_request.find_service = lambda svc, name=None, context=None: {
+        ISimpleStorage: storage_service
+    }.get(svc)
+    monkeypatch.setattr(
+        warehouse.packaging.utils, "_load_simple_index", lambda storage: previous
+    )
+    template = pretend.stub(render=pretend.call_recorder(lambda **kw: "<html></html>"))
+    env = pretend.stub(get_template=pretend.call_recorder(lambda name: template))
+    db_request.registry.queryUtility = pretend.call_recorder(
+        lambda iface, name=None: env
+    )
+
+    assert render_simple_index(db_request, store=True) == expected
+
+    meta = {"pypi-last-serial": second.id}
+    snapshot = json.dumps(expected, sort_keys=True).encode("utf-8")
+    assert stored == [
+        ("index.json", snapshot, meta),
+        ("index.html", b"<html></html>", meta),
+    ]
+    assert env.get_template.calls == [pretend.call("templates/api/simple/index.html")]
+    assert template.render.calls == [pretend.call(**expected, request=db_request)]
+
+
+class FakeGCSBucket:
+    """
+    An in memory stand in for a GCS bucket, which only knows about the blobs
+    that have been uploaded to it.
+    """
+
+    def __init__(self):
+        self.blobs = {}
+
+    def blob(self, path):
+        bucket = self
+
+        class Blob:
+            metadata = None
+
+            def exists(self):
+                return path in bucket.blobs
+
+            def download_as_bytes(self):
+                try:
+                    return bucket.blobs[path]
+                except KeyError:
+                    raise google.api_core.exceptions.NotFound(path) from None
+
+            def upload_from_filename(self, file_path):
+                with open(file_path, "rb") as fp:
+                    bucket.blobs[path] = fp.read()
+
+        return Blob()
+
+
+def test_render_simple_index_gcs_storage(db_request):
+    ProjectFactory.create(name="foo")
+    first = JournalEntryFactory.create(name="foo")
+
+    bucket = FakeGCSBucket()
+    storage_service = GCSSimpleStorage(bucket)
+    db_request.find_service = lambda svc, name=None, context=None: {
+        ISimpleStorage: storage_service
+    }.get(svc)
+    template = pretend.stub(
+        render=lambda **kw: ",".join(p["name"] for p in kw["projects"])
+    )
+    env = pretend.stub(get_template=lambda name: template)
+    db_request.registry.queryUtility = lambda iface, name=None: env
+
+    # With nothing stored yet, the index is built from scratch.
+    render_simple_index(db_request, store=True)
+    assert json.loads(bucket.blobs["index.json"])["meta"]["_last-serial"] == first.id
+    assert bucket.blobs["index.html"] == b"foo"
+
+    ProjectFactory.create(name="bar")
+    second = JournalEntryFactory.create(name="bar")
+
+    # The stored snapshot is read back and patched, and the fixed paths are
+    # overwritten with the new index.
+    assert render_simple_index(db_request, store=True) == {
+        "meta": {"api-version": API_VERSION, "_last-serial": second.id},
+        "projects": [
+            {"name": "bar", "_last-serial": second.id},
+            {"name": "foo", "_last-serial": first.id},
+        ],
+    }
+    assert json.loads(bucket.blobs["index.json"])["meta"]["_last-serial"] == second.id
+    assert bucket.blobs["index.html"] == b"bar,foo"
+    assert bucket.blobs.keys() == {"index.json", "index.html"}
+
+
+@pytest.mark.parametrize("store", [True, False])
+def test_render_simple_details(db_request, jinja, metrics, store):
+    project1 = ProjectFactory.create()
+    FileFactory.create(release=ReleaseFactory.create(project=project1, version="1.0"))
+    FileFactory.create(release=ReleaseFactory.create(project=project1, version="2.0"))
+    project2 = ProjectFactory.create()
+    FileFactory.create(release=ReleaseFactory.create(project=project2, version="1.0"))
+    project3 = ProjectFactory.create()
+
+    stored = []
+
+    def store_file(path, file_path, *, meta=None):
+        with open(file_path, "rb") as fp:
+            stored.append((path, fp.read(), meta))
+
+    storage_service = pretend.stub(store=store_file)
+    db_request.find_service = lambda svc, name=None, context=None: {
+        ISimpleStorage: storage_service,
+        IMetricsService: metrics,
+    }.get(svc)
+    db_request.route_url = lambda *a, **kw: "the-url"
+    db_request.registry.queryUtility = lambda iface, name=None: jinja
+
+    results = render_simple_details(
+        [project1, project2, project3], db_request, store=store
+    )
+
+    template = jinja.get_template("templates/api/simple/detail.html")
+    expected = {}
+    for project in [project1, project2, project3]:
+        context = _valid_simple_detail_context(_simple_detail(project, db_request))
+        content = template.render(**context, request=db_request).encode("utf-8")
+        content_hash = hashlib.blake2b(content, digest_size=32).hexdigest()
+        name = project.normalized_name
+        path = f"{name}/{content_hash}.{name}.html"
+        expected[name] = (content_hash, path, content, project)
+
+    assert results == {
+        name: (content_hash, path)
+        for name, (content_hash, path, _, _) in expected.items()
+    }
+
+    if store:
+        assert sorted(stored) == sorted(
+            (stored_path, content, meta)
+            for name, (content_hash, path, content, project) in expected.items()
+            for stored_path in [path, f"{name}/index.html"]
+            for meta in [
+                {
+                    "project": name,
+                    "pypi-last-serial": project.last_serial,
+                    "hash": content_hash,
+                }
+            ]
+        )
+    else:
+        assert stored == []
+
+    assert metrics.histogram.calls == [
+        pretend.call("warehouse.simple.render_bulk.projects", 3)
+    ]
+    assert len(metrics.timing.calls) == 1
+    assert len(metrics.gauge.calls) == 1
@@ -9,6 +9,8 @@ from limits import storage
 
 from warehouse import rate_limiting
 from warehouse.rate_limiting import DummyRateLimiter, RateLimit, RateLimiter
+from warehouse.rate_limiting.interfaces import RateLimitResult, WindowStats
+from warehouse.rate_limiting.local import LocalRateLimits
 
 
 class TestRateLimiter:
@@ -46,12 +48,16 @@ class TestRateLimiter:
         assert limiter.hit("foo")
         assert limiter.resets_in("foo") is None
         assert limiter.get_window_stats("foo") == []
+        assert limiter.hit_and_stats("foo") == RateLimitResult(
+            allowed=True, stats=[], resets_in=None
+        )
 
         assert metrics.increment.calls == [
             pretend.call("warehouse.ratelimiter.error", tags=["call:test"]),
             pretend.call("warehouse.ratelimiter.error", tags=["call:hit"]),
             pretend.call("warehouse.ratelimiter.error", tags=["call:resets_in"]),
             pretend.call("warehouse.ratelimiter.error", tags=["call:get_window_stats"]),
+            pretend.call("warehouse.ratelimiter.error", tags=["call:hit_and_stats"]),
         ]
 
     def test_namespacing(self, metrics):
@@ -123,6 +129,85 @@ class TestRateLimiter:
         assert 0 < stats[0].resets_in_seconds <= 60
         assert stats[1].remaining == 8
 
+    def test_hit_and_stats(self, metrics):
+        limiter = RateLimiter(
+            storage.MemoryStorage(),
+            "2 per minute; 10 per hour",
+            metrics=metrics,
+        )
+
+        result = limiter.hit_and_stats("foo")
+        assert result.allowed
+        assert [(s.amount, s.remaining) for s in result.stats] == [(2, 1), (10, 9)]
+        assert result.resets_in is None
+
+        # The hit that exhausts a limit is still allowed, but tells us when the
+        # limit will reset.
+        result = limiter.hit_and_stats("foo")
+        assert result.allowed
+        assert [s.remaining for s in result.stats] == [0, 8]
+        assert 0 < result.stats[0].resets_in_seconds <= 60
+        assert (
+            datetime.timedelta(0) < result.resets_in <= datetime.timedelta(seconds=60)
+        )
+
+        result = limiter.hit_and_stats("foo")
+        assert not result.allowed
+        assert [s.remaining for s in result.stats] == [0, 8]
+
+    def test_hit_and_stats_without_consuming(self, metrics):
+        limiter = RateLimiter(storage.MemoryStorage(), "1 per minute", metrics=metrics)
+
+        result = limiter.hit_and_stats("foo", consume=False)
+        assert result.allowed
+        assert [s.remaining for s in result.stats] == [1]
+        assert limiter.test("foo")
+
+        limiter.hit("foo")
+
+        result = limiter.hit_and_stats("foo", consume=False)
+        assert not result.allowed
+        assert [s.remaining for s in result.stats] == [0]
+        assert (
+            datetime.timedelta(0) < result.resets_in <= datetime.timedelta(seconds=60)
+        )
+
+    def test_hit_and_stats_redis(self, metrics, monkeypatch):
+        monkeypatch.setattr(rate_limiting.time, "time", lambda: 1000.0)
+        limiter = RateLimiter(
+            storage.RedisStorage("redis://localhost"),
+            "1 per minute; 10 per hour",
+            identifiers=["foo"],
+            metrics=metrics,
+        )
+        limiter._hit_and_stats_script = pretend.call_recorder(
+            lambda keys, args: [0, b"990.0", 1, b"100.0", 5]
+        )
+
+        result = limiter.hit_and_stats("bar", consume=False)
+
+        assert limiter._hit_and_stats_script.calls == [
+            pretend.call(
+                keys=[
+                    "LIMITS:LIMITER/foo/bar/1/1/minute",
+                    "LIMITS:LIMITER/foo/bar/10/1/hour",
+                ],
+                args=[1000.0, 0, 1, 60, 10, 3600],
+            )
+        ]
+        assert result == RateLimitResult(
+            allowed=False,
+            stats=[
+                WindowStats(
+                    amount=1, window_seconds=60, remaining=0, resets_in_seconds=50
+                ),
+                WindowStats(
+                    amount=10, window_seconds=3600, remaining=5, resets_in_seconds=2700
+                ),
+            ],
+            resets_in=datetime.timedelta(seconds=50),
+        )
+
     def test_resets_in_expired(self, metrics):
         limiter = RateLimiter(
             storage.MemoryStorage(),
@@ -149,6 +234,102 @@ class TestRateLimiter:
         assert resets_in <= datetime.timedelta(seconds=5)
 
 
+class TestLocalRateLimiter:
+    def _limiter(self, metrics, limit="1 per minute"):
+        return RateLimiter(
+            storage.MemoryStorage(),
+            limit,
+            identifiers=["foo"],
+            metrics=metrics,
+            local=LocalRateLimits(ttl=10),
+        )
+
+    def test_rejects_blocked_locally(self, metrics):
+        limiter = self._limiter(metrics)
+
+        assert limiter.hit_and_stats("bar").allowed
+        denied = limiter.hit_and_stats("bar")
+        assert not denied.allowed
+
+        # Now that we know bar is over its limit, we don't need to ask the
+        # backing storage about it again.
+        limiter._window = pretend.stub()
+        limiter._hit_and_stats = pretend.stub()
+
+        result = limiter.hit_and_stats("bar")
+        assert not result.allowed
+        assert result.stats == denied.stats
+        assert not limiter.test("bar")
+        assert not limiter.hit("bar")
+
+        assert metrics.increment.calls == [
+            pretend.call(
+                "warehouse.ratelimiter.local.rejected", tags=["call:hit_and_stats"]
+            ),
+            pretend.call("warehouse.ratelimiter.local.rejected", tags=["call:test"]),
+            pretend.call("warehouse.ratelimiter.local.rejected", tags=["call:hit"]),
+        ]
+
+    def test_test_blocks_locally(self, metrics):
+        limiter = self._limiter(metrics)
+
+        assert limiter.hit("bar")
+        assert limiter.test("baz")
+        assert not limiter.test("bar")
+        assert limiter._local.get(limiter._local_key(["bar"])) is not None
+        assert limiter._local.get(limiter._local_key(["baz"])) is None
+
+    def test_hit_blocks_locally(self, metrics):
+        limiter = self._limiter(metrics)
+
+        assert limiter.hit("bar")
+        assert not limiter.hit("bar")
+
+        result = limiter._local.get(limiter._local_key(["bar"]))
+        assert not result.allowed
+        assert (
+            datetime.timedelta(0) < result.resets_in <= datetime.timedelta(seconds=60)
+        )
+
+    def test_clear(self, metrics):
+        limiter = self._limiter(metrics)
+
+        assert limiter.hit("bar")
+        assert not limiter.test("bar")
+
+        limiter.clear("bar")
+
+        assert limiter.test("bar")
+        assert limiter._fallback.test("bar")
+
+    def test_falls_back_to_local_limits(self, metrics):
+        limiter = self._limiter(metrics, limit="2 per minute")
+
+        # Hits allowed by the backing storage are mirrored locally.
+        assert limiter.hit("bar")
+        assert limiter.hit_and_stats("bar").allowed
+        assert not limiter.hit_and_stats("bar", consume=False).allowed
+        limiter.clear("bar")
+        assert limiter.hit("bar")
+
+        def raiser(*args, **kwargs):
+            raise redis.ConnectionError
+
+        limiter._window = pretend.stub(hit=raiser, test=raiser, get_window_stats=raiser)
+        limiter._storage = pretend.stub(clear=raiser)
+
+        # Rather than failing open, we use what this worker has seen so far.
+        assert limiter.test("bar")
+        assert limiter.hit("bar")
+        assert not limiter.test("bar")
+        assert not limiter.hit("bar")
+        assert not limiter.hit_and_stats("bar").allowed
+        assert limiter.resets_in("bar") > datetime.timedelta(seconds=0)
+        assert [s.remaining for s in limiter.get_window_stats("bar")] == [0]
+        assert limiter.clear("bar") is None
+        assert limiter.test("bar")
+
+
 class TestDummyRateLimiter:
     def test_basic(self):
         limiter = DummyRateLimiter()
@@ -158,6 +339,9 @@ class TestDummyRateLimiter:
         assert limiter.clear() is None
         assert limiter.resets_in() is None
         assert limiter.get_window_stats() == []
+        assert limiter.hit_and_stats() == RateLimitResult(
+            allowed=True, stats=[], resets_in=None
+        )
 
 
 class TestRateLimit:
@@ -179,6 +363,26 @@ class TestRateLimit:
                 limit="1 per 5 minutes",
                 identifiers=["foo"],
                 metrics=metrics,
+                local=None,
+            )
+        ]
+
+    def test_local(self, pyramid_request, metrics):
+        limiter_class = pretend.call_recorder(lambda *a, **kw: pretend.stub())
+        pyramid_request.registry["ratelimiter.storage"] = pretend.stub()
+        pyramid_request.registry["ratelimiter.local"] = pretend.stub()
+
+        RateLimit("1 per 5 minutes", limiter_class=limiter_class)(
+            pretend.stub(), pyramid_request
+        )
+
+        assert limiter_class.calls == [
+            pretend.call(
+                pyramid_request.registry["ratelimiter.storage"],
+                limit="1 per 5 minutes",
+                identifiers=None,
+                metrics=metrics,
+                local=pyramid_request.registry["ratelimiter.local"],
             )
         ]
 
@@ -217,6 +421,24 @@ def test_includeme():
         pretend.call("warehouse.rate_limiting.headers.rate_limit_headers_tween_factory")
     ]
     assert isinstance(registry["ratelimiter.storage"], storage.MemoryStorage)
+    assert "ratelimiter.local" not in registry
+
+
+def test_includeme_local():
+    registry = {}
+    config = pretend.stub(
+        add_directive=lambda name, func: None,
+        add_tween=lambda factory: None,
+        registry=pretend.stub(
+            settings={"ratelimit.url": "memory://", "ratelimit.local_ttl": 10},
+            __setitem__=registry.__setitem__,
+        ),
+    )
+
+    rate_limiting.includeme(config)
+
+    assert isinstance(registry["ratelimiter.local"], LocalRateLimits)
+    assert registry["ratelimiter.local"].ttl == 10
 
 
 def test_register_rate_limiter_directive():
@@ -27,6 +27,27 @@ class TestRecordRateLimit:
             RateLimitSnapshot(name="search", partition_key="ip", stats=stats)
         ]
 
+    def test_records_precomputed_stats(self):
+        stats = [
+            WindowStats(amount=5, window_seconds=1, remaining=3, resets_in_seconds=0)
+        ]
+        limiter = pretend.stub(get_window_stats=pretend.call_recorder(lambda *a: []))
+        request = pretend.stub(__dict__={})
+
+        record_rate_limit(
+            request,
+            "search",
+            limiter,
+            identifiers=("1.2.3.4",),
+            partition_key="ip",
+            stats=stats,
+        )
+
+        assert limiter.get_window_stats.calls == []
+        assert request.__dict__["_rate_limit_snapshots"] == [
+            RateLimitSnapshot(name="search", partition_key="ip", stats=stats)
+        ]
+
     def test_skips_when_no_stats(self):
         # When backing storage is unavailable the limiter returns []; we
         # should record nothing rather than emitting empty headers.
@@ -0,0 +1,103 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import datetime
+
+import pretend
+
+from limits.storage import MemoryStorage
+
+from warehouse.rate_limiting import local
+from warehouse.rate_limiting.interfaces import RateLimitResult, WindowStats
+from warehouse.rate_limiting.local import LocalRateLimits
+
+
+def _result(resets_in=30):
+    return RateLimitResult(
+        allowed=False,
+        stats=[
+            WindowStats(amount=1, window_seconds=60, remaining=0, resets_in_seconds=30)
+        ],
+        resets_in=(
+            datetime.timedelta(seconds=resets_in) if resets_in is not None else None
+        ),
+    )
+
+
+class TestLocalRateLimits:
+    def test_creation(self):
+        limits = LocalRateLimits(ttl=10)
+
+        assert limits.ttl == 10
+        assert limits.max_blocked == local.MAX_BLOCKED
+        assert isinstance(limits.storage, MemoryStorage)
+
+    def test_not_blocked(self):
+        assert LocalRateLimits(ttl=10).get(("foo",)) is None
+
+    def test_block(self, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(local, "time", pretend.stub(time=lambda: now))
+        limits = LocalRateLimits(ttl=10)
+
+        limits.block(("foo",), _result())
+        assert limits.get(("foo",)) == _result()
+        assert limits.get(("bar",)) is None
+
+        # The result is brought up to date as time passes.
+        now += 5
+        assert limits.get(("foo",)) == RateLimitResult(
+            allowed=False,
+            stats=[
+                WindowStats(
+                    amount=1, window_seconds=60, remaining=0, resets_in_seconds=25
+                )
+            ],
+            resets_in=datetime.timedelta(seconds=25),
+        )
+
+        # Even though the limit hasn't reset, we go back to Redis after our TTL.
+        now += 5
+        assert limits.get(("foo",)) is None
+
+    def test_block_until_reset(self, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(local, "time", pretend.stub(time=lambda: now))
+        limits = LocalRateLimits(ttl=10)
+
+        limits.block(("foo",), _result(resets_in=2))
+        assert limits.get(("foo",)) is not None
+
+        now += 2
+        assert limits.get(("foo",)) is None
+
+    def test_block_without_reset(self, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(local, "time", pretend.stub(time=lambda: now))
+        limits = LocalRateLimits(ttl=10)
+
+        limits.block(("foo",), _result(resets_in=None))
+        assert limits.get(("foo",)).resets_in is None
+
+        now += 10
+        assert limits.get(("foo",)) is None
+
+    def test_unblock(self):
+        limits = LocalRateLimits(ttl=10)
+        limits.block(("foo",), _result())
+
+        limits.unblock(("foo",))
+        limits.unblock(("bar",))
+
+        assert limits.get(("foo",)) is None
+
+    def test_max_blocked(self):
+        limits = LocalRateLimits(ttl=10, max_blocked=2)
+        limits.block(("foo",), _result())
+        limits.block(("bar",), _result())
+        limits.get(("foo",))
+        limits.block(("baz",), _result())
+
+        # The least recently used key is forgotten.
+        assert limits.get(("foo",)) is not None
+        assert limits.get(("bar",)) is None
+        assert limits.get(("baz",)) is not None
@@ -580,6 +580,7 @@ def test_routes(warehouse, mocker):
         ),
         mocker.call("api.billing.webhook", "/billing/webhook/", domain=warehouse),
         mocker.call("api.simple.index", "/simple/", domain=warehouse),
+        mocker.call("api.changes", "/api/changes/", domain=warehouse),
         mocker.call(
             "api.simple.detail",
             "/simple/{name}/",
@@ -24,7 +24,11 @@ from webob.multidict import MultiDict
 from warehouse import views
 from warehouse.errors import WarehouseDenied
 from warehouse.packaging.models import ProjectFactory as DBProjectFactory
-from warehouse.rate_limiting.interfaces import IRateLimiter, WindowStats
+from warehouse.rate_limiting.interfaces import (
+    IRateLimiter,
+    RateLimitResult,
+    WindowStats,
+)
 from warehouse.utils.row_counter import compute_row_counts
 from warehouse.views import (
     SecurityKeyGiveaway,
@@ -505,10 +509,9 @@ class TestSearch:
         db_request.params = params
 
         fake_rate_limiter = pretend.stub(
-            test=lambda *a: True,
-            hit=lambda *a: True,
-            resets_in=lambda *a: None,
-            get_window_stats=lambda *a: [],
+            hit_and_stats=lambda *a: RateLimitResult(
+                allowed=True, stats=[], resets_in=None
+            ),
         )
         pyramid_services.register_service(
             fake_rate_limiter, IRateLimiter, None, name="search"
@@ -555,10 +558,9 @@ class TestSearch:
         db_request.params = params
 
         fake_rate_limiter = pretend.stub(
-            test=lambda *a: True,
-            hit=lambda *a: True,
-            resets_in=lambda *a: None,
-            get_window_stats=lambda *a: [],
+            hit_and_stats=lambda *a: RateLimitResult(
+                allowed=True, stats=[], resets_in=None
+            ),
         )
         pyramid_services.register_service(
             fake_rate_limiter, IRateLimiter, None, name="search"
@@ -622,10 +624,9 @@ class TestSearch:
         db_request.params = params
 
         fake_rate_limiter = pretend.stub(
-            test=lambda *a: True,
-            hit=lambda *a: True,
-            resets_in=lambda *a: None,
-            get_window_stats=lambda *a: [],
+            hit_and_stats=lambda *a: RateLimitResult(
+                allowed=True, stats=[], resets_in=None
+            ),
         )
         pyramid_services.register_service(
             fake_rate_limiter, IRateLimiter, None, name="search"
@@ -658,10 +659,9 @@ class TestSearch:
         db_request.params = params
 
         fake_rate_limiter = pretend.stub(
-            test=lambda *a: True,
-            hit=lambda *a: True,
-            resets_in=lambda *a: None,
-            get_window_stats=lambda *a: [],
+            hit_and_stats=lambda *a: RateLimitResult(
+                allowed=True, stats=[], resets_in=None
+            ),
         )
         pyramid_services.register_service(
             fake_rate_limiter, IRateLimiter, None, name="search"
@@ -691,10 +691,9 @@ class TestSearch:
         db_request.params = params
 
         fake_rate_limiter = pretend.stub(
-            test=lambda *a: True,
-            hit=lambda *a: True,
-            resets_in=lambda *a: None,
-            get_window_stats=lambda *a: [],
+            hit_and_stats=lambda *a: RateLimitResult(
+                allowed=True, stats=[], resets_in=None
+            ),
         )
         pyramid_services.register_service(
             fake_rate_limiter, IRateLimiter, None, name="search"
@@ -715,10 +714,9 @@ class TestSearch:
         db_request.params = params
 
         fake_rate_limiter = pretend.stub(
-            test=lambda *a: True,
-            hit=lambda *a: True,
-            resets_in=lambda *a: None,
-            get_window_stats=lambda *a: [],
+            hit_and_stats=lambda *a: RateLimitResult(
+                allowed=True, stats=[], resets_in=None
+            ),
         )
         pyramid_services.register_service(
             fake_rate_limiter, IRateLimiter, None, name="search"
@@ -757,14 +755,15 @@ class TestSearch:
             WindowStats(amount=5, window_seconds=1, remaining=0, resets_in_seconds=1)
         ]
         fake_rate_limiter = pretend.stub(
-            test=lambda *a: False,
-            hit=lambda *a: True,
-            resets_in=lambda *a: (
-                None
-                if resets_in is None
-                else pretend.stub(total_seconds=lambda *a: resets_in)
+            hit_and_stats=lambda *a: RateLimitResult(
+                allowed=False,
+                stats=stats,
+                resets_in=(
+                    None
+                    if resets_in is None
+                    else pretend.stub(total_seconds=lambda *a: resets_in)
+                ),
             ),
-            get_window_stats=lambda *a: stats,
         )
         pyramid_services.register_service(
             fake_rate_limiter, IRateLimiter, None, name="search"
@@ -1,17 +1,47 @@
 # SPDX-License-Identifier: Apache-2.0
 
+import functools
+
+from compression import zstd
+
 import pytest
 
 from pyramid.httpexceptions import HTTPOk
 from webob.acceptparse import AcceptEncodingNoHeader, AcceptEncodingValidHeader
 from webob.response import gzip_app_iter
 
+from warehouse.utils import compression
 from warehouse.utils.compression import (
+    CompressedVariantCache,
     _compressor as compressor,
     compression_tween_factory,
 )
 
 
+class FakeBrotliCompressor:
+    def __init__(self, quality):
+        self.quality = quality
+        self.chunks = []
+
+    def process(self, chunk):
+        self.chunks.append(chunk)
+        return b""
+
+    def finish(self):
+        return b"br:" + b"".join(self.chunks)[:3]
+
+
+@pytest.fixture
+def fake_brotli(monkeypatch, mocker):
+    brotli = mocker.NonCallableMock(
+        compress=lambda body, quality: b"br:" + body[:3],
+        Compressor=FakeBrotliCompressor,
+    )
+    monkeypatch.setattr(compression, "brotli", brotli)
+    monkeypatch.setattr(compression, "ENCODINGS", ["identity", "br", "zstd", "gzip"])
+    return brotli
+
+
 class TestCompressor:
     @pytest.mark.parametrize(
         "vary", [["Cookie"], ["Authorization"], ["Cookie", "Authorization"]]
@@ -116,6 +146,146 @@ class TestCompressor:
         assert response.content_length == 3
         assert response.body == b"foo"
 
+    @pytest.mark.parametrize(
+        ("accept_encoding", "expected"),
+        [
+            ("gzip, deflate, br, zstd", "br"),
+            ("gzip, zstd", "zstd"),
+            ("br;q=0.5, gzip", "gzip"),
+            ("identity, br", "identity"),
+        ],
+    )
+    def test_negotiates_encoding(
+        self, accept_encoding, expected, pyramid_request, fake_brotli
+    ):
+        pyramid_request.accept_encoding = AcceptEncodingValidHeader(accept_encoding)
+        response = HTTPOk(body=b"foofoofoofoofoofoofoofoofoofoofoofoofoofoo")
+
+        compressor(pyramid_request, response)
+
+        assert response.content_encoding == (
+            None if expected == "identity" else expected
+        )
+
+    def test_compresses_zstd_non_streaming(self, pyramid_request):
+        decompressed_body = b"foofoofoofoofoofoofoofoofoofoofoofoofoofoo"
+
+        pyramid_request.accept_encoding = AcceptEncodingValidHeader("zstd")
+        response = HTTPOk(body=decompressed_body)
+        response.md5_etag()
+
+        original_etag = response.etag
+
+        compressor(pyramid_request, response)
+
+        assert response.content_encoding == "zstd"
+        assert response.content_length == len(response.body)
+        assert zstd.decompress(response.body) == decompressed_body
+        assert response.etag != original_etag
+
+    def test_compresses_zstd_streaming_with_etag(self, pyramid_request):
+        decompressed_body = b"foofoofoofoofoofoofoofoofoofoofoofoofoofoo"
+
+        pyramid_request.accept_encoding = AcceptEncodingValidHeader("zstd")
+        response = HTTPOk(app_iter=iter([decompressed_body, decompressed_body]))
+        response.etag = "foo"
+
+        compressor(pyramid_request, response)
+
+        assert response.content_encoding == "zstd"
+        assert response.content_length is None
+        assert zstd.decompress(response.body) == decompressed_body * 2
+        assert response.etag == "0wx1Ksx6aiJWqfrQ35mUIw"
+
+    def test_compresses_brotli(self, pyramid_request, fake_brotli):
+        pyramid_request.accept_encoding = AcceptEncodingValidHeader("br")
+        response = HTTPOk(body=b"foofoofoofoofoofoofoofoofoofoofoofoofoofoo")
+
+        compressor(pyramid_request, response)
+
+        assert response.content_encoding == "br"
+        assert response.body == b"br:foo"
+
+    def test_compresses_brotli_streaming(self, pyramid_request, fake_brotli):
+        pyramid_request.accept_encoding = AcceptEncodingValidHeader("br")
+        response = HTTPOk(app_iter=iter([b"foo", b"bar"]))
+
+        compressor(pyramid_request, response)
+
+        assert response.content_encoding == "br"
+        assert response.content_length is None
+        assert response.body == b"br:foo"
+
+    def test_caches_compressed_variants(self, pyramid_request, mocker):
+        decompressed_body = b"foofoofoofoofoofoofoofoofoofoofoofoofoofoo"
+        compressed_body = b"".join(list(gzip_app_iter([decompressed_body])))
+        encode_body = mocker.spy(compression, "_encode_body")
+        cache = CompressedVariantCache()
+
+        pyramid_request.accept_encoding = AcceptEncodingValidHeader("gzip")
+        for _ in range(2):
+            response = HTTPOk(body=decompressed_body)
+            response.md5_etag()
+            original_etag = response.etag
+
+            compressor(pyramid_request, response, cache=cache)
+
+            assert response.content_encoding == "gzip"
+            assert response.body == compressed_body
+
+        assert encode_body.call_count == 1
+        assert cache.get(original_etag, "gzip") == compressed_body
+
+    @pytest.mark.parametrize(
+        "cache_control", [None, "private", "no-store"], ids=["no-etag", "p", "ns"]
+    )
+    def test_doesnt_cache_uncacheable(self, cache_control, pyramid_request, mocker):
+        encode_body = mocker.spy(compression, "_encode_body")
+        cache = CompressedVariantCache()
+
+        pyramid_request.accept_encoding = AcceptEncodingValidHeader("gzip")
+        for _ in range(2):
+            response = HTTPOk(body=b"foofoofoofoofoofoofoofoofoofoofoofoofoofoo")
+            if cache_control is not None:
+                response.md5_etag()
+                response.headers["Cache-Control"] = cache_control
+
+            compressor(pyramid_request, response, cache=cache)
+
+            assert response.content_encoding == "gzip"
+
+        assert encode_body.call_count == 2
+        assert cache.size == 0
+
+
+class TestCompressedVariantCache:
+    def test_evicts_least_recently_used(self):
+        cache = CompressedVariantCache(max_bytes=6)
+        cache.set("a", "gzip", b"aaa")
+        cache.set("b", "gzip", b"bbb")
+        assert cache.get("a", "gzip") == b"aaa"
+        cache.set("c", "gzip", b"ccc")
+
+        assert cache.get("b", "gzip") is None
+        assert cache.get("a", "gzip") == b"aaa"
+        assert cache.get("c", "gzip") == b"ccc"
+        assert cache.size == 6
+
+    def test_replaces_entry(self):
+        cache = CompressedVariantCache(max_bytes=6)
+        cache.set("a", "gzip", b"aaa")
+        cache.set("a", "gzip", b"aa")
+
+        assert cache.get("a", "gzip") == b"aa"
+        assert cache.size == 2
+
+    def test_skips_oversized(self):
+        cache = CompressedVariantCache(max_bytes=2)
+        cache.set("a", "gzip", b"aaa")
+
+        assert cache.get("a", "gzip") is None
+        assert cache.size == 0
+
 
 def test_compression_tween_factory(pyramid_request, mocker):
     registry = mocker.sentinel.registry
@@ -128,4 +298,9 @@ def test_compression_tween_factory(pyramid_request, mocker):
     tween = compression_tween_factory(handler, registry)
 
     assert tween(pyramid_request) is response
-    assert list(pyramid_request.response_callbacks) == [compressor]
+    assert tween(pyramid_request) is response
+    first, second = pyramid_request.response_callbacks
+    assert isinstance(first, functools.partial)
+    assert first.func is compressor
+    assert isinstance(first.keywords["cache"], CompressedVariantCache)
+    assert second.keywords["cache"] is first.keywords["cache"]
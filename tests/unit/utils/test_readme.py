@@ -1,5 +1,8 @@
 # SPDX-License-Identifier: Apache-2.0
 
+import pretend
+import pytest
+
 from warehouse.utils import readme
 
 
@@ -40,3 +43,95 @@ def test_can_render_blank_content_type():
 
 def test_renderer_version():
     assert readme.renderer_version() is not None
+
+
+def test_render_is_memoized(monkeypatch, metrics):
+    _render = pretend.call_recorder(readme._render)
+    monkeypatch.setattr(readme, "_render", _render)
+
+    first = readme.render("raw thing", "text/markdown", metrics=metrics)
+    second = readme.render("raw thing", "text/markdown; charset=UTF-8", metrics=metrics)
+
+    assert first == second == "<p>raw thing</p>\n"
+    assert _render.calls == [pretend.call("raw thing", "text/markdown", True)]
+    assert metrics.increment.calls == [
+        pretend.call("warehouse.readme.render.cache_miss"),
+        pretend.call("warehouse.readme.render.cache_hit"),
+    ]
+
+
+def test_render_memoizes_failures():
+    assert readme.render("raw `<thing", "text/x-rst", use_fallback=False) is None
+    assert readme.render("raw `<thing", "text/x-rst", use_fallback=False) is None
+    assert readme.render("raw `<thing", "text/x-rst") == "raw `&lt;thing"
+
+
+@pytest.mark.parametrize(
+    ("content_type", "version"),
+    [("text/x-rst", "1.0"), ("text/markdown", "2.0")],
+)
+def test_render_cache_key(monkeypatch, content_type, version):
+    monkeypatch.setattr(readme, "renderer_version", lambda: "1.0")
+    readme.render("raw thing", "text/x-rst")
+
+    _render = pretend.call_recorder(lambda value, content_type, use_fallback: "")
+    monkeypatch.setattr(readme, "_render", _render)
+    monkeypatch.setattr(readme, "renderer_version", lambda: version)
+    readme.render("raw thing", content_type)
+
+    expected = (
+        []
+        if (content_type, version) == ("text/x-rst", "1.0")
+        else [pretend.call("raw thing", content_type, True)]
+    )
+    assert _render.calls == expected
+
+
+class TestRenderCache:
+    def test_evicts_least_recently_used(self):
+        cache = readme._RenderCache(max_size=6, entry_overhead=0)
+        cache.set("a", "aaa")
+        cache.set("b", "bbb")
+        assert cache.get("a") == "aaa"
+        cache.set("c", "ccc")
+
+        assert cache.get("b") is readme._MISSING
+        assert cache.get("a") == "aaa"
+        assert cache.get("c") == "ccc"
+        assert cache.size == 6
+
+    def test_replaces_entry(self):
+        cache = readme._RenderCache(max_size=6, entry_overhead=0)
+        cache.set("a", "aaa")
+        cache.set("a", None)
+
+        assert cache.get("a") is None
+        assert cache.size == 0
+
+    def test_skips_oversized(self):
+        cache = readme._RenderCache(max_size=2, entry_overhead=0)
+        cache.set("a", "aaa")
+
+        assert cache.get("a") is readme._MISSING
+        assert cache.size == 0
+
+    def test_charges_entry_overhead(self):
+        cache = readme._RenderCache(max_size=6, entry_overhead=2)
+        cache.set("a", None)
+        cache.set("b", "b")
+        assert cache.size == 5
+
+        # Failed renders take up room too, so they are evicted like any other.
+        cache.set("c", None)
+        assert cache.get("a") is readme._MISSING
+        assert cache.get("b") == "b"
+        assert cache.get("c") is None
+        assert cache.size == 5
+
+    def test_clear(self):
+        cache = readme._RenderCache()
+        cache.set("a", "aaa")
+        cache.clear()
+
+        assert cache.get("a") is readme._MISSING
+        assert cache.size == 0
@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: Apache-2.0
 
+import hashlib
 import io
 import struct
 import tarfile
@@ -170,9 +171,9 @@ class TestCheckMembers:
         members = [("pkg/a.py", 2, b"AB"), ("pkg/b.py", 2, b"CD")]
         assert scanner.check_members(members, rules, archive_name="test.whl") is None
 
-    def test_overflow_detects_match_after_threshold(self, monkeypatch):
-        """Match found in a file arriving after the overflow threshold."""
-        monkeypatch.setattr(scanner, "_BULK_SCAN_MAX_TOTAL", 10)
+    def test_chunked_detects_match_in_later_chunk(self, monkeypatch):
+        """Match found in a member arriving after the first chunk."""
+        monkeypatch.setattr(scanner, "_SCAN_CHUNK_SIZE", 10)
         rules = yara_x.compile(
             'rule bad { meta: message = "blocked" strings: $a = "evil" condition: $a }'
         )
@@ -185,9 +186,9 @@ class TestCheckMembers:
         assert result is not None
         assert result.member == "pkg/c.py"
 
-    def test_overflow_detects_match_in_materialized(self, monkeypatch):
-        """Match found in a file materialized before the overflow threshold."""
-        monkeypatch.setattr(scanner, "_BULK_SCAN_MAX_TOTAL", 10)
+    def test_chunked_detects_match_in_first_chunk(self, monkeypatch):
+        """Match found in the first chunk."""
+        monkeypatch.setattr(scanner, "_SCAN_CHUNK_SIZE", 10)
         rules = yara_x.compile(
             'rule bad { meta: message = "blocked" strings: $a = "evil" condition: $a }'
         )
@@ -199,9 +200,23 @@ class TestCheckMembers:
         assert result is not None
         assert result.member == "pkg/a.py"
 
-    def test_overflow_returns_none_for_clean_files(self, monkeypatch):
-        """Per-file fallback returns None when no files match."""
-        monkeypatch.setattr(scanner, "_BULK_SCAN_MAX_TOTAL", 10)
+    def test_chunked_returns_first_match_in_archive_order(self, monkeypatch):
+        """With more chunks than workers, the earliest matching member wins."""
+        monkeypatch.setattr(scanner, "_SCAN_CHUNK_SIZE", 10)
+        monkeypatch.setattr(scanner, "_SCAN_MAX_WORKERS", 2)
+        rules = yara_x.compile(
+            'rule bad { meta: message = "blocked" strings: $a = "evil" condition: $a }'
+        )
+        members = [(f"pkg/clean{i}.py", 12, b"clean code!!") for i in range(5)]
+        members[3] = ("pkg/first.py", 12, b"this is evil")
+        members.append(("pkg/second.py", 12, b"also evil!!!"))
+        result = scanner.check_members(members, rules, archive_name="test.whl")
+        assert result is not None
+        assert result.member == "pkg/first.py"
+
+    def test_chunked_returns_none_for_clean_files(self, monkeypatch):
+        """Chunked scanning returns None when no files match."""
+        monkeypatch.setattr(scanner, "_SCAN_CHUNK_SIZE", 10)
         rules = yara_x.compile('rule bad { strings: $a = "evil" condition: $a }')
         members = [
             ("pkg/a.py", 6, b"hello!"),
@@ -210,6 +225,166 @@ class TestCheckMembers:
         ]
         assert scanner.check_members(members, rules, archive_name="test.whl") is None
 
+    def test_chunked_returns_none_on_scan_error(self, monkeypatch):
+        monkeypatch.setattr(scanner, "_SCAN_CHUNK_SIZE", 10)
+        rules = yara_x.compile('rule bad { strings: $a = "evil" condition: $a }')
+        members = [("pkg/a.py", 12, b"this is evil"), ("pkg/b.py", 12, b"evil again")]
+
+        class _BrokenScanner:
+            def __init__(self, _rules):
+                pass
+
+            def scan(self, _data):
+                raise yara_x.ScanError("boom")
+
+        monkeypatch.setattr("warehouse.utils.scanner.yara_x.Scanner", _BrokenScanner)
+        assert scanner.check_members(members, rules, archive_name="test.whl") is None
+
+    def test_attribution_rescans_only_matching_members(self, monkeypatch):
+        rules = yara_x.compile(
+            'rule bad { meta: message = "blocked" strings: $a = "evil" condition: $a }'
+        )
+        scanned = []
+        timed_scan = scanner._timed_scan
+
+        def _recording_timed_scan(yx_scanner, data, *, metrics, check_type):
+            scanned.append((check_type, data))
+            return timed_scan(yx_scanner, data, metrics=metrics, check_type=check_type)
+
+        monkeypatch.setattr(scanner, "_timed_scan", _recording_timed_scan)
+        members = [
+            ("pkg/a.py", 6, b"hello!"),
+            ("pkg/b.py", 12, b"this is evil"),
+            ("pkg/c.py", 6, b"world!"),
+        ]
+        result = scanner.check_members(members, rules, archive_name="test.whl")
+        assert result is not None
+        assert result.member == "pkg/b.py"
+        assert scanned == [
+            ("bulk", b"hello!this is evilworld!"),
+            ("per_file_attribution", b"this is evil"),
+        ]
+
+    def test_attribution_candidates_without_pattern_matches(self):
+        """Rules matching without patterns can't be attributed by offset."""
+        rules = yara_x.compile(
+            'rule big { meta: message = "x" condition: filesize > 8 }'
+        )
+        chunk = [("pkg/a.py", b"hello"), ("pkg/b.py", b"world")]
+        results = yara_x.Scanner(rules).scan(b"helloworld")
+        assert scanner._attribution_candidates(chunk, results.matching_rules) == chunk
+
+
+class TestVerdictCache:
+    @pytest.fixture
+    def module_rules(self, monkeypatch):
+        rules = yara_x.compile(
+            'rule bad { meta: message = "blocked" strings: $a = "evil" condition: $a }'
+        )
+        monkeypatch.setattr(scanner, "_rules", rules)
+        monkeypatch.setattr(scanner, "_rules_fingerprint", "fingerprint")
+        return rules
+
+    @pytest.fixture
+    def verdict_cache(self):
+        class _VerdictCache:
+            def __init__(self):
+                self.clean = set()
+
+            def get_clean(self, ruleset, digests):
+                return {d for d in digests if (ruleset, d) in self.clean}
+
+            def set_clean(self, ruleset, digests):
+                self.clean.update((ruleset, d) for d in digests)
+
+        return _VerdictCache()
+
+    def test_clean_members_are_cached(self, module_rules, verdict_cache, metrics):
+        members = [("pkg/a.py", 6, b"hello!"), ("pkg/b.py", 6, b"world!")]
+
+        assert (
+            scanner.check_members(members, metrics=metrics, verdict_cache=verdict_cache)
+            is None
+        )
+        assert verdict_cache.clean == {
+            ("fingerprint", hashlib.sha256(b"hello!").hexdigest()),
+            ("fingerprint", hashlib.sha256(b"world!").hexdigest()),
+        }
+        metrics.increment.assert_not_called()
+
+        # A second scan of the same content is skipped entirely.
+        assert (
+            scanner.check_members(members, metrics=metrics, verdict_cache=verdict_cache)
+            is None
+        )
+        metrics.increment.assert_called_once_with(
+            "warehouse.upload.yara.verdict_cache.hit", 2
+        )
+
+    def test_only_novel_members_are_scanned(
+        self, module_rules, verdict_cache, monkeypatch
+    ):
+        verdict_cache.set_clean("fingerprint", [hashlib.sha256(b"hello!").hexdigest()])
+        scanned = []
+        timed_scan = scanner._timed_scan
+
+        def _recording_timed_scan(yx_scanner, data, *, metrics, check_type):
+            scanned.append(data)
+            return timed_scan(yx_scanner, data, metrics=metrics, check_type=check_type)
+
+        monkeypatch.setattr(scanner, "_timed_scan", _recording_timed_scan)
+        members = [("pkg/a.py", 6, b"hello!"), ("pkg/b.py", 12, b"this is evil")]
+
+        result = scanner.check_members(members, verdict_cache=verdict_cache)
+
+        assert result is not None
+        assert result.member == "pkg/b.py"
+        assert scanned == [b"this is evil", b"this is evil"]
+        # Content that matched is never recorded as clean.
+        assert (
+            "fingerprint",
+            hashlib.sha256(b"this is evil").hexdigest(),
+        ) not in verdict_cache.clean
+
+    def test_cross_boundary_match_is_cached_clean(self, monkeypatch, verdict_cache):
+        rules = yara_x.compile(
+            'rule boundary { meta: message = "x" strings: $a = "ABCD" condition: $a }'
+        )
+        monkeypatch.setattr(scanner, "_rules", rules)
+        monkeypatch.setattr(scanner, "_rules_fingerprint", "fingerprint")
+        members = [("pkg/a.py", 2, b"AB"), ("pkg/b.py", 2, b"CD")]
+
+        assert scanner.check_members(members, verdict_cache=verdict_cache) is None
+        assert len(verdict_cache.clean) == 2
+
+    def test_ignored_for_other_rules(self, module_rules, verdict_cache):
+        rules = yara_x.compile('rule bad { strings: $a = "evil" condition: $a }')
+        members = [("pkg/a.py", 6, b"hello!")]
+
+        assert (
+            scanner.check_members(members, rules, verdict_cache=verdict_cache) is None
+        )
+        assert verdict_cache.clean == set()
+
+
+class TestRulesFingerprint:
+    def test_changes_with_rules(self, tmp_path):
+        (tmp_path / "a.yar").write_text("rule a { condition: true }")
+        fingerprint = scanner.rules_fingerprint(tmp_path)
+
+        assert fingerprint == scanner.rules_fingerprint(tmp_path)
+        (tmp_path / "a.yar").write_text("rule a { condition: false }")
+        assert scanner.rules_fingerprint(tmp_path) != fingerprint
+
+    def test_returns_none_on_error(self, tmp_path, monkeypatch):
+        (tmp_path / "a.yar").write_text("rule a { condition: true }")
+
+        def _raise(self):
+            raise OSError
+
+        monkeypatch.setattr(scanner.Path, "read_bytes", _raise)
+        assert scanner.rules_fingerprint(tmp_path) is None
+
 
 class TestScanArchive:
     @pytest.mark.parametrize(
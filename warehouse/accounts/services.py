@@ -7,8 +7,11 @@ import datetime
 import functools
 import hashlib
 import http
+import mmap
 import os
 import secrets
+import threading
+import time
 import typing
 import urllib.parse
 
@@ -16,6 +19,7 @@ from uuid import UUID
 
 import passlib.exc
 import pytz
+import redis
 import requests
 import structlog
 
@@ -75,6 +79,14 @@ PASSWORD_FIELD = "password"  # noqa: S105
 RECOVERY_CODE_COUNT = 8
 RECOVERY_CODE_BYTES = 8
 
+# HIBP range responses are cached as a blob of fixed width, sorted, upper case
+# hash suffixes, so that they can be binary searched without being re-parsed.
+_HIBP_SUFFIX_WIDTH = 35
+_HIBP_RANGE_CACHE_SIZE = 256
+_HIBP_RANGE_CACHE_TTL = 60 * 60 * 24  # 1 day
+# A locally mirrored HIBP dataset is a file of sorted, raw 20 byte SHA-1 digests.
+_HIBP_DIGEST_WIDTH = 20
+
 
 @implementer(IUserService)
 class DatabaseUserService:
@@ -178,40 +190,41 @@ class DatabaseUserService:
         tags = tags if tags is not None else []
 
         # First we want to check if a single IP is exceeding our rate limiter.
-        if self.remote_addr is not None and not self.ratelimiters["ip.login"].test(
-            self.remote_addr
-        ):
-            logger.warning("IP failed login threshold reached.")
-            self._metrics.increment(
-                "warehouse.authentication.ratelimited",
-                tags=[*tags, "ratelimiter:ip"],
-            )
-            raise TooManyFailedLogins(
-                resets_in=self.ratelimiters["ip.login"].resets_in(self.remote_addr)
+        if self.remote_addr is not None:
+            ratelimit = self.ratelimiters["ip.login"].hit_and_stats(
+                self.remote_addr, consume=False
             )
+            if not ratelimit.allowed:
+                logger.warning("IP failed login threshold reached.")
+                self._metrics.increment(
+                    "warehouse.authentication.ratelimited",
+                    tags=[*tags, "ratelimiter:ip"],
+                )
+                raise TooManyFailedLogins(resets_in=ratelimit.resets_in)
 
         # Next check to see if we've hit our global rate limit or not,
         # assuming that we've been configured with a global rate limiter anyways.
-        if not self.ratelimiters["global.login"].test():
+        ratelimit = self.ratelimiters["global.login"].hit_and_stats(consume=False)
+        if not ratelimit.allowed:
             logger.warning("Global failed login threshold reached.")
             self._metrics.increment(
                 "warehouse.authentication.ratelimited",
                 tags=[*tags, "ratelimiter:global"],
             )
-            raise TooManyFailedLogins(
-                resets_in=self.ratelimiters["global.login"].resets_in()
-            )
+            raise TooManyFailedLogins(resets_in=ratelimit.resets_in)
 
         # Now, check to make sure that we haven't hitten a rate limit on a
         # per user basis.
-        if userid is not None and not self.ratelimiters["user.login"].test(userid):
-            self._metrics.increment(
-                "warehouse.authentication.ratelimited",
-                tags=[*tags, "ratelimiter:user"],
-            )
-            raise TooManyFailedLogins(
-                resets_in=self.ratelimiters["user.login"].resets_in(userid)
+        if userid is not None:
+            ratelimit = self.ratelimiters["user.login"].hit_and_stats(
+                userid, consume=False
             )
+            if not ratelimit.allowed:
+                self._metrics.increment(
+                    "warehouse.authentication.ratelimited",
+                    tags=[*tags, "ratelimiter:user"],
+                )
+                raise TooManyFailedLogins(resets_in=ratelimit.resets_in)
 
     def _hit_ratelimits(self, userid=None):
         if userid is not None:
@@ -1015,6 +1028,101 @@ class TokenServiceFactory:
         return (self.name, self.service_class) == (other.name, other.service_class)
 
 
+def _sorted_records_contain(records, record, width):
+    """
+    Binary search a buffer of sorted, fixed width records for the given record.
+    """
+    lo, hi = 0, len(records) // width
+    while lo < hi:
+        mid = (lo + hi) // 2
+        candidate = records[mid * width : (mid + 1) * width]
+        if candidate < record:
+            lo = mid + 1
+        elif candidate > record:
+            hi = mid
+        else:
+            return True
+    return False
+
+
+def _parse_range(text):
+    """
+    Turn a HIBP range response into a blob of sorted hash suffixes.
+    """
+    suffixes = sorted(line.split(":")[0].upper() for line in text.splitlines())
+    return "".join(suffixes).encode("ascii")
+
+
+class PwnedRangeCache:
+    """
+    A bounded, in-process LRU of HIBP range responses keyed by hash prefix.
+
+    It is shared by every request in a process, so that the most common
+    prefixes are answered without any network round-trip at all.
+    """
+
+    def __init__(
+        self, maxsize: int = _HIBP_RANGE_CACHE_SIZE, ttl: int = _HIBP_RANGE_CACHE_TTL
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: collections.OrderedDict[str, tuple[float, bytes]] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, prefix: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(prefix)
+            if entry is None:
+                return None
+            expires, suffixes = entry
+            if expires <= time.monotonic():
+                del self._entries[prefix]
+                return None
+            self._entries.move_to_end(prefix)
+            return suffixes
+
+    def set(self, prefix: str, suffixes: bytes) -> None:
+        with self._lock:
+            self._entries[prefix] = (time.monotonic() + self.ttl, suffixes)
+            self._entries.move_to_end(prefix)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+_pwned_range_cache = PwnedRangeCache()
+
+
+class PwnedPasswordsDataset:
+    """
+    A memory mapped, locally mirrored copy of the HIBP Pwned Passwords dataset.
+
+    The file is expected to contain the raw 20 byte SHA-1 digests of every
+    breached password, concatenated and sorted, which lets us answer a lookup
+    with a binary search over the mapping without ever reading the whole file.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) % _HIBP_DIGEST_WIDTH:
+            raise ValueError(f"{path!r} is not a sorted file of SHA-1 digests")
+
+    def __contains__(self, digest: bytes) -> bool:
+        return _sorted_records_contain(self._mmap, digest, _HIBP_DIGEST_WIDTH)
+
+
+@functools.cache
+def _open_pwned_passwords_dataset(path):
+    return PwnedPasswordsDataset(path)
+
+
+@functools.cache
+def _pwned_range_redis(url):
+    return redis.StrictRedis.from_url(url)
+
+
 @implementer(IPasswordBreachedService)
 class HaveIBeenPwnedPasswordBreachedService:
     _failure_message_preamble = (
@@ -1029,18 +1137,32 @@ class HaveIBeenPwnedPasswordBreachedService:
         metrics,
         api_base="https://api.pwnedpasswords.com",
         help_url=None,
+        range_cache=None,
+        redis_client=None,
+        offline_dataset=None,
     ):
         self._http = session
         self._api_base = api_base
         self._metrics = metrics
         self._help_url = help_url
+        self._range_cache = range_cache
+        self._redis = redis_client
+        self._offline_dataset = offline_dataset
 
     @classmethod
     def create_service(cls, context, request):
+        settings = request.registry.settings
+        redis_url = settings.get("db_results_cache.url")
+        offline_path = settings.get("hibp.offline_dataset")
         return cls(
             session=request.http,
             metrics=request.find_service(IMetricsService, context=None),
             help_url=request.help_url(_anchor="compromised-password"),
+            range_cache=_pwned_range_cache,
+            redis_client=_pwned_range_redis(redis_url) if redis_url else None,
+            offline_dataset=(
+                _open_pwned_passwords_dataset(offline_path) if offline_path else None
+            ),
         )
 
     @property
@@ -1059,38 +1181,46 @@ class HaveIBeenPwnedPasswordBreachedService:
     def _get_url(self, prefix):
         return urllib.parse.urljoin(self._api_base, os.path.join("/range/", prefix))
 
-    def check_password(self, password, *, tags=None):
-        # The HIBP API implements a k-Anonymity scheme, by which you can take a given
-        # password, hash it using sha1, and then send only the first 5 characters of the
-        # hex encoded digest. This avoids leaking data to the HIBP API, because without
-        # the rest of the hash, the HIBP service cannot even begin to brute force or do
-        # a reverse lookup to determine what password has just been sent to it. For More
-        # information see:
-        #       https://www.troyhunt.com/ive-just-launched-pwned-passwords-version-2/
-
-        self._metrics_increment("warehouse.compromised_password_check.start", tags=tags)
+    def _get_range(self, prefix, *, tags=None):
+        # Ranges are looked up in the in-process cache, then in Redis, and only then
+        # fetched from the HIBP API, populating each tier on the way back out.
+        if self._range_cache is not None:
+            suffixes = self._range_cache.get(prefix)
+            if suffixes is not None:
+                self._metrics_increment(
+                    "warehouse.compromised_password_check.cache_hit",
+                    tags=[*(tags or []), "tier:memory"],
+                )
+                return suffixes
 
-        # To work with the HIBP API, we need the sha1 of the UTF8 encoded password.
-        hashed_password = (
-            hashlib.sha1(password.encode("utf8"), usedforsecurity=False)
-            .hexdigest()
-            .lower()
-        )
+        cache_key = f"hibp:range:{prefix}"
+        if self._redis is not None:
+            try:
+                suffixes = self._redis.get(cache_key)
+            except redis.exceptions.RedisError:
+                logger.warning(
+                    "Error reading cached HaveIBeenPwned range", exc_info=True
+                )
+                suffixes = None
+            if suffixes is not None:
+                self._metrics_increment(
+                    "warehouse.compromised_password_check.cache_hit",
+                    tags=[*(tags or []), "tier:redis"],
+                )
+                if self._range_cache is not None:
+                    self._range_cache.set(prefix, suffixes)
+                return suffixes
 
         # Fetch the passwords from the HIBP data set.
         try:
-            resp = self._http.get(self._get_url(hashed_password[:5]))
+            resp = self._http.get(self._get_url(prefix))
             resp.raise_for_status()
         except requests.RequestException as exc:
             logger.warning("Error contacting HaveIBeenPwned", error=repr(exc))
             self._metrics_increment(
                 "warehouse.compromised_password_check.error", tags=tags
             )
-
-            # If we've failed to contact the HIBP service for some reason, we're going
-            # to "fail open" and allow the password. That's a better option then just
-            # hard failing whatever the user is attempting to do.
-            return False
+            return None
 
         # The dataset that comes back from HIBP looks like:
         #
@@ -1103,15 +1233,61 @@ class HaveIBeenPwnedPasswordBreachedService:
         #
         # That is, it is a line delimited textual data, where each line is a hash, a
         # colon, and then the number of times that password has appeared in a breach.
-        # For our uses, we're going to consider any password that has ever appeared in
-        # a breach to be insecure, even if only once.
-        for line in resp.text.splitlines():
-            possible, _ = line.split(":")
-            if hashed_password[5:] == possible.lower():
-                self._metrics_increment(
-                    "warehouse.compromised_password_check.compromised", tags=tags
-                )
-                return True
+        # We only care about the hashes, which we keep sorted for binary searching.
+        suffixes = _parse_range(resp.text)
+
+        if self._redis is not None:
+            try:
+                self._redis.set(cache_key, suffixes, ex=_HIBP_RANGE_CACHE_TTL)
+            except redis.exceptions.RedisError:
+                logger.warning("Error caching HaveIBeenPwned range", exc_info=True)
+        if self._range_cache is not None:
+            self._range_cache.set(prefix, suffixes)
+
+        return suffixes
+
+    def check_password(self, password, *, tags=None):
+        # The HIBP API implements a k-Anonymity scheme, by which you can take a given
+        # password, hash it using sha1, and then send only the first 5 characters of the
+        # hex encoded digest. This avoids leaking data to the HIBP API, because without
+        # the rest of the hash, the HIBP service cannot even begin to brute force or do
+        # a reverse lookup to determine what password has just been sent to it. For More
+        # information see:
+        #       https://www.troyhunt.com/ive-just-launched-pwned-passwords-version-2/
+
+        self._metrics_increment("warehouse.compromised_password_check.start", tags=tags)
+
+        # To work with the HIBP API, we need the sha1 of the UTF8 encoded password.
+        hashed_password = (
+            hashlib.sha1(password.encode("utf8"), usedforsecurity=False)
+            .hexdigest()
+            .lower()
+        )
+
+        if self._offline_dataset is not None:
+            # We have a local mirror of the HIBP data set, so we can look the full
+            # digest up directly without ever having to leave this process.
+            compromised = bytes.fromhex(hashed_password) in self._offline_dataset
+        else:
+            suffixes = self._get_range(hashed_password[:5], tags=tags)
+            if suffixes is None:
+                # If we've failed to contact the HIBP service for some reason, we're
+                # going to "fail open" and allow the password. That's a better option
+                # then just hard failing whatever the user is attempting to do.
+                return False
+            compromised = _sorted_records_contain(
+                suffixes,
+                hashed_password[5:].upper().encode("ascii"),
+                _HIBP_SUFFIX_WIDTH,
+            )
+
+        # For our uses, we're going to consider any password that has ever appeared
+        # in a breach to be insecure, even if only once.
+        if compromised:
+            self._metrics_increment(
+                "warehouse.compromised_password_check.compromised", tags=tags
+            )
+            return True
 
         # If we made it to this point, then the password is safe.
         self._metrics_increment("warehouse.compromised_password_check.ok", tags=tags)
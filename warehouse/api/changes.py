@@ -0,0 +1,129 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import base64
+import binascii
+
+from packaging.utils import canonicalize_name
+from pyramid.httpexceptions import HTTPBadRequest
+from pyramid.view import view_config
+from sqlalchemy import select
+
+from warehouse.cache.origin import origin_cache
+from warehouse.packaging.models import JournalEntry
+from warehouse.utils.cors import _CORS_HEADERS
+
+# The number of journal entries that make up a single page of the changefeed.
+# This is fixed, rather than chosen by the client, so that every page is
+# uniquely identified by its cursor and can be shared by every client in the
+# caches in front of us.
+PAGE_SIZE = 1000
+
+# A full page only covers serials that have already been allocated, so it will
+# never change and can be cached for (effectively) forever. The last page of
+# the feed is still being filled in, so it can only be cached briefly.
+FULL_PAGE_TTL = 365 * 24 * 60 * 60  # 1 year
+PARTIAL_PAGE_TTL = 60  # 1 minute
+
+
+def encode_cursor(serial: int) -> str:
+    return base64.urlsafe_b64encode(str(serial).encode("ascii")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        serial = int(base64.urlsafe_b64decode(cursor.encode("ascii")), 10)
+    except UnicodeError, binascii.Error, ValueError:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+    if serial < 0:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+    return serial
+
+
+def _since(request) -> int:
+    # Clients following the feed use the opaque cursor that we handed them in
+    # the previous page, but a mirror that already knows the last serial that
+    # it has seen (e.g. from X-PyPI-Last-Serial) can start from there.
+    if (cursor := request.params.get("cursor")) is not None:
+        try:
+            return decode_cursor(cursor)
+        except ValueError:
+            raise HTTPBadRequest("Invalid cursor.")
+
+    if (since := request.params.get("since")) is not None:
+        try:
+            serial = int(since, 10)
+        except ValueError:
+            raise HTTPBadRequest("Invalid serial.")
+        if serial < 0:
+            raise HTTPBadRequest("Invalid serial.")
+        return serial
+
+    return 0
+
+
+def _set_cache_control(request, seconds):
+    if not request.registry.settings.get("pyramid.prevent_http_cache", False):
+        request.response.cache_control.public = True
+        request.response.cache_control.max_age = seconds
+
+
+@view_config(
+    route_name="api.changes",
+    renderer="json",
+    decorator=[
+        origin_cache(
+            PARTIAL_PAGE_TTL,
+            keys=["changes"],
+            stale_while_revalidate=5 * 60,  # 5 minutes
+            stale_if_error=1 * 24 * 60 * 60,  # 1 day
+        ),
+    ],
+)
+def changes(request):
+    since = _since(request)
+
+    entries = request.db.execute(
+        select(JournalEntry.id, JournalEntry.name)
+        .where(JournalEntry.id > since)
+        .order_by(JournalEntry.id)
+        .limit(PAGE_SIZE)
+    ).all()
+
+    # Coalesce the page down to the latest serial for each project, since a
+    # mirror only needs to know that a project has changed, not every change
+    # that has been made to it.
+    projects = {}
+    for serial, name in entries:
+        if name is not None:
+            key = canonicalize_name(name)
+            projects.pop(key, None)
+            projects[key] = {"name": name, "serial": serial}
+
+    last_serial = entries[-1].id if entries else since
+    complete = len(entries) == PAGE_SIZE
+
+    request.response.headers.update(_CORS_HEADERS)
+
+    # The contents of a page are entirely determined by the range of serials
+    # that it covers, so that range makes for a strong validator. This only
+    # holds as long as nothing else about the request (like the host it was
+    # made to) leaks into the body, which is why the link to the next page is
+    # relative.
+    request.response.etag = f"{since}-{last_serial}"
+    request.response.conditional_response = True
+
+    if complete:
+        request.response.override_ttl = FULL_PAGE_TTL
+        _set_cache_control(request, FULL_PAGE_TTL)
+    else:
+        _set_cache_control(request, PARTIAL_PAGE_TTL)
+
+    return {
+        "projects": list(projects.values()),
+        "last_serial": last_serial,
+        "next": request.route_path(
+            "api.changes", _query={"cursor": encode_cursor(last_serial)}
+        ),
+    }
@@ -4,8 +4,13 @@ from __future__ import annotations
 
 import typing
 
-from .interfaces import IQueryResultsCache
-from .services import RedisQueryResults
+from .interfaces import IACLCache, IDocumentCache, IQueryResultsCache, IVerdictCache
+from .services import (
+    RedisACLCache,
+    RedisDocumentCache,
+    RedisQueryResults,
+    RedisVerdictCache,
+)
 
 if typing.TYPE_CHECKING:
     from pyramid.config import Configurator
@@ -15,3 +20,6 @@ def includeme(config: Configurator) -> None:
     config.register_service_factory(
         RedisQueryResults.create_service, IQueryResultsCache
     )
+    config.register_service_factory(RedisDocumentCache.create_service, IDocumentCache)
+    config.register_service_factory(RedisVerdictCache.create_service, IVerdictCache)
+    config.register_service_factory(RedisACLCache.create_service, IACLCache)
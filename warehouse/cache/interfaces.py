@@ -26,3 +26,68 @@ class IQueryResultsCache(Interface):
     def set(key: str, value):
         """Set a cached result by key."""
         # TODO: do we need a set-with-expiration, a la `setex`?
+
+
+class IDocumentCache(Interface):
+    """
+    A cache for fully serialized response documents.
+
+    Documents are stored as bytes, and are tagged with the same surrogate keys
+    that are used for the origin cache so that they can be purged alongside
+    it.
+    """
+
+    def create_service(context, request):
+        """Create the service, bootstrap any configuration needed."""
+
+    def get(key: str) -> bytes | None:
+        """Get a cached document by key."""
+
+    def set(key: str, value: bytes, *, tags=()):
+        """Set a cached document by key, tagging it with the given tags."""
+
+    def purge(tags):
+        """Remove every cached document tagged with any of the given tags."""
+
+
+class IVerdictCache(Interface):
+    """
+    A cache of content that has already been scanned and found clean.
+
+    Verdicts are keyed by the digest of the content, and scoped to a ruleset
+    fingerprint so that changing the rules invalidates every prior verdict.
+    """
+
+    def create_service(context, request):
+        """Create the service, bootstrap any configuration needed."""
+
+    def get_clean(ruleset: str, digests) -> set[str]:
+        """Return the subset of the given digests known to be clean."""
+
+    def set_clean(ruleset: str, digests) -> None:
+        """Record the given digests as clean."""
+
+
+class IACLCache(Interface):
+    """
+    A cache of the principals that have been granted permissions on an object.
+
+    Entries are scoped to a version counter for their key, and bumping the
+    version invalidates every entry that was computed before the bump, even if
+    it is written back to the cache afterwards.
+    """
+
+    def create_service(context, request):
+        """Create the service, bootstrap any configuration needed."""
+
+    def get(key: str) -> tuple[int, object]:
+        """
+        Get the current version for the given key, along with the cached value
+        for that version, or None if there isn't one.
+        """
+
+    def set(key: str, version: int, value) -> None:
+        """Set the cached value for the given key, as of the given version."""
+
+    def bump(keys) -> None:
+        """Invalidate the cached values for each of the given keys."""
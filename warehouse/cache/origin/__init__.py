@@ -13,6 +13,7 @@ from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.exc import NoInspectionAvailable
 
 from warehouse import db
+from warehouse.cache.interfaces import IDocumentCache
 from warehouse.cache.origin.derivers import html_cache_deriver
 from warehouse.cache.origin.interfaces import IOriginCache
 from warehouse.utils.db import orm_session_from_obj
@@ -98,6 +99,15 @@ def execute_purge(config, session):
     if not purges:
         return
 
+    # Drop any serialized documents that were cached under these keys, so the
+    # next origin request doesn't serve a stale document to the CDN.
+    try:
+        document_cache_factory = config.find_service_factory(IDocumentCache)
+    except LookupError:
+        pass
+    else:
+        document_cache_factory(None, config).purge(purges)
+
     try:
         cacher_factory = config.find_service_factory(IOriginCache)
     except LookupError:
@@ -4,6 +4,7 @@ import time
 import urllib.parse
 
 import forcediphttpsadapter.adapters
+import redis
 import requests
 
 from zope.interface import implementer
@@ -12,6 +13,15 @@ from warehouse import tasks
 from warehouse.cache.origin.interfaces import IOriginCache
 from warehouse.metrics.interfaces import IMetricsService
 
+# The most surrogate keys that Fastly accepts in a single bulk purge request.
+# https://www.fastly.com/documentation/reference/api/purging/#bulk-purge-tag
+PURGE_BATCH_SIZE = 256
+
+# The Redis set holding keys waiting to be purged in the next batch, and the
+# marker recording that a batch purge has already been scheduled.
+PENDING_PURGES_KEY = "warehouse.cache.origin.fastly.pending-purges"
+PURGE_SCHEDULED_KEY = "warehouse.cache.origin.fastly.purge-scheduled"
+
 
 class UnsuccessfulPurgeError(Exception):
     pass
@@ -34,17 +44,63 @@ def purge_key(task, request, key):
         raise task.retry(exc=exc)
 
 
+@tasks.task(bind=True, ignore_result=True, acks_late=True)
+def purge_pending_keys(task, request):
+    cacher = request.find_service(IOriginCache)
+    metrics = request.find_service(IMetricsService, context=None)
+    try:
+        cacher.purge_pending(metrics=metrics)
+    except (
+        requests.ConnectionError,
+        requests.HTTPError,
+        requests.Timeout,
+        UnsuccessfulPurgeError,
+    ) as exc:
+        request.log.error("Error purging pending cache keys", error=str(exc))
+        raise task.retry(exc=exc)
+
+
 @implementer(IOriginCache)
 class FastlyCache:
-    def __init__(self, *, api_endpoint, api_connect_via, api_key, service_id, purger):
+    def __init__(
+        self,
+        *,
+        api_endpoint,
+        api_connect_via,
+        api_key,
+        service_id,
+        purger,
+        purge_batch_window=None,
+        redis_client=None,
+        batch_purger=None,
+    ):
         self.api_endpoint = api_endpoint
         self.api_connect_via = api_connect_via
         self.api_key = api_key
         self.service_id = service_id
         self._purger = purger
+        self.purge_batch_window = purge_batch_window
+        self.redis_client = redis_client
+        self._batch_purger = batch_purger
 
     @classmethod
     def create_service(cls, context, request):
+        kwargs = {}
+        # When a batch window is configured, purges are coalesced in Redis and
+        # issued as bulk purges once the window has elapsed, rather than as one
+        # task and request per key.
+        purge_batch_window = request.registry.settings.get(
+            "origin_cache.purge_batch_window"
+        )
+        if purge_batch_window:
+            kwargs.update(
+                purge_batch_window=int(purge_batch_window),
+                redis_client=redis.StrictRedis.from_url(
+                    request.registry.settings["db_results_cache.url"]
+                ),
+                batch_purger=request.task(purge_pending_keys).apply_async,
+            )
+
         return cls(
             api_endpoint=request.registry.settings.get(
                 "origin_cache.api_endpoint", "https://api.fastly.com"
@@ -55,6 +111,7 @@ class FastlyCache:
             api_key=request.registry.settings["origin_cache.api_key"],
             service_id=request.registry.settings["origin_cache.service_id"],
             purger=request.task(purge_key).delay,
+            **kwargs,
         )
 
     def cache(
@@ -93,8 +150,47 @@ class FastlyCache:
             response.headers["Surrogate-Control"] = ", ".join(values)
 
     def purge(self, keys):
-        for key in keys:
-            self._purger(key)
+        if self.purge_batch_window is None:
+            for key in keys:
+                self._purger(key)
+            return
+
+        keys = list(keys)
+        if not keys:
+            return
+
+        # Keys that are already pending are deduplicated by the set, and only
+        # the first purge within a window schedules the batch that drains it.
+        self.redis_client.sadd(PENDING_PURGES_KEY, *keys)
+        if self.redis_client.set(
+            PURGE_SCHEDULED_KEY, "1", nx=True, ex=self.purge_batch_window
+        ):
+            self._batch_purger(countdown=self.purge_batch_window)
+
+    def purge_pending(self, metrics):
+        # Clear the marker before draining, so that any keys added while we're
+        # draining schedule another batch instead of waiting on this one.
+        self.redis_client.unlink(PURGE_SCHEDULED_KEY)
+
+        while keys := self.redis_client.spop(PENDING_PURGES_KEY, PURGE_BATCH_SIZE):
+            keys = sorted(
+                key.decode("utf-8") if isinstance(key, bytes) else key for key in keys
+            )
+            metrics.histogram(
+                "warehouse.cache.origin.fastly.purge_batch.size", len(keys)
+            )
+            start = time.monotonic()
+            try:
+                self.purge_keys(keys, metrics=metrics)
+            except Exception:
+                # Return the keys to the pending set, so that they are purged
+                # when the task is retried.
+                self.redis_client.sadd(PENDING_PURGES_KEY, *keys)
+                raise
+            metrics.timing(
+                "warehouse.cache.origin.fastly.purge_batch.duration",
+                (time.monotonic() - start) * 1000,
+            )
 
     def _purge_key(self, key, connect_via=None):
         path = f"/service/{self.service_id}/purge/{key}"
@@ -120,6 +216,37 @@ class FastlyCache:
         if resp.json().get("status") != "ok":
             raise UnsuccessfulPurgeError(f"Could not purge {key!r}")
 
+    def _purge_keys(self, keys, connect_via=None):
+        path = f"/service/{self.service_id}/purge"
+        url = urllib.parse.urljoin(self.api_endpoint, path)
+        headers = {
+            "Accept": "application/json",
+            "Fastly-Key": self.api_key,
+            "Fastly-Soft-Purge": "1",
+        }
+
+        session = requests.Session()
+
+        if connect_via is not None:
+            session.mount(
+                self.api_endpoint,
+                forcediphttpsadapter.adapters.ForcedIPHTTPSAdapter(
+                    dest_ip=self.api_connect_via
+                ),
+            )
+
+        resp = session.post(url, headers=headers, json={"surrogate_keys": keys})
+        resp.raise_for_status()
+        # A successful bulk purge responds with a purge id for every key.
+        if set(resp.json()) != set(keys):
+            raise UnsuccessfulPurgeError(f"Could not purge {keys!r}")
+
+    def _double_purge_keys(self, keys, connect_via=None):
+        self._purge_keys(keys, connect_via=connect_via)
+        # https://developer.fastly.com/learning/concepts/purging/#race-conditions
+        time.sleep(2)
+        self._purge_keys(keys, connect_via=connect_via)
+
     def _double_purge_key(self, key, connect_via=None):
         self._purge_key(key, connect_via=connect_via)
         # https://developer.fastly.com/learning/concepts/purging/#race-conditions
@@ -138,6 +265,18 @@ class FastlyCache:
             )
             self._double_purge_key(key)  # Do not connect via on fallback
 
+    def purge_keys(self, keys, metrics=None):
+        try:
+            self._purge_keys(keys, connect_via=self.api_connect_via)
+        except requests.ConnectionError:
+            if self.api_connect_via is None:
+                raise
+            metrics.increment(
+                "warehouse.cache.origin.fastly.connect_via.failed",
+                tags=[f"ip_address:{self.api_connect_via}"],
+            )
+            self._double_purge_keys(keys)  # Do not connect via on fallback
+
 
 @implementer(IOriginCache)
 class NullFastlyCache(FastlyCache):
@@ -155,3 +294,17 @@ class NullFastlyCache(FastlyCache):
         print("Origin cache purge issued:")  # noqa: T201
         print(f"* URL: {url!r}")  # noqa: T201
         print(f"* Headers: {headers!r}")  # noqa: T201
+
+    def _purge_keys(self, keys, connect_via=None):
+        path = f"/service/{self.service_id}/purge"
+        url = urllib.parse.urljoin(self.api_endpoint, path)
+        headers = {
+            "Accept": "application/json",
+            "Fastly-Key": self.api_key,
+            "Fastly-Soft-Purge": "1",
+        }
+
+        print("Origin cache bulk purge issued:")  # noqa: T201
+        print(f"* URL: {url!r}")  # noqa: T201
+        print(f"* Headers: {headers!r}")  # noqa: T201
+        print(f"* Keys: {keys!r}")  # noqa: T201
@@ -2,18 +2,34 @@
 
 from __future__ import annotations
 
+import functools
 import typing
 
 import orjson
 import redis
+import structlog
 
 from zope.interface import implementer
 
-from warehouse.cache.interfaces import IQueryResultsCache
+from warehouse.cache.interfaces import (
+    IACLCache,
+    IDocumentCache,
+    IQueryResultsCache,
+    IVerdictCache,
+)
 
 if typing.TYPE_CHECKING:
     from pyramid.request import Request
 
+logger = structlog.get_logger(__name__)
+
+
+@functools.cache
+def _shared_redis_client(url):
+    # Shared by every request in the worker, rather than opening a new
+    # connection pool for each one.
+    return redis.StrictRedis.from_url(url)
+
 
 @implementer(IQueryResultsCache)
 class RedisQueryResults:
@@ -46,3 +62,199 @@ class RedisQueryResults:
         # serialize the value as a JSON string
         value = orjson.dumps(value)
         self.redis_client.set(key, value)
+
+
+@implementer(IDocumentCache)
+class RedisDocumentCache:
+    """
+    A Redis-based serialized document cache.
+
+    Each document is stored under its own key with an expiration, and the key
+    is recorded in a set for each of its tags so that purging a tag only needs
+    to touch the documents carrying it. Redis errors are logged and treated as
+    a miss, so an unavailable cache only means the document is generated again.
+    """
+
+    def __init__(self, redis_client, *, expires: int = 24 * 60 * 60):
+        self.redis_client = redis_client
+        self.expires = expires
+
+    @classmethod
+    def create_service(cls, _context, request: Request) -> RedisDocumentCache:
+        redis_url = request.registry.settings["db_results_cache.url"]
+        return cls(_shared_redis_client(redis_url))
+
+    def get(self, key: str) -> bytes | None:
+        """Get a cached document by key."""
+        try:
+            return self.redis_client.get(f"document:{key}")
+        except redis.exceptions.RedisError:
+            logger.warning("document_cache_error", exc_info=True)
+            return None
+
+    def set(self, key: str, value: bytes, *, tags=()) -> None:
+        """Set a cached document by key, tagging it with the given tags."""
+        try:
+            with self.redis_client.pipeline() as pipeline:
+                pipeline.set(f"document:{key}", value, ex=self.expires)
+                for tag in tags:
+                    pipeline.sadd(f"document-tag:{tag}", key)
+                    pipeline.expire(f"document-tag:{tag}", self.expires)
+                pipeline.execute()
+        except redis.exceptions.RedisError:
+            logger.warning("document_cache_error", exc_info=True)
+
+    def purge(self, tags) -> None:
+        """Remove every cached document tagged with any of the given tags."""
+        tag_keys = [f"document-tag:{tag}" for tag in tags]
+        if not tag_keys:
+            return
+
+        try:
+            keys = set()
+            for tag_key in tag_keys:
+                keys.update(self.redis_client.smembers(tag_key))
+
+            self.redis_client.unlink(
+                *tag_keys,
+                *(f"document:{_decode(key)}" for key in keys),
+            )
+        except redis.exceptions.RedisError:
+            logger.warning("document_cache_error", exc_info=True)
+
+
+@implementer(IVerdictCache)
+class RedisVerdictCache:
+    """
+    A Redis-based cache of clean scan verdicts.
+
+    Each verdict is its own key with an expiration, so that verdicts for
+    content which isn't seen again age out. Lookups for a batch of digests
+    are a single round-trip. Redis errors are logged and treated as a miss,
+    so an unavailable cache only means the content is scanned again.
+    """
+
+    def __init__(self, redis_client, *, expires: int = 7 * 24 * 60 * 60):
+        self.redis_client = redis_client
+        self.expires = expires
+
+    @classmethod
+    def create_service(cls, _context, request: Request) -> RedisVerdictCache:
+        redis_url = request.registry.settings["db_results_cache.url"]
+        return cls(_shared_redis_client(redis_url))
+
+    def get_clean(self, ruleset: str, digests) -> set[str]:
+        """Return the subset of the given digests known to be clean."""
+        digests = list(digests)
+        if not digests:
+            return set()
+        try:
+            verdicts = self.redis_client.mget(
+                [f"verdict:{ruleset}:{digest}" for digest in digests]
+            )
+        except redis.exceptions.RedisError:
+            logger.warning("verdict_cache_error", exc_info=True)
+            return set()
+        return {
+            digest
+            for digest, verdict in zip(digests, verdicts, strict=True)
+            if verdict is not None
+        }
+
+    def set_clean(self, ruleset: str, digests) -> None:
+        """Record the given digests as clean."""
+        try:
+            with self.redis_client.pipeline() as pipeline:
+                for digest in digests:
+                    pipeline.set(f"verdict:{ruleset}:{digest}", b"", ex=self.expires)
+                pipeline.execute()
+        except redis.exceptions.RedisError:
+            logger.warning("verdict_cache_error", exc_info=True)
+
+
+@implementer(IACLCache)
+class RedisACLCache:
+    """
+    A Redis-based, versioned cache of compiled ACLs.
+
+    Each key has a version counter alongside a single cached entry, which
+    records the version it was computed at. Both are fetched in one round-trip,
+    and an entry is only used when its version is still the current one, so an
+    entry computed from data that has since changed is never served, even if it
+    was written after the version was bumped. Redis errors are logged and
+    treated as a miss, so an unavailable cache only means the ACL is computed
+    again.
+
+    Since these entries grant access, they're only kept for a few minutes, to
+    bound how long one can outlive a bump that failed to reach Redis.
+    """
+
+    def __init__(self, redis_client, *, expires: int = 5 * 60):
+        self.redis_client = redis_client
+        self.expires = expires
+
+    @classmethod
+    def create_service(cls, _context, request: Request) -> RedisACLCache:
+        redis_url = request.registry.settings["db_results_cache.url"]
+        return cls(_shared_redis_client(redis_url))
+
+    def get(self, key: str) -> tuple[int, object]:
+        """
+        Get the current version for the given key, along with the cached value
+        for that version, or None if there isn't one.
+        """
+        try:
+            version, entry = self.redis_client.mget(
+                [f"acl-version:{key}", f"acl:{key}"]
+            )
+        except redis.exceptions.RedisError:
+            logger.warning("acl_cache_error", exc_info=True)
+            return 0, None
+
+        version = int(version) if version is not None else 0
+        if entry is not None:
+            entry = orjson.loads(entry)
+            if entry["version"] == version:
+                return version, entry["value"]
+        return version, None
+
+    def set(self, key: str, version: int, value) -> None:
+        """Set the cached value for the given key, as of the given version."""
+        try:
+            self.redis_client.set(
+                f"acl:{key}",
+                orjson.dumps({"version": version, "value": value}),
+                ex=self.expires,
+            )
+        except redis.exceptions.RedisError:
+            logger.warning("acl_cache_error", exc_info=True)
+
+    def bump(self, keys) -> None:
+        """Invalidate the cached values for each of the given keys."""
+        keys = list(keys)
+        if not keys:
+            return
+
+        # The version counters don't expire, since an entry computed at a
+        # version that disappeared would otherwise become current again.
+        try:
+            with self.redis_client.pipeline() as pipeline:
+                for key in keys:
+                    pipeline.incr(f"acl-version:{key}")
+                pipeline.execute()
+        except redis.exceptions.RedisError:
+            logger.warning("acl_cache_error", exc_info=True)
+        else:
+            return
+
+        # We couldn't bump the versions, so at least try to drop the entries
+        # that are now stale. If Redis is entirely unavailable, they'll still
+        # be served until they expire, which is why we keep them briefly.
+        try:
+            self.redis_client.unlink(*(f"acl:{key}" for key in keys))
+        except redis.exceptions.RedisError:
+            logger.warning("acl_cache_error", exc_info=True)
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
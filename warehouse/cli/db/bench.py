@@ -0,0 +1,160 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import click
+
+from warehouse.cli.db import db
+
+
+@db.command()
+@click.option(
+    "--uploaders",
+    "-u",
+    type=int,
+    multiple=True,
+    default=[1, 2, 4, 8, 16, 32],
+    show_default=True,
+    help="How many concurrent uploaders to benchmark with, may be repeated.",
+)
+@click.option(
+    "--duration",
+    type=float,
+    default=10,
+    show_default=True,
+    help="How many seconds to run each level of concurrency for.",
+)
+@click.option(
+    "--work",
+    type=float,
+    default=50,
+    show_default=True,
+    help=(
+        "How many milliseconds each upload spends between writing its journal "
+        "entry and committing, e.g. uploading the file to storage."
+    ),
+)
+@click.option(
+    "--legacy",
+    is_flag=True,
+    help=(
+        "Also take the journal lock as soon as the journal entry is flushed, "
+        "as uploads used to, for a baseline to compare against."
+    ),
+)
+@click.pass_obj
+def bench_journals(
+    config, uploaders, duration, work, legacy
+):  # pragma: no cover # dev-only tool
+    """
+    Benchmark journal writes with concurrent uploaders, DEVELOPMENT ONLY
+
+    Each uploader repeatedly writes a journal entry, does --work milliseconds
+    of other work, and commits, the same as an upload does. Meanwhile, a
+    watcher follows the new serials the way a mirror would, and counts any
+    serial that becomes visible after a higher one already had.
+    """
+    # Imported here because we don't want to trigger an import from anything
+    # but warehouse.cli at the module scope.
+    import statistics
+    import threading
+    import time
+
+    from sqlalchemy import delete, func, select
+
+    from warehouse.config import Environment
+    from warehouse.db import Session
+    from warehouse.packaging.models import JournalEntry, _lock_journals
+
+    # bail early if not in development
+    if not config.registry.settings.get("warehouse.env") == Environment.development:
+        raise click.ClickException(
+            "This command is only available in development mode."
+        )
+
+    engine = config.registry["sqlalchemy.engine"]
+    name = "warehouse-journal-benchmark"
+
+    def upload(deadline, latencies):
+        session = Session(bind=engine)
+        try:
+            while (start := time.monotonic()) < deadline:
+                session.add(JournalEntry(name=name, action="benchmark"))
+                session.flush()
+                if legacy:
+                    _lock_journals(session)
+                time.sleep(work / 1000)
+                session.commit()
+                latencies.append(time.monotonic() - start)
+        finally:
+            session.close()
+
+    def watch(stop, start_serial, out_of_order):
+        seen = set()
+        highest = start_serial
+        session = Session(bind=engine)
+        try:
+            while not stop.is_set():
+                serials = session.scalars(
+                    select(JournalEntry.id).where(
+                        JournalEntry.name == name,
+                        JournalEntry.id > start_serial,
+                    )
+                ).all()
+                session.rollback()
+                if new := set(serials) - seen:
+                    # Any serial that shows up after we have already seen a
+                    # higher one would have been skipped by a mirror.
+                    out_of_order[0] += sum(serial < highest for serial in new)
+                    highest = max(highest, *new)
+                    seen |= new
+                stop.wait(0.01)
+        finally:
+            session.close()
+
+    session = Session(bind=engine)
+    try:
+        click.echo(
+            f"{'uploaders':>9} {'uploads':>8} {'uploads/s':>10} "
+            f"{'p50 ms':>8} {'p99 ms':>8} {'out of order':>12}"
+        )
+        for count in uploaders:
+            start_serial = session.scalar(
+                select(func.coalesce(func.max(JournalEntry.id), 0))
+            )
+            session.rollback()
+
+            latencies = []
+            out_of_order = [0]
+            stop = threading.Event()
+            watcher = threading.Thread(
+                target=watch, args=(stop, start_serial, out_of_order)
+            )
+            watcher.start()
+
+            deadline = time.monotonic() + duration
+            threads = [
+                threading.Thread(target=upload, args=(deadline, latencies))
+                for _ in range(count)
+            ]
+            started = time.monotonic()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.monotonic() - started
+
+            stop.set()
+            watcher.join()
+
+            quantiles = (
+                statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+            )
+            click.echo(
+                f"{count:>9} {len(latencies):>8} {len(latencies) / elapsed:>10.1f} "
+                f"{quantiles[49] * 1000 if quantiles else 0:>8.1f} "
+                f"{quantiles[98] * 1000 if quantiles else 0:>8.1f} "
+                f"{out_of_order[0]:>12}"
+            )
+    finally:
+        session.execute(delete(JournalEntry).where(JournalEntry.name == name))
+        session.commit()
+        session.close()
@@ -0,0 +1,38 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import click
+
+from warehouse.cli import warehouse
+from warehouse.packaging.tasks import rerender_descriptions as _rerender_descriptions
+
+
+@warehouse.group()
+def descriptions():
+    """
+    Manage rendered project descriptions.
+    """
+
+
+@descriptions.command()
+@click.option(
+    "--partition-size",
+    default=1000,
+    show_default=True,
+    help="How many descriptions to render and commit at a time.",
+)
+@click.option(
+    "--processes",
+    type=int,
+    default=None,
+    help="How many worker processes to render with. Defaults to one per CPU.",
+)
+@click.pass_obj
+def rerender(config, partition_size, processes):
+    """
+    Re-render every description not rendered by the current readme_renderer.
+    """
+
+    request = config.task(_rerender_descriptions).get_request()
+    config.task(_rerender_descriptions).run(
+        request, partition_size=partition_size, processes=processes
+    )
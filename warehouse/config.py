@@ -352,6 +352,9 @@ def configure(settings=None):
     maybe_set(settings, "warehouse.num_proxies", "WAREHOUSE_NUM_PROXIES", int)
     maybe_set(settings, "warehouse.domain", "WAREHOUSE_DOMAIN")
     maybe_set(settings, "forklift.domain", "FORKLIFT_DOMAIN")
+    maybe_set(
+        settings, "forklift.upload_profile_rate", "FORKLIFT_UPLOAD_PROFILE_RATE", float
+    )
     maybe_set(settings, "auth.domain", "AUTH_DOMAIN")
     maybe_set(
         settings, "userdocs.domain", "USERDOCS_DOMAIN", default="https://docs.pypi.org"
@@ -391,6 +394,7 @@ def configure(settings=None):
     maybe_set(settings, "sentry.transport", "SENTRY_TRANSPORT")
     maybe_set_redis(settings, "sessions.url", "REDIS_URL", db=2)
     maybe_set_redis(settings, "ratelimit.url", "REDIS_URL", db=3)
+    maybe_set(settings, "ratelimit.local_ttl", "RATELIMIT_LOCAL_TTL", coercer=int)
     maybe_set_redis(settings, "db_results_cache.url", "REDIS_URL", db=5)
     maybe_set(settings, "captcha.backend", "CAPTCHA_BACKEND")
     maybe_set(settings, "recaptcha.site_key", "RECAPTCHA_SITE_KEY")
@@ -403,6 +407,7 @@ def configure(settings=None):
     maybe_set(settings, "docs.url", "DOCS_URL")
     maybe_set(settings, "statuspage.url", "STATUSPAGE_URL")
     maybe_set(settings, "hibp.api_key", "HIBP_API_KEY")
+    maybe_set(settings, "hibp.offline_dataset", "HIBP_OFFLINE_DATASET")
     maybe_set(settings, "token.password.secret", "TOKEN_PASSWORD_SECRET")
     maybe_set(settings, "token.email.secret", "TOKEN_EMAIL_SECRET")
     maybe_set(settings, "token.two_factor.secret", "TOKEN_TWO_FACTOR_SECRET")
@@ -1,12 +1,20 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import cgi
+import cProfile
+import io
+import pstats
+import random
+
+import structlog
 
 from pyramid.httpexceptions import HTTPBadRequest, HTTPForbidden
 
 from warehouse.admin.flags import AdminFlagValue
 from warehouse.forklift.utils import _exc_with_message
 
+logger = structlog.get_logger(__name__)
+
 
 def sanitize(wrapped):
     """
@@ -105,3 +113,33 @@ def ensure_uploads_allowed(wrapped):
         return wrapped(context, request)
 
     return wrapper
+
+
+def profile_upload(wrapped):
+    """
+    Opt-in request level profiling of the upload view.
+
+    When ``forklift.upload_profile_rate`` is set, that fraction of uploads are
+    run under cProfile, and the most expensive calls are logged so that a
+    regression can be traced to the code responsible for it.
+    """
+
+    def wrapper(context, request):
+        rate = request.registry.settings.get("forklift.upload_profile_rate")
+        if not rate or random.random() >= rate:  # noqa: S311
+            return wrapped(context, request)
+
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(wrapped, context, request)
+        finally:
+            stream = io.StringIO()
+            stats = pstats.Stats(profiler, stream=stream)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(50)
+            logger.info(
+                "upload_profile",
+                filename=getattr(request.POST.get("content"), "filename", None),
+                profile=stream.getvalue(),
+            )
+
+    return wrapper
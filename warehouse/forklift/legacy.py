@@ -1,11 +1,14 @@
 # SPDX-License-Identifier: Apache-2.0
+import concurrent.futures
 import datetime
 import hashlib
 import hmac
+import mmap
 import os.path
 import re
 import tarfile
 import tempfile
+import time
 import zipfile
 
 from contextlib import ExitStack, nullcontext
@@ -38,6 +41,7 @@ from warehouse.admin.flags import AdminFlagValue
 from warehouse.attestations.errors import AttestationUploadError
 from warehouse.attestations.interfaces import IIntegrityService
 from warehouse.authnz import Permissions
+from warehouse.cache.interfaces import IVerdictCache
 from warehouse.classifiers.models import Classifier
 from warehouse.constants import ONE_GIB, ONE_MIB
 from warehouse.email import (
@@ -46,7 +50,11 @@ from warehouse.email import (
 )
 from warehouse.events.tags import EventTag
 from warehouse.forklift import metadata
-from warehouse.forklift.decorators import ensure_uploads_allowed, sanitize
+from warehouse.forklift.decorators import (
+    ensure_uploads_allowed,
+    profile_upload,
+    sanitize,
+)
 from warehouse.forklift.forms import UploadForm, _filetype_extension_mapping
 from warehouse.forklift.utils import _exc_with_message
 from warehouse.macaroons.models import Macaroon
@@ -86,6 +94,11 @@ MAXIMUM_AGE_FOR_NEW_UPLOADS_SECONDS = datetime.timedelta(
 
 COMPRESSION_RATIO_MIN_SIZE = 64 * ONE_MIB
 
+# Uploads are read in large chunks, both to cut down on the number of reads
+# and so that each chunk is large enough for hashlib to release the GIL while
+# the digests are computed concurrently.
+UPLOAD_CHUNK_SIZE = 1 * ONE_MIB
+
 # If the zip file decompressed to 50x more space
 # than it is uncompressed, consider it a ZIP bomb.
 # Note that packages containing interface descriptions, JSON,
@@ -283,11 +296,32 @@ def _validate_filename(filename, filetype):
 
 
 def _open_dist_file(filename, stack: ExitStack):
+    if not filename.endswith((".zip", ".whl", ".tar.gz")):
+        raise ValueError(f"Unsupported distribution file: {filename}")
+
+    # Every validator shares this one read-only memory mapped view of the
+    # spooled upload, rather than each of them reading the file again.
+    # Ignore SIM115: the file is closed by the ExitStack.
+    fp = stack.enter_context(open(filename, "rb"))  # noqa: SIM115
+    try:
+        view = stack.enter_context(mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ))
+    except ValueError:
+        # Empty files can't be memory mapped, the archive readers below will
+        # reject them anyways.
+        view = fp
+
     if filename.endswith((".zip", ".whl")):
-        return stack.enter_context(zipfile.ZipFile(filename))
-    if filename.endswith(".tar.gz"):
-        return stack.enter_context(tarfile.open(filename, mode="r:gz"))
-    raise ValueError(f"Unsupported distribution file: {filename}")
+        return stack.enter_context(zipfile.ZipFile(view))
+    return stack.enter_context(tarfile.open(fileobj=view, mode="r:gz"))
+
+
+def _update_hashes(hashers, chunk, executor):
+    """
+    Feed a chunk to every hasher concurrently, hashlib releases the GIL while
+    hashing large buffers so the digests are computed in parallel.
+    """
+    for future in [executor.submit(h.update, chunk) for h in hashers]:
+        future.result()
 
 
 def _is_valid_dist_file(
@@ -297,6 +331,7 @@ def _is_valid_dist_file(
     *,
     scan=True,
     archive=None,
+    verdict_cache=None,
 ):
     """
     Perform some basic checks to see whether the indicated file could be
@@ -310,6 +345,8 @@ def _is_valid_dist_file(
     the upload request.
 
     If ``archive`` is provided, it is retained by the caller for subsequent checks.
+
+    If ``verdict_cache`` is provided, members already scanned clean are skipped.
     """
     is_zipfile = bool(filename and zipfile.is_zipfile(filename))
     is_tarfile = bool(filename and tarfile.is_tarfile(filename))
@@ -392,6 +429,7 @@ def _is_valid_dist_file(
                         archive_name=os.path.basename(filename),
                         archive_type="zip",
                         metrics=metrics,
+                        verdict_cache=verdict_cache,
                     )
                     if yara_match is not None:
                         sentry_sdk.capture_message(
@@ -449,6 +487,7 @@ def _is_valid_dist_file(
                         archive_name=os.path.basename(filename),
                         archive_type="tar",
                         metrics=metrics,
+                        verdict_cache=verdict_cache,
                     )
                     if yara_match is not None:
                         sentry_sdk.capture_message(
@@ -595,6 +634,28 @@ def _ensure_user_can_upload(request: Request) -> None:
         ) from None
 
 
+class _UploadStageTimer:
+    """
+    Records how long each stage of an upload took, as the time elapsed since
+    the previous stage finished, so that a regression in any one stage shows
+    up separately from the overall upload latency.
+    """
+
+    def __init__(self, metrics, filetype):
+        self.metrics = metrics
+        self.filetype = filetype
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.metrics.histogram(
+            "warehouse.upload.stage.duration",
+            (now - self._last) * 1000,
+            tags=[f"stage:{stage}", f"filetype:{self.filetype}"],
+        )
+        self._last = now
+
+
 def _close_upload_tempfiles(request):
     # WebOb's multipart parsing creates two tempfiles when the body is large
     # enough to exceed ``request_body_tempfile_limit``: one buffering the raw
@@ -617,7 +678,7 @@ def _close_upload_tempfiles(request):
     require_methods=["POST"],
     has_translations=True,
     permit_duplicate_post_keys=True,
-    decorator=[sanitize, ensure_uploads_allowed],
+    decorator=[sanitize, ensure_uploads_allowed, profile_upload],
 )
 def file_upload(request):
     # Log an attempt to upload
@@ -629,6 +690,9 @@ def file_upload(request):
     # reclaimed by GC later (which would surface as a ResourceWarning).
     request.add_finished_callback(_close_upload_tempfiles)
 
+    # Time each stage of the upload, tagged by the (as yet unvalidated) file type.
+    stages = _UploadStageTimer(request.metrics, request.POST.get("filetype"))
+
     # This is a list of warnings that we'll emit *IF* the request is successful.
     warnings: list[str] = []
 
@@ -728,10 +792,10 @@ def file_upload(request):
         request.metrics.increment("warehouse.upload.failed", tags=["reason:no-file"])
         raise _exc_with_message(HTTPBadRequest, "Upload payload does not have a file.")
 
+    stages.mark("form-validation")
+
     # Set a statement timeout for this connection to prevent long-running
-    # transactions from holding database locks indefinitely. The upload
-    # operation holds a global advisory lock for journal monotonicity,
-    # so limiting transaction duration prevents lock pile-up.
+    # statements from holding database locks indefinitely.
     # 600 seconds (10 minutes) allows for large file uploads while
     # providing an upper bound on lock duration.
     request.db.execute(text("SET statement_timeout = '600s'"))
@@ -876,6 +940,8 @@ def file_upload(request):
                     project_id=project.id,
                 )
             )
+    stages.mark("project")
+
     # Update name if it differs but is still equivalent. We don't need to check if
     # they are equivalent when normalized because that's already been done when we
     # queried for the project.
@@ -889,7 +955,10 @@ def file_upload(request):
         description_content_type = meta.description_content_type or "text/x-rst"
 
         rendered = readme.render(
-            meta.description, description_content_type, use_fallback=False
+            meta.description,
+            description_content_type,
+            use_fallback=False,
+            metrics=request.metrics,
         )
 
         # Uploading should prevent broken rendered descriptions.
@@ -1093,6 +1162,8 @@ def file_upload(request):
         #       at least this should be some sort of hook or trigger.
         _sort_releases(request, project)
 
+    stages.mark("release")
+
     # Pull the filename out of our POST data.
     filename = request.POST["content"].filename
 
@@ -1123,15 +1194,22 @@ def file_upload(request):
 
         # Buffer the entire file onto disk, checking the hash of the file as we
         # go along.
-        with open(temporary_filename, "wb") as fp:
+        file_hashes = {
+            "md5": hashlib.md5(usedforsecurity=False),
+            "sha256": hashlib.sha256(),
+            "blake2_256": hashlib.blake2b(digest_size=256 // 8),
+        }
+        with (
+            open(temporary_filename, "wb") as fp,
+            concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(file_hashes), thread_name_prefix="upload-hash"
+            ) as hash_executor,
+        ):
             file_size = 0
-            file_hashes = {
-                "md5": hashlib.md5(usedforsecurity=False),
-                "sha256": hashlib.sha256(),
-                "blake2_256": hashlib.blake2b(digest_size=256 // 8),
-            }
             metadata_file_hashes = {}
-            for chunk in iter(lambda: request.POST["content"].file.read(8096), b""):
+            for chunk in iter(
+                lambda: request.POST["content"].file.read(UPLOAD_CHUNK_SIZE), b""
+            ):
                 file_size += len(chunk)
                 if file_size > file_size_limit:
                     raise _exc_with_message(
@@ -1159,12 +1237,13 @@ def file_upload(request):
                         ),
                     )
                 fp.write(chunk)
-                for hasher in file_hashes.values():
-                    hasher.update(chunk)
+                _update_hashes(file_hashes.values(), chunk, hash_executor)
 
         # Take our hash functions and compute the final hashes for them now.
         file_hashes = {k: h.hexdigest().lower() for k, h in file_hashes.items()}
 
+        stages.mark("hashing")
+
         # Actually verify the digests that we've gotten. We're going to use
         # hmac.compare_digest even though we probably don't actually need to
         # because it's better safe than sorry. In the case of multiple digests
@@ -1259,8 +1338,11 @@ def file_upload(request):
                 HTTPBadRequest, "Only one sdist may be uploaded per release."
             )
 
+        stages.mark("duplicate-checks")
+
         # Check the file to make sure it is a valid distribution file.
         _scan = not request.flags.enabled(AdminFlagValue.DISABLE_UPLOAD_SCANNING)
+        verdict_cache = request.find_service(IVerdictCache) if _scan else None
         with request.metrics.timed(
             "warehouse.upload.validate",
             tags=[f"filetype:{form.filetype.data}"],
@@ -1277,6 +1359,7 @@ def file_upload(request):
                     form.filetype.data,
                     request.metrics,
                     scan=_scan,
+                    verdict_cache=verdict_cache,
                 )
             else:
                 _valid, _msg = _is_valid_dist_file(
@@ -1285,6 +1368,7 @@ def file_upload(request):
                     request.metrics,
                     scan=_scan,
                     archive=upload_archive,
+                    verdict_cache=verdict_cache,
                 )
         if not _valid:
             request.metrics.increment(
@@ -1604,6 +1688,8 @@ def file_upload(request):
                 k: h.hexdigest().lower() for k, h in metadata_file_hashes.items()
             }
 
+        stages.mark("validation")
+
         # If the user provided attestations, verify them
         # We persist these attestations subsequently, only after the
         # release file is persisted.
@@ -1686,6 +1772,8 @@ def file_upload(request):
             # Log successful attestation upload
             request.metrics.increment("warehouse.upload.attestations.ok")
 
+        stages.mark("attestations")
+
         # TODO: We need a better answer about how to make this transactional so
         #       this won't take affect until after a commit has happened, for
         #       now we'll just ignore it and save it before the transaction is
@@ -1714,6 +1802,8 @@ def file_upload(request):
                 },
             )
 
+    stages.mark("storage")
+
     # For existing releases, we check if any of the existing project URLs are unverified
     # and have been verified in the current upload. In that case, we mark them as
     # verified.
@@ -1743,11 +1833,9 @@ def file_upload(request):
     # TODO: This should be handled by some sort of database trigger or
     #       a SQLAlchemy hook or the like instead of doing it inline in
     #       this view.
-    # NOTE: JournalEntries are intentionally deferred until here (after storage
-    #       upload) to minimize advisory lock hold time. ensure_monotonic_journals
-    #       acquires a global advisory lock whenever a JournalEntry is flushed.
-    #       Keeping them near the final flush prevents the lock from being held
-    #       through the S3 upload, reducing contention between concurrent uploads.
+    # NOTE: JournalEntries are only given their final serial when the
+    #       transaction commits, see ensure_monotonic_journals, so adding them
+    #       here doesn't serialize concurrent uploads.
     if is_new_release:
         request.db.add(
             JournalEntry(
@@ -1768,6 +1856,8 @@ def file_upload(request):
 
     request.db.flush()  # server default columns for celery  # ast-grep-ignore: db-flush
 
+    stages.mark("journal")
+
     # Push updates to BigQuery
     dist_metadata = {
         "metadata_version": meta.metadata_version,
@@ -1839,6 +1929,8 @@ def file_upload(request):
     # Dispatch our task to sync this to cache as soon as possible
     request.task(sync_file_to_cache).delay(file_.id)
 
+    stages.mark("task-dispatch")
+
     # Return any warnings that we've accumulated as the response body.
     return HTTPOk(body="\n".join(warnings))
 
@@ -1,12 +1,16 @@
 # SPDX-License-Identifier: Apache-2.0
 
+import orjson
+
 from packaging.utils import canonicalize_name, canonicalize_version
 from pyramid.httpexceptions import HTTPMovedPermanently, HTTPNotFound
 from pyramid.view import view_config
+from sqlalchemy import select
 from sqlalchemy.exc import MultipleResultsFound, NoResultFound
 from sqlalchemy.orm import Load, contains_eager, joinedload
 
 from warehouse.cache.http import cache_control
+from warehouse.cache.interfaces import IDocumentCache
 from warehouse.cache.origin import origin_cache
 from warehouse.packaging.models import (
     Description,
@@ -40,21 +44,31 @@ _PROJECT_CACHE_DECORATOR = [
 
 
 def _json_data(request, project, release, *, all_releases):
-    # Get all of the releases and files for this project.
+    # Get all of the releases and files for this project, selecting only the
+    # columns that we actually serialize as plain rows rather than building
+    # full ORM instances for every file.
     release_files = (
-        request.db.query(Release, File)
-        .options(
-            Load(Release).load_only(
-                Release.version,
-                Release.requires_python,
-                Release.yanked,
-                Release.yanked_reason,
-            )
+        select(
+            Release.version,
+            Release.requires_python,
+            Release.yanked,
+            Release.yanked_reason,
+            File.filename,
+            File.packagetype,
+            File.python_version,
+            File.comment_text,
+            File.md5_digest,
+            File.sha256_digest,
+            File.blake2_256_digest,
+            File.metadata_file_sha256_digest,
+            File.size,
+            File.upload_time,
+            File.path,
         )
         .outerjoin(File)
-        .filter(Release.project == project)
+        .where(Release.project_id == project.id)
         # Exclude releases in quarantine.
-        .filter(
+        .where(
             Release.lifecycle_status.is_distinct_from(LifecycleStatus.QuarantineEnter)
         )
     )
@@ -62,7 +76,7 @@ def _json_data(request, project, release, *, all_releases):
     # If we're not looking for all_releases, then we'll filter this further
     # to just this release.
     if not all_releases:
-        release_files = release_files.filter(Release.id == release.id)
+        release_files = release_files.where(Release.id == release.id)
 
     # Get the raw description and description content type for this release
     release_description = (
@@ -73,60 +87,54 @@ def _json_data(request, project, release, *, all_releases):
     )
 
     # Finally set an ordering, and execute the query.
-    release_files = release_files.order_by(
-        Release._pypi_ordering.desc(), File.filename
-    ).all()
-
-    # Map our releases + files into a dictionary that maps each release to a
-    # list of all its files.
-    releases_and_files: dict[Release, list[File]] = {}
-    for r, file_ in release_files:
-        files = releases_and_files.setdefault(r, [])
-        if file_ is not None:
-            files.append(file_)
-
-    # Serialize our database objects to match the way that PyPI legacy
-    # presented this data.
-    releases = {
-        r.version: [
+    release_files = request.db.execute(
+        release_files.order_by(Release._pypi_ordering.desc(), File.filename),
+        execution_options={"yield_per": 1000},
+    )
+
+    # Serialize our rows to match the way that PyPI legacy presented this
+    # data, mapping each release version to a list of all of its files.
+    releases: dict[str, list[dict]] = {}
+    for row in release_files:
+        files = releases.setdefault(row.version, [])
+        if row.filename is None:
+            continue
+        files.append(
             {
-                "filename": f.filename,
-                "packagetype": f.packagetype,
-                "python_version": f.python_version,
+                "filename": row.filename,
+                "packagetype": row.packagetype,
+                "python_version": row.python_version,
                 # TODO: Remove this once we've had a long enough time with it
                 #       here to consider it no longer in use.
                 "has_sig": False,
-                "comment_text": f.comment_text,
-                "md5_digest": f.md5_digest,
+                "comment_text": row.comment_text,
+                "md5_digest": row.md5_digest,
                 "digests": {
-                    "md5": f.md5_digest,
-                    "sha256": f.sha256_digest,
-                    "blake2b_256": f.blake2_256_digest,
+                    "md5": row.md5_digest,
+                    "sha256": row.sha256_digest,
+                    "blake2b_256": row.blake2_256_digest,
                 },
                 # PEP 658 / PEP 714: expose the hash of the file's Core Metadata
                 # (the `.metadata` file served alongside the distribution) when
                 # it is available, so consumers such as mirrors don't have to
                 # fall back to the Simple API to discover it.
                 "core-metadata": (
-                    {"sha256": f.metadata_file_sha256_digest}
-                    if f.metadata_file_sha256_digest
+                    {"sha256": row.metadata_file_sha256_digest}
+                    if row.metadata_file_sha256_digest
                     else False
                 ),
-                "size": f.size,
+                "size": row.size,
                 # TODO: Remove this once we've had a long enough time with it
                 #       here to consider it no longer in use.
                 "downloads": -1,
-                "upload_time": f.upload_time.strftime("%Y-%m-%dT%H:%M:%S"),
-                "upload_time_iso_8601": f.upload_time.isoformat() + "Z",
-                "url": request.route_url("packaging.file", path=f.path),
-                "requires_python": r.requires_python or None,
-                "yanked": r.yanked,
-                "yanked_reason": r.yanked_reason or None,
+                "upload_time": row.upload_time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "upload_time_iso_8601": row.upload_time.isoformat() + "Z",
+                "url": request.route_url("packaging.file", path=row.path),
+                "requires_python": row.requires_python or None,
+                "yanked": row.yanked,
+                "yanked_reason": row.yanked_reason or None,
             }
-            for f in fs
-        ]
-        for r, fs in releases_and_files.items()
-    }
+        )
 
     # Serialize a list of vulnerabilities for this release
     vulnerabilities = [
@@ -212,6 +220,29 @@ def _json_data(request, project, release, *, all_releases):
     return data
 
 
+def _cached_json_data(request, project, release, *, all_releases):
+    # The serialized document only changes when the project's serial does, so
+    # we can serve an already serialized copy when we have one for this serial.
+    version = "" if all_releases else release.version
+    key = f"legacy-json/{project.normalized_name}/{version}/{project.last_serial}"
+
+    document_cache = request.find_service(IDocumentCache)
+    if (document := document_cache.get(key)) is not None:
+        request.response.content_type = "application/json"
+        request.response.body = document
+        return request.response
+
+    data = _json_data(request, project, release, all_releases=all_releases)
+    # Documents are only tagged with their project, since that is the only tag
+    # that ever gets purged; every document also expires on its own.
+    document_cache.set(
+        key,
+        orjson.dumps(data, option=orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE),
+        tags=[f"project/{project.normalized_name}"],
+    )
+    return data
+
+
 def latest_release_factory(request):
     normalized_name = canonicalize_name(request.matchdict["name"])
 
@@ -283,7 +314,7 @@ def json_project(release, request):
     # Build our json data, including all releases because this is the root url
     # and changing this breaks bandersnatch
     # TODO: Eventually it would be nice to drop all_releases.
-    return _json_data(request, project, release, all_releases=True)
+    return _cached_json_data(request, project, release, all_releases=True)
 
 
 @view_config(
@@ -364,7 +395,7 @@ def json_release(release, request):
     request.response.headers["X-PyPI-Last-Serial"] = str(project.last_serial)
 
     # Build our json data, with only this releases because this is a versioned url
-    return _json_data(request, project, release, all_releases=False)
+    return _cached_json_data(request, project, release, all_releases=False)
 
 
 @view_config(
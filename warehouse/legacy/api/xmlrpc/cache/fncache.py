@@ -1,11 +1,20 @@
 # SPDX-License-Identifier: Apache-2.0
 
+import contextlib
+import time
+
 import orjson
 import redis
 
 from warehouse.legacy.api.xmlrpc.cache.interfaces import CacheError
 
 DEFAULT_EXPIRES = 86400
+# How long a miss may hold the lock that keeps others from recomputing it, and how
+# often those others check whether it has been filled in the meantime.
+DEFAULT_LOCK_TIMEOUT = 10
+LOCK_POLL_INTERVAL = 0.05
+# How many keys a purge removes from a tag's index at a time.
+PURGE_BATCH_SIZE = 1000
 
 
 class StubMetricReporter:
@@ -19,16 +28,25 @@ class RedisLru:
     can survive orjson.dumps() and orjson.loads() intact
     """
 
-    def __init__(self, conn, name="lru", expires=None, metric_reporter=None):
+    def __init__(
+        self,
+        conn,
+        name="lru",
+        expires=None,
+        metric_reporter=None,
+        lock_timeout=DEFAULT_LOCK_TIMEOUT,
+    ):
         """
         conn:            Redis Connection Object
         name:            Prefix for all keys in the cache
         expires:         Default expiration
         metric_reporter: Object implementing an `increment(<string>)` method
+        lock_timeout:    How long to wait on another caller computing a miss
         """
         self.conn = conn
         self.name = name
         self.expires = expires or DEFAULT_EXPIRES
+        self.lock_timeout = lock_timeout
         if callable(getattr(metric_reporter, "increment", None)):
             self.metric_reporter = metric_reporter
         else:
@@ -39,6 +57,13 @@ class RedisLru:
             return f"{self.name}:{tag}:{func_name}"
         return f"{self.name}:tag:{func_name}"
 
+    def format_index_key(self, tag):
+        # The set of every cache key stored under a tag, so that purging a tag
+        # doesn't need to scan the whole keyspace for them.
+        if tag is not None and tag != "None":
+            return f"{self.name}-index:{tag}"
+        return f"{self.name}-index:tag"
+
     def get(self, func_name, key, tag):
         try:
             value = self.conn.hget(self.format_key(func_name, tag), str(key))
@@ -53,12 +78,16 @@ class RedisLru:
     def add(self, func_name, key, value, tag, expires):
         try:
             self.metric_reporter.increment(f"warehouse.{self.name}.cache.miss")
-            pipeline = self.conn.pipeline()
-            pipeline.hset(
-                self.format_key(func_name, tag), str(key), orjson.dumps(value)
-            )
+            cache_key = self.format_key(func_name, tag)
+            index_key = self.format_index_key(tag)
             ttl = expires or self.expires
-            pipeline.expire(self.format_key(func_name, tag), ttl)
+            pipeline = self.conn.pipeline()
+            pipeline.hset(cache_key, str(key), orjson.dumps(value))
+            pipeline.expire(cache_key, ttl)
+            # Every function cached under a tag shares its expiration, so the
+            # index can simply live as long as the last key added to it.
+            pipeline.sadd(index_key, cache_key)
+            pipeline.expire(index_key, ttl)
             pipeline.execute()
             return value
         except redis.exceptions.RedisError, redis.exceptions.ConnectionError:
@@ -67,22 +96,63 @@ class RedisLru:
 
     def purge(self, tag):
         try:
-            keys = self.conn.scan_iter(f"{self.name}:{tag}:*", count=1000)
-            pipeline = self.conn.pipeline()
-            for key in keys:
-                pipeline.delete(key)
-            pipeline.execute()
+            index_key = self.format_index_key(tag)
+            # Popping the keys, rather than reading and then deleting the index,
+            # means that anything added to the tag while we purge stays indexed.
+            while keys := self.conn.spop(index_key, PURGE_BATCH_SIZE):
+                self.conn.unlink(*keys)
             self.metric_reporter.increment(f"warehouse.{self.name}.cache.purge")
         except redis.exceptions.RedisError, redis.exceptions.ConnectionError:
             self.metric_reporter.increment(f"warehouse.{self.name}.cache.error")
             raise CacheError
 
+    def _acquire(self, lock_key):
+        try:
+            return bool(self.conn.set(lock_key, b"", nx=True, ex=self.lock_timeout))
+        except redis.exceptions.RedisError, redis.exceptions.ConnectionError:
+            # If we can't take the lock, then we can't tell if anyone else is
+            # computing this either, so just go ahead and compute it ourselves.
+            return True
+
+    def _release(self, lock_key):
+        # If this fails, the lock will expire on its own anyways.
+        with contextlib.suppress(
+            redis.exceptions.RedisError, redis.exceptions.ConnectionError
+        ):
+            self.conn.unlink(lock_key)
+
+    def _wait(self, func_name, key, tag):
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            value = self.get(func_name, key, tag)
+            if value is not None:
+                return value
+        return None
+
     def fetch(self, func, args, kwargs, key, tag, expires):
         # `get` returns None for both a miss and a Redis error, so compare against
         # None rather than testing truthiness: an empty list or dict is a real hit.
         # Treating it as a miss counts the request as both a hit and a miss and
         # re-runs the query on every call.
         value = self.get(func.__name__, str(key), str(tag))
+        if value is not None:
+            return value
+
+        # Only one caller at a time computes a miss, anyone else that misses the
+        # same key while it is doing so waits for it to fill the cache in, rather
+        # than stampeding the database with the same (potentially costly) query.
+        lock_key = f"{self.format_key(func.__name__, str(tag))}:{key}:lock"
+        if self._acquire(lock_key):
+            try:
+                return self.add(
+                    func.__name__, str(key), func(*args, **kwargs), str(tag), expires
+                )
+            finally:
+                self._release(lock_key)
+
+        self.metric_reporter.increment(f"warehouse.{self.name}.cache.wait")
+        value = self._wait(func.__name__, str(key), str(tag))
         if value is not None:
             return value
         return self.add(
@@ -12,6 +12,7 @@ from inspect import signature
 from packaging.utils import canonicalize_name
 from pydantic import StrictBool, StrictInt, StrictStr, ValidationError, validate_call
 from pyramid.httpexceptions import HTTPMethodNotAllowed, HTTPTooManyRequests
+from pyramid.response import Response
 from pyramid.view import view_config
 from pyramid_rpc.mapper import MapplyViewMapper
 from pyramid_rpc.xmlrpc import (
@@ -68,6 +69,20 @@ XMLRPC_DEPRECATION_URL = (
     "https://warehouse.pypa.io/api-reference/xml-rpc.html#deprecated-methods"
 )
 
+CHANGELOG_SINCE_SERIAL_LIMIT = 50000
+# How many journal rows to fetch from the server side cursor at a time.
+_CHANGELOG_PARTITION_SIZE = 1000
+
+# The framing that ``xmlrpc.client.dumps`` puts around a method response whose
+# single value is an array, so that we can marshal the array's items ourselves.
+_ARRAY_RESPONSE_HEAD = (
+    b"<?xml version='1.0'?>\n<methodResponse>\n<params>\n<param>\n"
+    b"<value><array><data>\n"
+)
+_ARRAY_RESPONSE_TAIL = (
+    b"</data></array></value>\n</param>\n</params>\n</methodResponse>\n"
+)
+
 
 def _clean_for_xml(data):
     """Sanitize any user-submitted data to ensure that it can be used in XML"""
@@ -243,23 +258,41 @@ def changelog_last_serial(request):
 
 @xmlrpc_method(method="changelog_since_serial")
 def changelog_since_serial(request, serial: StrictInt):
-    entries = (
-        request.db.query(JournalEntry)
-        .filter(JournalEntry.id > serial)
+    # Mirrors call this constantly, and it can return a lot of rows. So rather than
+    # loading full JournalEntry objects and handing them all to the renderer at
+    # once, we read only the columns we need from a server side cursor, and marshal
+    # each partition of rows into the response body as soon as we've fetched it.
+    result = request.db.execute(
+        select(
+            JournalEntry.name,
+            JournalEntry.version,
+            JournalEntry.submitted_date,
+            JournalEntry.action,
+            JournalEntry.id,
+        )
+        .where(JournalEntry.id > serial)
         .order_by(JournalEntry.id)
-        .limit(50000)
+        .limit(CHANGELOG_SINCE_SERIAL_LIMIT),
+        execution_options={"yield_per": _CHANGELOG_PARTITION_SIZE},
     )
 
-    return [
-        (
-            e.name,
-            e.version,
-            int(e.submitted_date.replace(tzinfo=datetime.UTC).timestamp()),
-            _clean_for_xml(e.action),
-            e.id,
-        )
-        for e in entries
-    ]
+    marshaller = xmlrpc.client.Marshaller(allow_none=True)
+    body = [_ARRAY_RESPONSE_HEAD]
+    for partition in result.partitions():
+        chunk = []
+        for name, version, submitted_date, action, id_ in partition:
+            entry = (
+                name,
+                version,
+                int(submitted_date.replace(tzinfo=datetime.UTC).timestamp()),
+                _clean_for_xml(action),
+                id_,
+            )
+            marshaller.dispatch[tuple](marshaller, entry, chunk.append)
+        body.append("".join(chunk).encode("utf8"))
+    body.append(_ARRAY_RESPONSE_TAIL)
+
+    return Response(app_iter=body, content_type="text/xml", charset="utf-8")
 
 
 @xmlrpc_cache_all_projects(method="list_packages_with_serial")
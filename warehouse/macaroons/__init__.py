@@ -1,11 +1,16 @@
 # SPDX-License-Identifier: Apache-2.0
 
+from celery.schedules import crontab
+
 from warehouse.macaroons.errors import InvalidMacaroonError
 from warehouse.macaroons.interfaces import IMacaroonService
 from warehouse.macaroons.services import database_macaroon_factory
+from warehouse.macaroons.tasks import flush_last_used
 
 __all__ = ["InvalidMacaroonError", "includeme"]
 
 
 def includeme(config):
     config.register_service_factory(database_macaroon_factory, IMacaroonService)
+
+    config.add_periodic_task(crontab(minute="*"), flush_last_used)
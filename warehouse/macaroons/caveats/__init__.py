@@ -28,7 +28,14 @@ from warehouse.macaroons.caveats._core import (
 from warehouse.oidc.interfaces import SignedClaims
 from warehouse.packaging.models import Project
 
-__all__ = ["deserialize", "deserialize_obj", "serialize", "serialize_obj", "verify"]
+__all__ = [
+    "deserialize",
+    "deserialize_obj",
+    "serialize",
+    "serialize_obj",
+    "verify",
+    "verify_caveats",
+]
 
 
 # NOTE: Under the covers, caveat serialization is done as an array
@@ -185,3 +192,34 @@ def verify(
     if not result:
         return WarehouseDenied("unknown error", reason="invalid_api_token")
     return Allowed("signature and caveats OK")
+
+
+def verify_caveats(
+    macaroon: Macaroon, request: Request, context: Any, permission: str
+) -> Allowed | WarehouseDenied:
+    """
+    Verify the caveats of a macaroon whose signature has already been verified
+    against its key, without needing the key to verify it again.
+
+    This must only be used for the exact serialized macaroon that was verified,
+    since the caveats of any other serialization aren't covered by that
+    signature.
+    """
+    errors: list[str] = []
+
+    for predicate in macaroon.first_party_caveats():
+        try:
+            caveat = deserialize(predicate.caveat_id_bytes)
+        except CaveatError as exc:
+            errors.append(str(exc))
+            continue
+
+        result = caveat.verify(request, context, permission)
+        assert isinstance(result, (Success, Failure))
+
+        if isinstance(result, Failure):
+            errors.append(result.reason)
+
+    if errors:
+        return WarehouseDenied(", ".join(errors), reason="invalid_api_token")
+    return Allowed("signature and caveats OK")
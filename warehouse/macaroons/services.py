@@ -1,21 +1,42 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import datetime
+import hashlib
+import time
 import typing
 import uuid
 
 import pymacaroons
+import redis
+import structlog
 
 from pymacaroons.exceptions import MacaroonDeserializationException
 from sqlalchemy import select, update
 from sqlalchemy.orm import joinedload
 from zope.interface import implementer
 
+from warehouse import db
+from warehouse.cache.services import _shared_redis_client
 from warehouse.macaroons import caveats
 from warehouse.macaroons.errors import InvalidMacaroonError
 from warehouse.macaroons.interfaces import IMacaroonService
 from warehouse.macaroons.models import Macaroon
 
+logger = structlog.get_logger(__name__)
+
+# Uses of a macaroon are buffered in this hash, as a mapping of the macaroon's
+# identifier to the time it was last used, until they are written to the
+# database in bulk by `warehouse.macaroons.tasks.flush_last_used`.
+LAST_USED_KEY = "macaroons:last_used"
+
+# How long we'll trust that a macaroon we've verified still exists, and that
+# its signature is valid, before we check it against the database again.
+VERIFIED_TTL = 5 * 60  # 5 minutes
+
+# The macaroons that have been deleted in a transaction, whose cached
+# verifications are dropped once the transaction has been committed.
+DELETED_SESSION_KEY = "warehouse.macaroons.deleted"
+
 
 def _extract_raw_macaroon(prefixed_macaroon: str | None) -> str | None:
     """
@@ -50,10 +71,82 @@ def deserialize_raw_macaroon(raw_macaroon: str | None) -> pymacaroons.Macaroon:
         raise InvalidMacaroonError("malformed macaroon") from e
 
 
+def _verified_key(macaroon_id: str) -> str:
+    return f"macaroons:verified:{macaroon_id}"
+
+
 @implementer(IMacaroonService)
 class DatabaseMacaroonService:
-    def __init__(self, db_session):
+    def __init__(self, db_session, redis_client=None, *, verified_ttl=VERIFIED_TTL):
         self.db = db_session
+        self.redis_client = redis_client
+        self.verified_ttl = verified_ttl
+
+    def _is_verified(self, macaroon_id: str, digest: str) -> bool:
+        if self.redis_client is None:
+            return False
+
+        # The cached verification is only dropped once the deletion has been
+        # committed, so until then we have to skip it ourselves.
+        if macaroon_id in self.db.info.get(DELETED_SESSION_KEY, ()):
+            return False
+
+        try:
+            expires = self.redis_client.hget(_verified_key(macaroon_id), digest)
+        except redis.exceptions.RedisError:
+            logger.warning("macaroon_verified_cache_error", exc_info=True)
+            return False
+
+        return expires is not None and float(expires) > time.time()
+
+    def _set_verified(self, macaroon_id: str, digest: str) -> None:
+        if self.redis_client is None:
+            return
+
+        # Each entry carries its own expiration, since the expiration of the
+        # hash is extended every time another serialization of the macaroon is
+        # verified.
+        try:
+            with self.redis_client.pipeline() as pipeline:
+                pipeline.hset(
+                    _verified_key(macaroon_id),
+                    digest,
+                    time.time() + self.verified_ttl,
+                )
+                pipeline.expire(_verified_key(macaroon_id), self.verified_ttl)
+                pipeline.execute()
+        except redis.exceptions.RedisError:
+            logger.warning("macaroon_verified_cache_error", exc_info=True)
+
+    def _record_last_used(self, macaroon_id: str) -> None:
+        if self.redis_client is not None:
+            try:
+                self.redis_client.hset(LAST_USED_KEY, macaroon_id, time.time())
+            except redis.exceptions.RedisError:
+                logger.warning("macaroon_last_used_buffer_error", exc_info=True)
+            else:
+                return
+
+        # Update last_used without dirtying the ORM object. A dirty
+        # macaroon causes autoflush during Project.__acl__() evaluation,
+        # which can deadlock with the journal advisory lock under
+        # concurrent uploads. SKIP LOCKED ensures that if another
+        # transaction is already updating this row (same token used
+        # concurrently), we just skip — the other transaction will
+        # set last_used anyway.
+        # skipping is okay as last_used value is imprecise (python dt, not DB clock)
+        # and informational in the ui
+        self.db.execute(
+            update(Macaroon)
+            .where(
+                Macaroon.id.in_(
+                    select(Macaroon.id)
+                    .where(Macaroon.id == macaroon_id)
+                    .with_for_update(skip_locked=True)
+                )
+            )
+            .values(last_used=datetime.datetime.now())
+        )
 
     def find_macaroon(self, macaroon_id) -> Macaroon | None:
         """
@@ -127,34 +220,27 @@ class DatabaseMacaroonService:
         Raises InvalidMacaroonError if the macaroon is not valid.
         """
         m = deserialize_raw_macaroon(raw_macaroon)
-        dm = self.find_macaroon(m.identifier.decode())
+        macaroon_id = m.identifier.decode()
 
-        if dm is None:
-            raise InvalidMacaroonError("deleted or nonexistent macaroon")
+        # A macaroon that we've recently found in the database, and whose
+        # signature we've verified, only needs its caveats checked against this
+        # request. The digest covers the whole serialized macaroon, rather than
+        # just its signature, so that its caveats can't be tampered with.
+        digest = hashlib.sha256(raw_macaroon.encode("utf-8")).hexdigest()
+        if self._is_verified(macaroon_id, digest):
+            verified = caveats.verify_caveats(m, request, context, permission)
+        else:
+            dm = self.find_macaroon(macaroon_id)
 
-        verified = caveats.verify(m, dm.key, request, context, permission)
-        if verified:
-            # Update last_used without dirtying the ORM object. A dirty
-            # macaroon causes autoflush during Project.__acl__() evaluation,
-            # which can deadlock with the journal advisory lock under
-            # concurrent uploads. SKIP LOCKED ensures that if another
-            # transaction is already updating this row (same token used
-            # concurrently), we just skip — the other transaction will
-            # set last_used anyway.
-            # skipping is okay as last_used value is imprecise (python dt, not DB clock)
-            # and informational in the ui
-            self.db.execute(
-                update(Macaroon)
-                .where(
-                    Macaroon.id.in_(
-                        select(Macaroon.id)
-                        .where(Macaroon.id == dm.id)
-                        .with_for_update(skip_locked=True)
-                    )
-                )
-                .values(last_used=datetime.datetime.now())
-            )
+            if dm is None:
+                raise InvalidMacaroonError("deleted or nonexistent macaroon")
+
+            verified = caveats.verify(m, dm.key, request, context, permission)
+            if verified:
+                self._set_verified(macaroon_id, digest)
 
+        if verified:
+            self._record_last_used(macaroon_id)
             return True
 
         raise InvalidMacaroonError(verified.msg)
@@ -221,6 +307,12 @@ class DatabaseMacaroonService:
         dm = self.find_macaroon(macaroon_id)
         self.db.delete(dm) if dm else None
 
+        # If we dropped the cached verifications now, a concurrent verify()
+        # could cache them again before our deletion has been committed, so
+        # we wait until it has been, see drop_deleted_verifications.
+        if self.redis_client is not None:
+            self.db.info.setdefault(DELETED_SESSION_KEY, set()).add(str(macaroon_id))
+
     def get_macaroon_by_description(self, user_id, description):
         """
         Returns a macaroon model from the DB with the given description,
@@ -236,5 +328,25 @@ class DatabaseMacaroonService:
         )
 
 
+@db.listens_for(db.Session, "after_commit")
+def drop_deleted_verifications(config, session):
+    macaroon_ids = session.info.pop(DELETED_SESSION_KEY, set())
+
+    if not macaroon_ids:
+        return
+
+    redis_client = _shared_redis_client(
+        config.registry.settings["db_results_cache.url"]
+    )
+    try:
+        redis_client.unlink(*(_verified_key(m) for m in sorted(macaroon_ids)))
+    except redis.exceptions.RedisError:
+        # The cached verifications will still expire after VERIFIED_TTL.
+        logger.warning("macaroon_verified_cache_error", exc_info=True)
+
+
 def database_macaroon_factory(context, request):
-    return DatabaseMacaroonService(request.db)
+    return DatabaseMacaroonService(
+        request.db,
+        _shared_redis_client(request.registry.settings["db_results_cache.url"]),
+    )
@@ -0,0 +1,62 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import datetime
+
+import redis
+
+from sqlalchemy import bindparam, or_, update
+
+from warehouse import tasks
+from warehouse.macaroons.models import Macaroon
+from warehouse.macaroons.services import LAST_USED_KEY
+
+# The buffered uses are moved here while they're being flushed, so that uses
+# which happen during a flush are buffered for the next one instead.
+LAST_USED_FLUSHING_KEY = f"{LAST_USED_KEY}:flushing"
+
+
+@tasks.task(ignore_result=True, acks_late=True)
+def flush_last_used(request):
+    """
+    Write the buffered last use of each macaroon to the database in bulk.
+    """
+    redis_client = redis.StrictRedis.from_url(
+        request.registry.settings["db_results_cache.url"]
+    )
+
+    # If a previous flush didn't finish, we'll retry its uses before moving on
+    # to anything that has been buffered since.
+    if not redis_client.exists(LAST_USED_FLUSHING_KEY):
+        try:
+            redis_client.rename(LAST_USED_KEY, LAST_USED_FLUSHING_KEY)
+        except redis.exceptions.ResponseError:
+            # Nothing has been buffered since the last flush.
+            return
+
+    buffered = redis_client.hgetall(LAST_USED_FLUSHING_KEY)
+    if buffered:
+        macaroons = Macaroon.__table__
+        request.db.execute(
+            update(macaroons)
+            .where(
+                macaroons.c.id == bindparam("b_id"),
+                or_(
+                    macaroons.c.last_used.is_(None),
+                    macaroons.c.last_used < bindparam("b_last_used"),
+                ),
+            )
+            .values(last_used=bindparam("b_last_used")),
+            [
+                {
+                    "b_id": _decode(macaroon_id),
+                    "b_last_used": datetime.datetime.fromtimestamp(float(last_used)),
+                }
+                for macaroon_id, last_used in buffered.items()
+            ],
+        )
+
+    redis_client.delete(LAST_USED_FLUSHING_KEY)
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+import time
 import typing
 import warnings
 
@@ -26,6 +27,11 @@ from warehouse.utils.exceptions import InsecureOIDCPublisherWarning
 # key always outlives the window in which the token is accepted.
 _JWT_LEEWAY = 30
 
+# How long (in seconds) a parsed JWK is kept in process before it is looked up
+# in the Redis keyset again. This matches the keyset refresh timeout, so a key
+# dropped by its issuer stops being accepted as soon as a refresh could see it.
+_JWK_CACHE_TTL = 60
+
 if typing.TYPE_CHECKING:
     from pyramid.request import Request
     from sqlalchemy.orm import Session
@@ -33,6 +39,32 @@ if typing.TYPE_CHECKING:
     from warehouse.packaging import Project
 
 
+class JWKCache:
+    """
+    A small in-process cache of parsed JWKs, keyed by issuer URL and key ID.
+
+    This sits in front of the Redis keyset, so that verifying a token with a
+    recently seen key needs neither a Redis round-trip nor re-parsing the key.
+    """
+
+    def __init__(self, ttl: int = _JWK_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: dict[tuple[str, str], tuple[float, jwt.PyJWK]] = {}
+
+    def get(self, issuer_url: str, key_id: str) -> jwt.PyJWK | None:
+        entry = self._entries.get((issuer_url, key_id))
+        if entry is None:
+            return None
+        expires, key = entry
+        if expires <= time.monotonic():
+            self._entries.pop((issuer_url, key_id), None)
+            return None
+        return key
+
+    def set(self, issuer_url: str, key_id: str, key: jwt.PyJWK) -> None:
+        self._entries[(issuer_url, key_id)] = (time.monotonic() + self.ttl, key)
+
+
 @implementer(IOIDCPublisherService)
 class OIDCPublisherService:
     def __init__(
@@ -43,6 +75,9 @@ class OIDCPublisherService:
         audience: str,
         cache_url: str,
         metrics: IMetricsService,
+        *,
+        redis_client: redis.StrictRedis | None = None,
+        jwk_cache: JWKCache | None = None,
     ):
         self.db = session
         self.publisher = publisher
@@ -50,6 +85,18 @@ class OIDCPublisherService:
         self.audience = audience
         self.cache_url = cache_url
         self.metrics = metrics
+        self._redis_client = redis_client
+        self.jwk_cache = jwk_cache if jwk_cache is not None else JWKCache()
+
+    @property
+    def redis(self) -> redis.StrictRedis:
+        """
+        The Redis client for the keyset and JTI cache. Clients handed in by the
+        factory share a connection pool across requests.
+        """
+        if self._redis_client is None:
+            self._redis_client = redis.StrictRedis.from_url(self.cache_url)
+        return self._redis_client
 
     def _store_keyset(self, issuer_url: str, keys: dict) -> None:
         """
@@ -59,9 +106,10 @@ class OIDCPublisherService:
         _publisher_jwk_key = f"/warehouse/oidc/jwks/{issuer_url}"
         _publisher_timeout_key = f"{_publisher_jwk_key}/timeout"
 
-        with redis.StrictRedis.from_url(self.cache_url) as r:
-            r.set(_publisher_jwk_key, json.dumps(keys))
-            r.setex(_publisher_timeout_key, 60, "placeholder")
+        with self.redis.pipeline() as pipeline:
+            pipeline.set(_publisher_jwk_key, json.dumps(keys))
+            pipeline.setex(_publisher_timeout_key, 60, "placeholder")
+            pipeline.execute()
 
     def _get_keyset(self, issuer_url: str) -> tuple[dict[str, dict], bool]:
         """
@@ -71,12 +119,13 @@ class OIDCPublisherService:
         _publisher_jwk_key = f"/warehouse/oidc/jwks/{issuer_url}"
         _publisher_timeout_key = f"{_publisher_jwk_key}/timeout"
 
-        with redis.StrictRedis.from_url(self.cache_url) as r:
-            keys = r.get(_publisher_jwk_key)
-            timeout = bool(r.exists(_publisher_timeout_key))
-            if keys is not None:
-                return json.loads(keys), timeout
-            return {}, timeout
+        with self.redis.pipeline() as pipeline:
+            pipeline.get(_publisher_jwk_key)
+            pipeline.exists(_publisher_timeout_key)
+            keys, timeout = pipeline.execute()
+        if keys is not None:
+            return json.loads(keys), bool(timeout)
+        return {}, bool(timeout)
 
     def _refresh_keyset(self, issuer_url: str) -> dict[str, dict]:
         """
@@ -158,6 +207,11 @@ class OIDCPublisherService:
         Return a JWK for the given key ID, or None if the key can't be found
         in this publisher's keyset.
         """
+        tags = [f"publisher:{self.publisher}", f"issuer_url:{issuer_url}"]
+        if (key := self.jwk_cache.get(issuer_url, key_id)) is not None:
+            self.metrics.increment("warehouse.oidc.get_key.cache_hit", tags=tags)
+            return key
+        self.metrics.increment("warehouse.oidc.get_key.cache_miss", tags=tags)
 
         keyset, _ = self._get_keyset(issuer_url)
         if key_id not in keyset:
@@ -174,7 +228,9 @@ class OIDCPublisherService:
             raise jwt.PyJWTError(
                 f"Key ID {key_id!r} not found for issuer {issuer_url!r}"
             )
-        return jwt.PyJWK(keyset[key_id])
+        key = jwt.PyJWK(keyset[key_id])
+        self.jwk_cache.set(issuer_url, key_id, key)
+        return key
 
     def _get_key_for_token(self, token, issuer_url: str) -> jwt.PyJWK:
         """
@@ -192,8 +248,7 @@ class OIDCPublisherService:
         """
         Check if a JWT Token Identifier has already been used.
         """
-        with redis.StrictRedis.from_url(self.cache_url) as r:
-            return bool(r.exists(f"/warehouse/oidc/{self.issuer_url}/{jti}"))
+        return bool(self.redis.exists(f"/warehouse/oidc/{self.issuer_url}/{jti}"))
 
     def store_jwt_identifier(self, jti: str, expiration: int) -> bool:
         """
@@ -201,18 +256,17 @@ class OIDCPublisherService:
 
         Returns True if the JTI was newly stored, False if it already existed.
         """
-        with redis.StrictRedis.from_url(self.cache_url) as r:
-            # The key must outlive the full window during which PyJWT accepts
-            # the token. PyJWT allows up to ``_JWT_LEEWAY`` seconds past
-            # ``exp``, so we add an extra 5-second margin on top.
-            result = r.set(
-                f"/warehouse/oidc/{self.issuer_url}/{jti}",
-                exat=expiration + _JWT_LEEWAY + 5,  # codespell:ignore exat
-                value="",  # empty value to lower memory usage
-                nx=True,
-            )
-            # r.set(..., nx=True) returns True if key was created, None if exists
-            return result is True
+        # The key must outlive the full window during which PyJWT accepts
+        # the token. PyJWT allows up to ``_JWT_LEEWAY`` seconds past
+        # ``exp``, so we add an extra 5-second margin on top.
+        result = self.redis.set(
+            f"/warehouse/oidc/{self.issuer_url}/{jti}",
+            exat=expiration + _JWT_LEEWAY + 5,  # codespell:ignore exat
+            value="",  # empty value to lower memory usage
+            nx=True,
+        )
+        # r.set(..., nx=True) returns True if key was created, None if exists
+        return result is True
 
     def verify_jwt_signature(
         self, unverified_token: str, issuer_url: str
@@ -342,12 +396,19 @@ class OIDCPublisherServiceFactory:
         self.publisher = publisher
         self.issuer_url = issuer_url
         self.service_class = service_class
+        # Both of these live as long as the factory does, i.e. for the lifetime
+        # of the worker, so that they are shared across requests.
+        self._redis_client: redis.StrictRedis | None = None
+        self.jwk_cache = JWKCache()
 
     def __call__(self, _context, request: Request) -> OIDCPublisherService:
         cache_url = request.registry.settings["oidc.jwk_cache_url"]
         audience = request.registry.settings["warehouse.oidc.audience"]
         metrics = request.find_service(IMetricsService, context=None)
 
+        if self._redis_client is None:
+            self._redis_client = redis.StrictRedis.from_url(cache_url)
+
         return self.service_class(
             request.db,
             self.publisher,
@@ -355,6 +416,8 @@ class OIDCPublisherServiceFactory:
             audience,
             cache_url,
             metrics,
+            redis_client=self._redis_client,
+            jwk_cache=self.jwk_cache,
         )
 
     def __eq__(self, other) -> bool:
@@ -22,7 +22,9 @@ from warehouse.packaging.tasks import (
     compute_packaging_metrics,
     compute_top_dependents_corpus,
     reconcile_file_storages,
+    refresh_top_dependents_corpus,
     update_description_html,
+    update_simple_index,
 )
 
 
@@ -176,6 +178,7 @@ def includeme(config):
     config.add_periodic_task(crontab(minute="*/15"), reconcile_file_storages)
 
     config.add_periodic_task(crontab(minute="*/5"), update_description_html)
+    config.add_periodic_task(crontab(minute="*/1"), update_simple_index)
     config.add_periodic_task(crontab(minute="*/5"), update_role_invitation_status)
 
     # Add a periodic task to generate 2FA metrics
@@ -186,3 +189,5 @@ def includeme(config):
 
     # Add a periodic task to compute dependents corpus once a day
     config.add_periodic_task(crontab(minute=0, hour=5), compute_top_dependents_corpus)
+    # and refresh it incrementally in between as projects change
+    config.add_periodic_task(crontab(minute="*/15"), refresh_top_dependents_corpus)
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import contextlib
 import datetime
 import enum
 import typing
@@ -28,10 +29,13 @@ from sqlalchemy import (
     cast,
     event,
     func,
+    inspect,
+    literal,
     or_,
     orm,
     select,
     sql,
+    union_all,
 )
 from sqlalchemy.dialects.postgresql import (
     ARRAY,
@@ -56,6 +60,7 @@ from warehouse import db
 from warehouse.accounts.models import User
 from warehouse.attestations.models import Provenance
 from warehouse.authnz import Permissions
+from warehouse.cache.interfaces import IACLCache
 from warehouse.classifiers.models import Classifier
 from warehouse.constants import MAX_FILESIZE, MAX_PROJECT_SIZE
 from warehouse.events.models import HasEvents
@@ -69,6 +74,7 @@ from warehouse.organizations.models import (
     OrganizationRoleType,
     Team,
     TeamProjectRole,
+    TeamRole,
 )
 from warehouse.sitemap.models import SitemapMixin
 from warehouse.utils import dotted_navigator, wheel
@@ -80,6 +86,8 @@ if typing.TYPE_CHECKING:
     from warehouse.oidc.models import OIDCPublisher
 
 _MONOTONIC_SEQUENCE = 42
+ACL_BUMPS_SESSION_KEY = "warehouse.packaging.acl.bumps"
+JOURNALS_SESSION_KEY = "warehouse.packaging.journals.pending"
 PROJECT_NAME_PATTERN = "^([A-Z0-9]|[A-Z0-9][A-Z0-9._-]*[A-Z0-9])$"
 
 
@@ -295,7 +303,6 @@ class Project(SitemapMixin, HasEvents, HasObservations, db.Model):
             raise KeyError from None
 
     def __acl__(self):
-        session = orm_session_from_obj(self)
         acls = [
             # TODO: Similar to `warehouse.accounts.models.User.__acl__`, we express the
             #       permissions here in terms of the permissions that the user has on
@@ -336,6 +343,8 @@ class Project(SitemapMixin, HasEvents, HasObservations, db.Model):
             (Allow, Authenticated, Permissions.SubmitMalwareObservation),
         ]
 
+        grants = self._acl_grants()
+
         if self.lifecycle_status not in [
             LifecycleStatus.Archived,
             LifecycleStatus.ArchivedNoindex,
@@ -345,52 +354,13 @@ class Project(SitemapMixin, HasEvents, HasObservations, db.Model):
             # each of which serves as an identity with the ability to upload releases
             # (only if the project is not archived or quarantined)
             acls.extend(
-                (Allow, f"oidc:{publisher.id}", [Permissions.ProjectsUpload])
-                for publisher in self.oidc_publishers
+                (Allow, f"oidc:{publisher_id}", [Permissions.ProjectsUpload])
+                for publisher_id in grants["oidc"]
             )
 
-        # Get all of the users for this project.
-        user_query = (
-            session.query(Role)
-            .filter(Role.project == self)
-            .options(orm.lazyload(Role.project), orm.lazyload(Role.user))
-        )
-        permissions = {
-            (role.user_id, "Administer" if role.role_name == "Owner" else "Upload")
-            for role in user_query.all()
-        }
-
-        # Add all of the team members for this project.
-        team_query = (
-            session.query(TeamProjectRole)
-            .filter(TeamProjectRole.project == self)
-            .options(
-                orm.lazyload(TeamProjectRole.project),
-                orm.lazyload(TeamProjectRole.team),
-            )
-        )
-        for role in team_query.all():
-            permissions |= {
-                (user.id, "Administer" if role.role_name.value == "Owner" else "Upload")
-                for user in role.team.members
-            }
-
-        # Add all organization owners for this project.
-        if self.organization:
-            org_query = (
-                session.query(OrganizationRole)
-                .filter(
-                    OrganizationRole.organization == self.organization,
-                    OrganizationRole.role_name == OrganizationRoleType.Owner,
-                )
-                .options(
-                    orm.lazyload(OrganizationRole.organization),
-                    orm.lazyload(OrganizationRole.user),
-                )
-            )
-            permissions |= {(role.user_id, "Administer") for role in org_query.all()}
-
-        for user_id, permission_name in sorted(permissions, key=lambda x: (x[1], x[0])):
+        for user_id, permission_name in sorted(
+            grants["users"], key=lambda x: (x[1], x[0])
+        ):
             # Disallow Write permissions for Projects in quarantine, allow Upload
             if self.lifecycle_status == LifecycleStatus.QuarantineEnter:
                 current_permissions = [
@@ -417,6 +387,87 @@ class Project(SitemapMixin, HasEvents, HasObservations, db.Model):
                 acls.append((Allow, f"user:{user_id}", current_permissions))
         return acls
 
+    def _acl_grants(self):
+        """
+        Return the principals that have been granted access to this project,
+        from the ACL cache if it is available and up to date.
+
+        The cache is skipped when this session has changes that have not been
+        committed yet, since the version bump for them only happens on commit.
+        """
+        session = orm_session_from_obj(self)
+        request = get_current_request()
+
+        acl_cache = None
+        if request is not None and not (
+            session.new
+            or session.dirty
+            or session.deleted
+            or self.id in session.info.get(ACL_BUMPS_SESSION_KEY, ())
+        ):
+            with contextlib.suppress(LookupError):
+                acl_cache = request.find_service(IACLCache)
+
+        if acl_cache is None:
+            return self._compute_acl_grants(session)
+
+        version, grants = acl_cache.get(str(self.id))
+        if grants is None:
+            grants = self._compute_acl_grants(session)
+            acl_cache.set(str(self.id), version, grants)
+        return grants
+
+    def _compute_acl_grants(self, session):
+        # Every source of access to the project is gathered with one query,
+        # rather than walking each team's members and the organization's
+        # owners separately.
+        oidc_publishers = Project.oidc_publishers.property.secondary
+        query = union_all(
+            select(literal("user"), Role.user_id, Role.role_name).where(
+                Role.project_id == self.id
+            ),
+            select(
+                literal("user"),
+                TeamRole.user_id,
+                cast(TeamProjectRole.role_name, Text),
+            )
+            .join(TeamRole, TeamRole.team_id == TeamProjectRole.team_id)
+            .where(TeamProjectRole.project_id == self.id),
+            select(
+                literal("user"),
+                OrganizationRole.user_id,
+                literal(OrganizationRoleType.Owner.value),
+            )
+            .join(
+                OrganizationProject,
+                OrganizationProject.organization_id == OrganizationRole.organization_id,
+            )
+            .where(
+                OrganizationProject.project_id == self.id,
+                OrganizationRole.role_name == OrganizationRoleType.Owner,
+            ),
+            select(
+                literal("oidc"),
+                oidc_publishers.c.oidc_publisher_id,
+                literal(None, Text),
+            ).where(oidc_publishers.c.project_id == self.id),
+        )
+
+        users = set()
+        oidc = set()
+        for kind, principal_id, role_name in session.execute(query):
+            if kind == "oidc":
+                oidc.add(str(principal_id))
+            else:
+                users.add(
+                    (
+                        str(principal_id),
+                        "Administer" if role_name == "Owner" else "Upload",
+                    )
+                )
+
+        return {"users": sorted(users), "oidc": sorted(oidc)}
+
     @property
     def documentation_url(self):
         # TODO: Move this into the database and eliminate the use of the
@@ -1130,8 +1181,29 @@ class JournalEntry(db.ModelBase):
     submitted_by: Mapped[User] = orm.relationship(lazy="raise_on_sql")
 
 
-@db.listens_for(db.Session, "before_flush")
-def ensure_monotonic_journals(config, session, flush_context, instances):
+@db.listens_for(db.Session, "after_flush")
+def store_pending_journals(config, session, flush_context):
+    # We'll (ab)use the session.info dictionary to store the journal entries
+    # that have been inserted in this transaction, so that we can give them
+    # their final serial when the transaction is committed.
+    journal_entries = [obj for obj in session.new if isinstance(obj, JournalEntry)]
+    if journal_entries:
+        session.info.setdefault(JOURNALS_SESSION_KEY, []).extend(journal_entries)
+
+
+def _lock_journals(session):
+    session.execute(
+        select(
+            func.pg_advisory_xact_lock(
+                cast(cast(JournalEntry.__tablename__, REGCLASS), Integer),
+                _MONOTONIC_SEQUENCE,
+            )
+        )
+    )
+
+
+@db.listens_for(db.Session, "before_commit")
+def ensure_monotonic_journals(config, session):
     # We rely on `journals.id` to be a monotonically increasing integer,
     # however the way that SERIAL is implemented, it does not guarantee
     # that is the case.
@@ -1142,43 +1214,139 @@ def ensure_monotonic_journals(config, session, flush_context, instances):
     # that transactions were committed.
     #
     # The way this works, not even the SERIALIZABLE transaction types give
-    # us this property. Instead we have to implement our own locking that
-    # ensures that each new journal entry will be serialized.
-    journal_entries = [obj for obj in session.new if isinstance(obj, JournalEntry)]
+    # us this property. Instead, the ids that journal entries are inserted
+    # with are only provisional, and are never visible outside of their
+    # transaction. Right before we commit, we take a lock and renumber them
+    # from the same sequence, which means that the lock only has to be held
+    # for as long as it takes to renumber them and commit, rather than from
+    # the first journal entry until the end of the transaction.
+    session.flush()
+
+    journal_entries = [
+        je
+        for je in session.info.pop(JOURNALS_SESSION_KEY, [])
+        # Entries that have since been deleted or rolled back don't need a
+        # serial anymore.
+        if inspect(je).persistent
+    ]
     if not journal_entries:
         return
 
-    has_other_pending = session.dirty or any(
-        not isinstance(obj, JournalEntry) for obj in session.new
-    )
-    if has_other_pending:
-        # This flush contains both JournalEntries and other pending changes.
-        # Acquiring the advisory lock here would hold it while non-journal
-        # INSERTs/UPDATEs execute (e.g., File INSERT unique constraint checks),
-        # which can deadlock with concurrent transactions waiting for the same
-        # advisory lock. Defer the JournalEntries to a subsequent flush where
-        # they'll be the only pending objects, minimizing lock hold scope.
-        for je in journal_entries:
-            session.expunge(je)
-        session.info.setdefault("_deferred_journals", []).extend(journal_entries)
-        return
+    _lock_journals(session)
 
-    session.execute(
+    serials = session.scalars(
         select(
-            func.pg_advisory_xact_lock(
-                cast(cast(JournalEntry.__tablename__, REGCLASS), Integer),
-                _MONOTONIC_SEQUENCE,
+            func.nextval(func.pg_get_serial_sequence(JournalEntry.__tablename__, "id"))
+        ).select_from(func.generate_series(1, len(journal_entries)))
+    ).all()
+
+    # Keep the order that the journal entries were inserted in within this
+    # transaction, the trigger on journals will keep Project.last_serial up
+    # to date as they are renumbered.
+    for je, serial in zip(
+        sorted(journal_entries, key=lambda je: je.id), sorted(serials), strict=True
+    ):
+        je.id = serial
+
+    session.flush()
+
+
+@db.listens_for(db.Session, "after_flush")
+def store_acl_bumps(config, session, flush_context):
+    # We'll (ab)use the session.info dictionary to store the projects whose
+    # cached ACLs need to be invalidated when the session has been committed.
+    bumps = session.info.setdefault(ACL_BUMPS_SESSION_KEY, set())
+
+    oidc_publisher_class = Project.oidc_publishers.property.mapper.class_
+    teams = set()
+    organizations = set()
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, (Role, TeamProjectRole, OrganizationProject)):
+            bumps.add(obj.project_id)
+        elif isinstance(obj, TeamRole):
+            teams.add(obj.team_id)
+        elif isinstance(obj, OrganizationRole):
+            organizations.add(obj.organization_id)
+        elif isinstance(obj, oidc_publisher_class):
+            bumps.update(project.id for project in obj.projects)
+        elif (
+            isinstance(obj, Project)
+            and obj in session.dirty
+            and "oidc_publishers" in inspect(obj).committed_state
+        ):
+            bumps.add(obj.id)
+
+    # A change to a team's members or an organization's owners changes the
+    # ACL of every project that they have access to.
+    if teams:
+        bumps.update(
+            session.scalars(
+                select(TeamProjectRole.project_id).where(
+                    TeamProjectRole.team_id.in_(teams)
+                )
             )
         )
+    if organizations:
+        bumps.update(
+            session.scalars(
+                select(OrganizationProject.project_id).where(
+                    OrganizationProject.organization_id.in_(organizations)
+                )
+            )
+        )
+
+
+@db.listens_for(db.Session, "do_orm_execute")
+def store_bulk_acl_bumps(config, orm_execute_state):
+    # Bulk UPDATE and DELETE statements (e.g. when deleting a team or an
+    # organization) never show up in session.dirty or session.deleted, so we
+    # have to find the projects whose ACLs they change before they execute.
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if orm_execute_state.bind_mapper is None:
+        return
+
+    model = orm_execute_state.bind_mapper.class_
+    if not issubclass(
+        model, (Role, TeamProjectRole, OrganizationProject, TeamRole, OrganizationRole)
+    ):
+        return
+
+    affected = select(model)
+    if (whereclause := orm_execute_state.statement.whereclause) is not None:
+        affected = affected.where(whereclause)
+    affected = affected.subquery()
+
+    if issubclass(model, TeamRole):
+        project_ids = select(TeamProjectRole.project_id).where(
+            TeamProjectRole.team_id.in_(select(affected.c.team_id))
+        )
+    elif issubclass(model, OrganizationRole):
+        project_ids = select(OrganizationProject.project_id).where(
+            OrganizationProject.organization_id.in_(select(affected.c.organization_id))
+        )
+    else:
+        project_ids = select(affected.c.project_id)
+
+    session = orm_execute_state.session
+    session.info.setdefault(ACL_BUMPS_SESSION_KEY, set()).update(
+        session.scalars(project_ids)
     )
 
 
-@db.listens_for(db.Session, "after_flush")
-def _restore_deferred_journals(config, session, flush_context):
-    deferred = session.info.pop("_deferred_journals", None)
-    if deferred:
-        for je in deferred:
-            session.add(je)
+@db.listens_for(db.Session, "after_commit")
+def execute_acl_bumps(config, session):
+    bumps = session.info.pop(ACL_BUMPS_SESSION_KEY, set())
+
+    if not bumps:
+        return
+
+    try:
+        acl_cache_factory = config.find_service_factory(IACLCache)
+    except LookupError:
+        return
+
+    acl_cache_factory(None, config).bump(str(project_id) for project_id in bumps)
 
 
 class ProhibitedProjectName(db.Model):
@@ -51,7 +51,7 @@ from warehouse.packaging.models import (
     Project,
     Role,
 )
-from warehouse.packaging.typosnyper import typo_check_name
+from warehouse.packaging.typosnyper import TypoIndex, typo_check_name
 from warehouse.rate_limiting import DummyRateLimiter, IRateLimiter
 from warehouse.rate_limiting.headers import record_rate_limit
 from warehouse.utils.exceptions import DevelopmentModeWarning
@@ -75,6 +75,12 @@ STDLIB_PROHIBITED = {
     )
 }
 
+# The query results cache keys holding the corpus of the most depended upon
+# project names used for typo-squatting checks, and its version stamp.
+TOP_DEPENDENTS_CORPUS_KEY = "top_dependents_corpus"
+TOP_DEPENDENTS_CORPUS_VERSION_KEY = "top_dependents_corpus.version"
+TOP_DEPENDENTS_CORPUS_SIZE = 10000
+
 
 class InsecureStorageWarning(DevelopmentModeWarning):
     pass
@@ -401,6 +407,59 @@ class GCSSimpleStorage(GenericGCSBlobStorage):
 
         return cls(bucket, prefix=prefix)
 
+    def get(self, path: str):
+        # Unlike distribution files, we read back some of what we store here,
+        # e.g. the previous simple index snapshot, in order to update it.
+        blob = self.bucket.blob(self._get_path(path))
+        try:
+            return io.BytesIO(blob.download_as_bytes())
+        except google.api_core.exceptions.NotFound:
+            raise FileNotFoundError(f"No such key: {path!r}") from None
+
+    @google.api_core.retry.Retry(
+        predicate=google.api_core.retry.if_exception_type(
+            google.api_core.exceptions.ServiceUnavailable
+        )
+    )
+    def store(self, path: str, file_path, *, meta=None):
+        # Simple pages live at stable paths (e.g. index.html) that are
+        # regenerated whenever their contents change, so unlike distribution
+        # files, an existing blob must be overwritten rather than skipped.
+        blob = self.bucket.blob(self._get_path(path))
+        if meta is not None:
+            blob.metadata = meta
+        blob.upload_from_filename(file_path)
+
+
+class _TypoIndexLoader:
+    """
+    Holds the typo index built from the most recently loaded top dependents
+    corpus, so that each worker only fetches and indexes the corpus again when
+    its version stamp changes.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.index = None
+
+    def __call__(self, cache) -> TypoIndex | None:
+        # A corpus stored without a version stamp (e.g. by an older worker) is
+        # treated as a version of its own. The refresh task stamps such a
+        # corpus the next time it runs, which causes it to be indexed again.
+        stamp = cache.get(TOP_DEPENDENTS_CORPUS_VERSION_KEY)
+        version = stamp["version"] if stamp is not None else None
+        if self.index is not None and version == self.version:
+            return self.index
+
+        corpus = cache.get(TOP_DEPENDENTS_CORPUS_KEY)
+        if corpus is None:
+            return None
+        self.version, self.index = version, TypoIndex(corpus)
+        return self.index
+
+
+_get_typo_index = _TypoIndexLoader()
+
 
 @implementer(IProjectService)
 class ProjectService:
@@ -421,76 +480,74 @@ class ProjectService:
         # Record the current limiter state so the egress tween can emit
         # RateLimit / RateLimit-Policy headers, whether or not we reject below.
         if request.remote_addr is not None:
+            ip_ratelimit = self.ratelimiters["project.create.ip"].hit_and_stats(
+                request.remote_addr, consume=False
+            )
             record_rate_limit(
                 request,
                 "project.create.ip",
                 self.ratelimiters["project.create.ip"],
                 identifiers=(request.remote_addr,),
                 partition_key="ip",
+                stats=ip_ratelimit.stats,
             )
+        user_ratelimit = self.ratelimiters["project.create.user"].hit_and_stats(
+            creator.id, consume=False
+        )
         record_rate_limit(
             request,
             "project.create.user",
             self.ratelimiters["project.create.user"],
             identifiers=(creator.id,),
             partition_key="user",
+            stats=user_ratelimit.stats,
         )
 
         # First we want to check if a single IP is exceeding our rate limiter.
-        if request.remote_addr is not None and not self.ratelimiters[
-            "project.create.ip"
-        ].test(request.remote_addr):
+        if request.remote_addr is not None and not ip_ratelimit.allowed:
             logger.warning("IP failed project create threshold reached.")
             self._metrics.increment(
                 "warehouse.project.create.ratelimited",
                 tags=["ratelimiter:ip"],
             )
-            raise TooManyProjectsCreated(
-                resets_in=self.ratelimiters["project.create.ip"].resets_in(
-                    request.remote_addr
-                )
-            )
+            raise TooManyProjectsCreated(resets_in=ip_ratelimit.resets_in)
 
-        if not self.ratelimiters["project.create.user"].test(creator.id):
+        if not user_ratelimit.allowed:
             logger.warning("User failed project create threshold reached.")
             self._metrics.increment(
                 "warehouse.project.create.ratelimited",
                 tags=["ratelimiter:user"],
             )
-            raise TooManyProjectsCreated(
-                resets_in=self.ratelimiters["project.create.user"].resets_in(creator.id)
-            )
+            raise TooManyProjectsCreated(resets_in=user_ratelimit.resets_in)
 
     def _hit_ratelimits(self, request, creator):
-        # `.hit()` atomically increments and returns False when the limit is
-        # exceeded. Concurrent requests can each pass the optimistic `.test()`
-        # in `_check_ratelimits` before any records a hit, so this atomic check
-        # is what actually enforces the limit: a request that pushes a counter
-        # past its limit is rejected here, rolling back the new project. The
-        # limiters are consulted in the same order as `_check_ratelimits`.
-        if request.remote_addr is not None and not self.ratelimiters[
-            "project.create.ip"
-        ].hit(request.remote_addr):
-            logger.warning("IP failed project create threshold reached.")
-            self._metrics.increment(
-                "warehouse.project.create.ratelimited",
-                tags=["ratelimiter:ip"],
+        # `.hit_and_stats()` atomically records a hit and reports a denial
+        # when the limit is exceeded. Concurrent requests can each pass the
+        # optimistic check in `_check_ratelimits` before any records a hit, so
+        # this atomic check is what actually enforces the limit: a request that
+        # pushes a counter past its limit is rejected here, rolling back the
+        # new project. The limiters are consulted in the same order as
+        # `_check_ratelimits`.
+        if request.remote_addr is not None:
+            ratelimit = self.ratelimiters["project.create.ip"].hit_and_stats(
+                request.remote_addr
             )
-            raise TooManyProjectsCreated(
-                resets_in=self.ratelimiters["project.create.ip"].resets_in(
-                    request.remote_addr
+            if not ratelimit.allowed:
+                logger.warning("IP failed project create threshold reached.")
+                self._metrics.increment(
+                    "warehouse.project.create.ratelimited",
+                    tags=["ratelimiter:ip"],
                 )
-            )
+                raise TooManyProjectsCreated(resets_in=ratelimit.resets_in)
 
-        if not self.ratelimiters["project.create.user"].hit(creator.id):
+        ratelimit = self.ratelimiters["project.create.user"].hit_and_stats(creator.id)
+        if not ratelimit.allowed:
             logger.warning("User failed project create threshold reached.")
             self._metrics.increment(
                 "warehouse.project.create.ratelimited",
                 tags=["ratelimiter:user"],
             )
-            raise TooManyProjectsCreated(
-                resets_in=self.ratelimiters["project.create.user"].resets_in(creator.id)
-            )
+            raise TooManyProjectsCreated(resets_in=ratelimit.resets_in)
 
     def check_project_name(self, name: str) -> None:
         """
@@ -528,9 +585,9 @@ class ProjectService:
             raise ProjectNameUnavailableSimilarError(similar_project_name)
 
         # Check for typo-squatting.
-        cached_corpus = self._query_results_cache.get("top_dependents_corpus")
+        typo_index = _get_typo_index(self._query_results_cache)
         if typo_check_match := typo_check_name(
-            canonicalize_name(name), corpus=cached_corpus
+            canonicalize_name(name), corpus=typo_index
         ):
             raise ProjectNameUnavailableTypoSquattingError(
                 check_name=typo_check_match[0],
@@ -2,16 +2,22 @@
 
 from __future__ import annotations
 
+import concurrent.futures
 import datetime
+import hashlib
 import tempfile
+import time
 import typing
 
 from typing import Any, NamedTuple
+from uuid import UUID
 
+import orjson
 import structlog
 
 from celery.exceptions import SoftTimeLimitExceeded, TimeLimitExceeded
-from sqlalchemy import desc, func, nulls_last, select
+from packaging.utils import canonicalize_name
+from sqlalchemy import desc, func, nulls_last, select, update
 from sqlalchemy.orm import joinedload
 
 from warehouse import tasks
@@ -24,9 +30,16 @@ from warehouse.packaging.models import (
     DependencyKind,
     Description,
     File,
+    JournalEntry,
     Project,
     Release,
 )
+from warehouse.packaging.services import (
+    TOP_DEPENDENTS_CORPUS_KEY,
+    TOP_DEPENDENTS_CORPUS_SIZE,
+    TOP_DEPENDENTS_CORPUS_VERSION_KEY,
+)
+from warehouse.packaging.utils import render_simple_details, render_simple_index
 from warehouse.utils import readme
 from warehouse.utils.row_counter import RowCount
 
@@ -35,6 +48,10 @@ if typing.TYPE_CHECKING:
 
 logger = structlog.get_logger(__name__)
 
+RERENDER_DESCRIPTIONS_CHECKPOINT_KEY = "rerender_descriptions.checkpoint"
+# How many descriptions each worker process is handed at a time.
+_RERENDER_CHUNK_SIZE = 25
+
 
 def _copy_file_to_cache(archive_storage, cache_storage, path):
     metadata = archive_storage.get_metadata(path)
@@ -276,6 +293,7 @@ def compute_2fa_metrics(request):
 @tasks.task(ignore_result=True, acks_late=True)
 def update_description_html(request):
     renderer_version = readme.renderer_version()
+    metrics = request.find_service(IMetricsService, context=None)
 
     descriptions = (
         request.db.query(Description)
@@ -285,10 +303,127 @@ def update_description_html(request):
     )
 
     for description in descriptions:
-        description.html = readme.render(description.raw, description.content_type)
+        description.html = readme.render(
+            description.raw, description.content_type, metrics=metrics
+        )
         description.rendered_by = renderer_version
 
 
+@tasks.task(ignore_result=True, acks_late=True)
+def rerender_descriptions(request, *, partition_size=1000, processes=None):
+    """
+    Re-render every description that wasn't rendered by the current version of
+    readme_renderer, used to catch up after upgrading it.
+
+    Descriptions are walked in id order one partition at a time, rendered on a
+    process pool, and written back with a bulk UPDATE. Each partition is
+    committed and then checkpointed, so an interrupted run resumes after the last
+    partition it finished. A resumed run wraps around once at the end to pick up
+    anything before its checkpoint that has become outdated since, and the
+    checkpoint is cleared once a run completes.
+
+    This starts worker processes, so it should be run via
+    ``warehouse descriptions rerender`` rather than from a Celery worker.
+    """
+    renderer_version = readme.renderer_version()
+    cache = request.find_service(IQueryResultsCache)
+    metrics = request.find_service(IMetricsService, context=None)
+
+    last_id = None
+    checkpoint = cache.get(RERENDER_DESCRIPTIONS_CHECKPOINT_KEY)
+    if checkpoint is not None:
+        if checkpoint["renderer_version"] == renderer_version:
+            last_id = UUID(checkpoint["last_id"])
+        else:
+            cache.set(RERENDER_DESCRIPTIONS_CHECKPOINT_KEY, None)
+    resumed = last_id is not None
+
+    total = 0
+    started = time.monotonic()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+        while True:
+            stmt = (
+                select(Description.id, Description.raw, Description.content_type)
+                .where(Description.rendered_by != renderer_version)
+                .order_by(Description.id)
+                .limit(partition_size)
+            )
+            if last_id is not None:
+                stmt = stmt.where(Description.id > last_id)
+            rows = request.db.execute(stmt).all()
+            if not rows:
+                # Description ids are random, and descriptions can still be
+                # rendered by an older version (e.g. by web workers that have
+                # yet to be deployed), so those before the checkpoint that we
+                # resumed from may be outdated too.
+                if resumed:
+                    resumed, last_id = False, None
+                    continue
+                break
+
+            with metrics.timed("warehouse.packaging.rerender_descriptions.partition"):
+                rendered = executor.map(
+                    readme.render,
+                    [row.raw for row in rows],
+                    [row.content_type for row in rows],
+                    chunksize=_RERENDER_CHUNK_SIZE,
+                )
+                request.db.execute(
+                    update(Description),
+                    [
+                        {"id": row.id, "html": html, "rendered_by": renderer_version}
+                        for row, html in zip(rows, rendered, strict=True)
+                    ],
+                )
+                request.tm.commit()
+                request.tm.begin()
+
+            last_id = rows[-1].id
+            cache.set(
+                RERENDER_DESCRIPTIONS_CHECKPOINT_KEY,
+                {"renderer_version": renderer_version, "last_id": str(last_id)},
+            )
+
+            total += len(rows)
+            elapsed = time.monotonic() - started
+            metrics.increment(
+                "warehouse.packaging.rerender_descriptions.rendered", len(rows)
+            )
+            metrics.gauge(
+                "warehouse.packaging.rerender_descriptions.throughput",
+                total / elapsed if elapsed else 0,
+            )
+            logger.info(
+                "Re-rendered descriptions",
+                total=total,
+                last_id=str(last_id),
+                renderer_version=renderer_version,
+            )
+
+    cache.set(RERENDER_DESCRIPTIONS_CHECKPOINT_KEY, None)
+
+
+@tasks.task(ignore_result=True, acks_late=True)
+def update_simple_index(request):
+    """
+    Refresh the stored simple index snapshot, patching it with only the
+    projects that have changed since it was last generated.
+    """
+    render_simple_index(request, store=True)
+
+
+@tasks.task(ignore_result=True, acks_late=True)
+def render_simple_details_batch(request, project_ids):
+    """
+    Re-render and store the simple detail pages for a batch of projects, used
+    to backfill the simple API after a template or API version change.
+    """
+    projects = request.db.scalars(
+        select(Project).where(Project.id.in_(project_ids))
+    ).all()
+    render_simple_details(projects, request, store=True)
+
+
 @tasks.task(bind=True, ignore_result=True, acks_late=True)
 def update_release_description(_task, request, release_id):
     """Given a release_id, update the release description via readme-renderer."""
@@ -302,7 +437,9 @@ def update_release_description(_task, request, release_id):
     )
 
     release.description.html = readme.render(
-        release.description.raw, release.description.content_type
+        release.description.raw,
+        release.description.content_type,
+        metrics=request.find_service(IMetricsService, context=None),
     )
     release.description.rendered_by = renderer_version
 
@@ -369,12 +506,19 @@ def update_bigquery_release_files(task, request, dist_metadata) -> None:
         )
 
 
-@tasks.task(ignore_result=True, acks_late=True)
-def compute_top_dependents_corpus(request: Request) -> dict[str, int]:
+def _dependency_name_expr():
+    return func.normalize_pep426_name(
+        # TODO: this isn't perfect, but it's a start.
+        #  A better solution would be to use a proper parser, but we'd need
+        #  to teach Postgres how to parse it.
+        func.regexp_replace(Dependency.specifier, "^([A-Za-z0-9_.-]+).*", "\\1")
+    )
+
+
+def _top_dependents_stmt(names=None):
     """
-    Query to collect all dependents from projects' most recent release
-    and rank them by the number of dependents.
-    Store in query results cache for retrieval during `file_upload`.
+    Build the query ranking dependency names by the number of projects whose most
+    recent release depends on them, optionally limited to the given names.
     """
     # Create a CTE with the most recent releases for each project.
     # Selects each release's ID, project ID, and version, with a row number
@@ -406,14 +550,7 @@ def compute_top_dependents_corpus(request: Request) -> dict[str, int]:
     # 2. Using regex to extract just the package name portion
     # 3. Converting to lowercase for normalization
     parsed_dependencies_cte = (
-        select(
-            func.normalize_pep426_name(
-                # TODO: this isn't perfect, but it's a start.
-                #  A better solution would be to use a proper parser, but we'd need
-                #  to teach Postgres how to parse it.
-                func.regexp_replace(Dependency.specifier, "^([A-Za-z0-9_.-]+).*", "\\1")
-            ).label("dependent_name")
-        )
+        select(_dependency_name_expr().label("dependent_name"))
         .select_from(recent_releases_cte)
         .join(Dependency, Dependency.release_id == recent_releases_cte.c.release_id)
         .where(
@@ -433,18 +570,114 @@ def compute_top_dependents_corpus(request: Request) -> dict[str, int]:
         )
         .group_by(parsed_dependencies_cte.c.dependent_name)
         .order_by(desc("dependent_count"), parsed_dependencies_cte.c.dependent_name)
-        .limit(10000)
     )
+    if names is None:
+        return top_dependents_stmt.limit(TOP_DEPENDENTS_CORPUS_SIZE)
+    return top_dependents_stmt.where(
+        parsed_dependencies_cte.c.dependent_name.in_(names)
+    )
+
+
+def _store_top_dependents_corpus(
+    cache, corpus: dict[str, int], serial: int
+) -> dict[str, int]:
+    """
+    Store the corpus along with a version stamp, so that readers only need to
+    fetch and rebuild the corpus when its contents actually change.
+    """
+    ranked = sorted(corpus.items(), key=lambda item: (-item[1], item[0]))
+    corpus = dict(ranked[:TOP_DEPENDENTS_CORPUS_SIZE])
+    version = hashlib.sha256(orjson.dumps(corpus)).hexdigest()[:16]
+
+    stamp = cache.get(TOP_DEPENDENTS_CORPUS_VERSION_KEY)
+    if stamp is None or stamp["version"] != version:
+        cache.set(TOP_DEPENDENTS_CORPUS_KEY, corpus)
+    cache.set(TOP_DEPENDENTS_CORPUS_VERSION_KEY, {"version": version, "serial": serial})
+    return corpus
+
+
+@tasks.task(ignore_result=True, acks_late=True)
+def compute_top_dependents_corpus(request: Request) -> dict[str, int]:
+    """
+    Query to collect all dependents from projects' most recent release
+    and rank them by the number of dependents.
+    Store in query results cache for retrieval during `file_upload`.
+    """
+    # Record the serial before querying, so that an incremental refresh picks up
+    # anything that changes while this query runs.
+    serial = request.db.scalar(select(func.max(JournalEntry.id))) or 0
 
     # Execute the query and fetch the constructed object
-    results = request.db.execute(top_dependents_stmt).fetchall()
+    results = request.db.execute(_top_dependents_stmt()).fetchall()
     # Result is Rows, so convert to a dicts of "name: count" pairs
     results = {row.dependent_name: row.dependent_count for row in results}
 
     # Store the results in the query results cache
     cache = request.find_service(IQueryResultsCache)
-    cache_key = "top_dependents_corpus"
-    cache.set(cache_key, results)
+    results = _store_top_dependents_corpus(cache, results, serial)
     logger.info("Stored `top_dependents_corpus` in query results cache.")
 
     return results
+
+
+@tasks.task(ignore_result=True, acks_late=True)
+def refresh_top_dependents_corpus(request: Request) -> dict[str, int]:
+    """
+    Incrementally refresh the top dependents corpus, recounting only the
+    dependency names of projects that have changed since it was last stored.
+
+    Falls back to a full computation when there is no stored corpus.
+    """
+    cache = request.find_service(IQueryResultsCache)
+    stamp = cache.get(TOP_DEPENDENTS_CORPUS_VERSION_KEY)
+    corpus = cache.get(TOP_DEPENDENTS_CORPUS_KEY)
+    if stamp is None or corpus is None:
+        return compute_top_dependents_corpus(request)
+
+    serial = request.db.scalar(select(func.max(JournalEntry.id))) or 0
+    if serial <= stamp["serial"]:
+        return corpus
+
+    changed_names = request.db.scalars(
+        select(JournalEntry.name)
+        .where(JournalEntry.id > stamp["serial"], JournalEntry.id <= serial)
+        .where(JournalEntry.name.is_not(None))
+        .distinct()
+    ).all()
+    # Any name depended upon by any release of a changed project may have gained
+    # or lost a dependent, so recount exactly those names.
+    affected_names = set(
+        request.db.scalars(
+            select(_dependency_name_expr())
+            .select_from(Dependency)
+            .join(Release, Dependency.release_id == Release.id)
+            .join(Project, Release.project_id == Project.id)
+            .where(
+                Project.normalized_name.in_(
+                    sorted({canonicalize_name(name) for name in changed_names})
+                ),
+                Dependency.kind.in_(
+                    [DependencyKind.requires_dist, DependencyKind.requires]
+                ),
+            )
+            .distinct()
+        )
+    )
+
+    if affected_names:
+        counts = {
+            row.dependent_name: row.dependent_count
+            for row in request.db.execute(_top_dependents_stmt(sorted(affected_names)))
+        }
+        for name in affected_names:
+            corpus.pop(name, None)
+        corpus.update(counts)
+
+    corpus = _store_top_dependents_corpus(cache, corpus, serial)
+    logger.info(
+        "Refreshed `top_dependents_corpus` in query results cache.",
+        changed_projects=len(changed_names),
+        recounted_names=len(affected_names),
+    )
+
+    return corpus
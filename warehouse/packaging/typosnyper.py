@@ -13,6 +13,9 @@ Takes inspiration from the `typoguard` paper & project,
 and the `typomania` Rust project.
 """
 
+import functools
+
+from collections.abc import Iterable
 from itertools import permutations
 
 # Ensure all checks return a similar type,
@@ -275,6 +278,57 @@ _TYPO_MAP = {
 }
 
 
+_ALLOWED_CHARACTERS = "abcdefghijklmnopqrstuvwxyz1234567890.-_"
+
+
+class TypoIndex:
+    """
+    A precomputed reverse index over a corpus of project names.
+
+    The most expensive checks become dictionary lookups against this index
+    rather than generating and probing every candidate name:
+
+    - every name with a single allowed character deleted maps back to the
+      names it came from, answering `_omitted_characters`
+    - every name's sorted `-` separated tokens map back to the names that
+      contain them, answering `_swapped_words`
+
+    Supports `in`, so it can be used anywhere a corpus `set` is expected.
+    """
+
+    def __init__(self, corpus: Iterable[str]):
+        self.names = frozenset(corpus)
+        self.deletions: dict[str, list[tuple[int, int, str]]] = {}
+        self.token_sets: dict[str, list[str]] = {}
+
+        for name in self.names:
+            for idx, character in enumerate(name):
+                if character in _ALLOWED_CHARACTERS:
+                    self.deletions.setdefault(name[:idx] + name[idx + 1 :], []).append(
+                        (idx, _ALLOWED_CHARACTERS.index(character), name)
+                    )
+
+            tokens = name.split("-")
+            if len(tokens) > 1:
+                self.token_sets.setdefault("-".join(sorted(tokens)), []).append(name)
+
+        # Order the candidates the same way that probing for them would find
+        # them, so that the index returns the same match as the probes.
+        for candidates in self.deletions.values():
+            candidates.sort()
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.names
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+@functools.cache
+def _top_project_names_index() -> TypoIndex:
+    return TypoIndex(_TOP_PROJECT_NAMES)
+
+
 def _repeated_characters(project_name: str, corpus: set[str]) -> TypoCheckMatch:
     """
     Removes any identical consecutive characters to check for typosquatting
@@ -297,7 +351,9 @@ def _repeated_characters(project_name: str, corpus: set[str]) -> TypoCheckMatch:
     return None
 
 
-def _omitted_characters(project_name: str, corpus: set[str]) -> TypoCheckMatch:
+def _omitted_characters(
+    project_name: str, corpus: set[str] | TypoIndex
+) -> TypoCheckMatch:
     """
     Inserts allowed characters into name to check for typosquatting by omission.
     For example, 'evnt-stream' could be typosquatting 'event-stream'.
@@ -306,17 +362,21 @@ def _omitted_characters(project_name: str, corpus: set[str]) -> TypoCheckMatch:
 
     Note: Performance-wise, this is the slowest check, but is straightforward.
     We're talking 178 microseconds vs 40 microseconds, so it's fine for our use case.
+    Given a `TypoIndex`, this is a single lookup instead.
     """
-    allowed_characters = "abcdefghijklmnopqrstuvwxyz1234567890.-_"
-
     # Do not apply this check to short project names, to reduce false positives
     if len(project_name) < 4:
         return None
 
+    if isinstance(corpus, TypoIndex):
+        if candidates := corpus.deletions.get(project_name):
+            return "omitted_characters", candidates[0][2]
+        return None
+
     # Loop through every position in the given package_name
     for idx in range(len(project_name) + 1):
         # Loop through every character in the list of allowed characters
-        for character in allowed_characters:
+        for character in _ALLOWED_CHARACTERS:
             # Build new name by inserting the current character in the current position
             constructed = project_name[:idx] + character + project_name[idx:]
             # If the new name is in the list of popular names, return it
@@ -348,10 +408,12 @@ def _swapped_characters(project_name: str, corpus: set[str]) -> TypoCheckMatch:
     return None
 
 
-def _swapped_words(project_name: str, corpus: set[str]) -> TypoCheckMatch:
+def _swapped_words(project_name: str, corpus: set[str] | TypoIndex) -> TypoCheckMatch:
     """
     Reorders project_name substrings separated by `-` to look for typosquatting.
     For example, 'stream-event' could be  squatting 'event-stream'.
+
+    Given a `TypoIndex`, only the names sharing the same tokens are considered.
     """
 
     # Input is a canonicalized name, split it on `-` to we can swap them around
@@ -366,6 +428,20 @@ def _swapped_words(project_name: str, corpus: set[str]) -> TypoCheckMatch:
     ):
         return None
 
+    if isinstance(corpus, TypoIndex):
+        candidates = [
+            name
+            for name in corpus.token_sets.get("-".join(sorted(tokens)), ())
+            if name != project_name
+        ]
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return "swapped_words", candidates[0]
+        # Several names share these tokens, fall through to find the one that
+        # the permutations would have found first.
+        corpus = set(candidates)
+
     # Get all possible permutations of the words in the name
     for p in permutations(tokens):
         # Join the words using `-` to create a new name
@@ -405,10 +481,13 @@ def typo_check_name(project_name: str, corpus=None) -> TypoCheckMatch:
     Check if the given project name is a typo of another project name.
 
     Runs multiple checks, and if any of them match, returns the matched name.
+
+    The corpus may be a plain collection of names, or a prebuilt `TypoIndex`
+    which should be preferred when checking many names against one corpus.
     """
     if corpus is None:
         # Fall back to the static list if not provided
-        corpus = _TOP_PROJECT_NAMES
+        corpus = _top_project_names_index()
 
     # Run each check in order
     for check in (
@@ -1,20 +1,34 @@
 # SPDX-License-Identifier: Apache-2.0
 
+import collections
+import concurrent.futures
 import hashlib
+import json
 import os.path
 import tempfile
+import time
 
 import packaging_legacy.version
 
+from packaging.utils import canonicalize_name
 from pyramid_jinja2 import IJinja2Environment
 from sqlalchemy import String, cast, func, select
 from sqlalchemy.orm import joinedload
 
+from warehouse.metrics import IMetricsService
 from warehouse.packaging.interfaces import ISimpleStorage
-from warehouse.packaging.models import File, LifecycleStatus, Project, Release
+from warehouse.packaging.models import (
+    File,
+    JournalEntry,
+    LifecycleStatus,
+    Project,
+    Release,
+)
 
 API_VERSION = "1.4"
 
+SIMPLE_INDEX_SNAPSHOT_PATH = "index.json"
+
 
 def _simple_index(request, serial):
     # Fetch the name and last serial name for all of our projects
@@ -48,13 +62,81 @@ def _simple_index(request, serial):
     }
 
 
-def _simple_detail(project, request):
-    # Get all of the files for this project.
-    files = sorted(
+def _simple_index_changes(request, since_serial):
+    """
+    Return a mapping of normalized project name to its index entry for every
+    project that has been journaled since ``since_serial``. Projects which no
+    longer belong in the index (deleted or quarantined) map to ``None``.
+    """
+    changed_names = {
+        canonicalize_name(name)
+        for name in request.db.scalars(
+            select(JournalEntry.name)
+            .where(JournalEntry.id > since_serial)
+            .where(JournalEntry.name.is_not(None))
+            .distinct()
+        )
+    }
+    if not changed_names:
+        return {}
+
+    changes = dict.fromkeys(changed_names)
+    projects = request.db.execute(
+        select(Project.name, Project.normalized_name, Project.last_serial)
+        .where(Project.normalized_name.in_(changed_names))
+        # Exclude projects that are in the `quarantine-enter` lifecycle status.
+        .where(
+            Project.lifecycle_status.is_distinct_from(LifecycleStatus.QuarantineEnter)
+        )
+    )
+    for name, normalized_name, last_serial in projects:
+        changes[normalized_name] = {"name": name, "_last-serial": last_serial}
+
+    return changes
+
+
+def _patch_simple_index(index, changes, serial):
+    """
+    Apply the changes returned by ``_simple_index_changes`` to a previously
+    generated index, returning a new index at the given serial.
+    """
+    projects = {
+        canonicalize_name(project["name"]): project for project in index["projects"]
+    }
+    for normalized_name, entry in changes.items():
+        if entry is None:
+            projects.pop(normalized_name, None)
+        else:
+            projects[normalized_name] = entry
+
+    return {
+        "meta": {"api-version": API_VERSION, "_last-serial": serial},
+        "projects": [projects[name] for name in sorted(projects)],
+    }
+
+
+def _load_simple_index(storage):
+    try:
+        with storage.get(SIMPLE_INDEX_SNAPSHOT_PATH) as f:
+            index = json.load(f)
+    except FileNotFoundError:
+        return None
+
+    # A snapshot generated for a different API version can't be patched, it
+    # needs to be regenerated from scratch.
+    if index.get("meta", {}).get("api-version") != API_VERSION:
+        return None
+
+    return index
+
+
+def _simple_detail_files(request, project_ids):
+    # Get all of the files for the given projects.
+    return (
         request.db.query(File)
         .options(joinedload(File.release))
         .join(Release)
-        .filter(Release.project == project)
+        .filter(Release.project_id.in_(project_ids))
         # Exclude releases that are in the `quarantine-enter` lifecycle status.
         # Use `is_distinct_from` to keep NULL (unset) statuses.
         .filter(
@@ -65,13 +147,34 @@ def _simple_detail(project, request):
         .filter(
             Project.lifecycle_status.is_distinct_from(LifecycleStatus.QuarantineEnter)
         )
-        .all(),
-        key=lambda f: (packaging_legacy.version.parse(f.release.version), f.filename),
+        .all()
     )
-    versions = sorted(
-        {f.release.version for f in files}, key=packaging_legacy.version.parse
+
+
+def _simple_detail(project, request):
+    return _simple_detail_context(
+        project, _simple_detail_files(request, [project.id]), request
     )
 
+
+def _release_sort_keys(releases):
+    # Prefer the precomputed ordering maintained at upload time, only falling
+    # back to parsing each version (once per release, not once per file) if
+    # any of the releases are missing it.
+    if all(release._pypi_ordering is not None for release in releases):
+        return {release: release._pypi_ordering for release in releases}
+    return {
+        release: packaging_legacy.version.parse(release.version) for release in releases
+    }
+
+
+def _simple_detail_context(project, files, request):
+    sort_keys = _release_sort_keys({f.release for f in files})
+    files = sorted(files, key=lambda f: (sort_keys[f.release], f.filename))
+    versions = [
+        release.version for release in sorted(sort_keys, key=sort_keys.__getitem__)
+    ]
+
     return {
         "meta": {"api-version": API_VERSION, "_last-serial": project.last_serial},
         "name": project.normalized_name,
@@ -122,48 +225,152 @@ def _simple_detail(project, request):
     }
 
 
+def _render_simple_detail(project, context, template, request):
+    content = template.render(**context, request=request).encode("utf-8")
+
+    content_hasher = hashlib.blake2b(digest_size=256 // 8)
+    content_hasher.update(content)
+    content_hash = content_hasher.hexdigest().lower()
+
+    simple_detail_path = (
+        f"{project.normalized_name}/{content_hash}.{project.normalized_name}.html"
+    )
+
+    return content, content_hash, simple_detail_path
+
+
+def _store_simple_detail(
+    storage, normalized_name, last_serial, content, content_hash, simple_detail_path
+):
+    meta = {
+        "project": normalized_name,
+        "pypi-last-serial": last_serial,
+        "hash": content_hash,
+    }
+    with tempfile.NamedTemporaryFile() as f:
+        f.write(content)
+        f.flush()
+
+        storage.store(simple_detail_path, f.name, meta=meta)
+        storage.store(os.path.join(normalized_name, "index.html"), f.name, meta=meta)
+
+
 def render_simple_detail(project, request, store=False):
     context = _simple_detail(project, request)
     context = _valid_simple_detail_context(context)
 
     env = request.registry.queryUtility(IJinja2Environment, name=".jinja2")
     template = env.get_template("templates/api/simple/detail.html")
-    content = template.render(**context, request=request)
+    content, content_hash, simple_detail_path = _render_simple_detail(
+        project, context, template, request
+    )
 
-    content_hasher = hashlib.blake2b(digest_size=256 // 8)
-    content_hasher.update(content.encode("utf-8"))
-    content_hash = content_hasher.hexdigest().lower()
+    if store:
+        storage = request.find_service(ISimpleStorage)
+        _store_simple_detail(
+            storage,
+            project.normalized_name,
+            project.last_serial,
+            content,
+            content_hash,
+            simple_detail_path,
+        )
 
-    simple_detail_path = (
-        f"{project.normalized_name}/{content_hash}.{project.normalized_name}.html"
-    )
+    return (content_hash, simple_detail_path)
+
+
+def render_simple_details(projects, request, store=False, max_workers=8):
+    """
+    Render (and optionally store) the simple detail pages for many projects
+    at once, returning a mapping of normalized name to (hash, path).
+
+    The files for every project are loaded with a single query, and the
+    storage writes are fanned out across a thread pool since they are I/O
+    bound. Rendering itself happens on the calling thread, as neither the
+    database session nor the request are safe to share between threads.
+    """
+    metrics = request.find_service(IMetricsService, context=None)
+    start = time.monotonic()
+
+    files_by_project = collections.defaultdict(list)
+    for file in _simple_detail_files(request, [project.id for project in projects]):
+        files_by_project[file.release.project_id].append(file)
+
+    env = request.registry.queryUtility(IJinja2Environment, name=".jinja2")
+    template = env.get_template("templates/api/simple/detail.html")
+
+    rendered = {}
+    for project in projects:
+        context = _simple_detail_context(project, files_by_project[project.id], request)
+        context = _valid_simple_detail_context(context)
+        rendered[project] = _render_simple_detail(project, context, template, request)
 
     if store:
         storage = request.find_service(ISimpleStorage)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(
+                    _store_simple_detail,
+                    storage,
+                    project.normalized_name,
+                    project.last_serial,
+                    *result,
+                )
+                for project, result in rendered.items()
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+
+    elapsed = time.monotonic() - start
+    metrics.histogram("warehouse.simple.render_bulk.projects", len(projects))
+    metrics.timing("warehouse.simple.render_bulk.duration", elapsed * 1000)
+    metrics.gauge(
+        "warehouse.simple.render_bulk.projects_per_second",
+        len(projects) / elapsed if elapsed else 0,
+    )
+
+    return {
+        project.normalized_name: (content_hash, simple_detail_path)
+        for project, (_, content_hash, simple_detail_path) in rendered.items()
+    }
+
+
+def render_simple_index(request, store=False):
+    serial = request.db.query(func.max(JournalEntry.id)).scalar() or 0
+
+    storage = request.find_service(ISimpleStorage)
+    previous = _load_simple_index(storage)
+    if previous is None:
+        index = _simple_index(request, serial)
+    elif previous["meta"]["_last-serial"] == serial:
+        # Nothing has changed since the stored snapshot, so there's nothing to
+        # patch and nothing that needs to be uploaded again.
+        return previous
+    else:
+        index = _patch_simple_index(
+            previous,
+            _simple_index_changes(request, previous["meta"]["_last-serial"]),
+            serial,
+        )
+
+    if store:
+        meta = {"pypi-last-serial": serial}
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(json.dumps(index, sort_keys=True).encode("utf-8"))
+            f.flush()
+
+            storage.store(SIMPLE_INDEX_SNAPSHOT_PATH, f.name, meta=meta)
+
+        env = request.registry.queryUtility(IJinja2Environment, name=".jinja2")
+        template = env.get_template("templates/api/simple/index.html")
+        content = template.render(**index, request=request)
         with tempfile.NamedTemporaryFile() as f:
             f.write(content.encode("utf-8"))
             f.flush()
 
-            storage.store(
-                simple_detail_path,
-                f.name,
-                meta={
-                    "project": project.normalized_name,
-                    "pypi-last-serial": project.last_serial,
-                    "hash": content_hash,
-                },
-            )
-            storage.store(
-                os.path.join(project.normalized_name, "index.html"),
-                f.name,
-                meta={
-                    "project": project.normalized_name,
-                    "pypi-last-serial": project.last_serial,
-                    "hash": content_hash,
-                },
-            )
+            storage.store("index.html", f.name, meta=meta)
 
-    return (content_hash, simple_detail_path)
+    return index
 
 
 def _valid_simple_detail_context(context: dict) -> dict:
@@ -1,6 +1,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import functools
+import time
 
 from datetime import UTC, datetime
 
@@ -8,16 +9,83 @@ import redis
 import structlog
 
 from limits import parse_many
-from limits.storage import storage_from_string
+from limits.storage import RedisStorage, storage_from_string
 from limits.strategies import MovingWindowRateLimiter
 from more_itertools import first_true
 from zope.interface import implementer
 
 from warehouse.metrics import IMetricsService
-from warehouse.rate_limiting.interfaces import IRateLimiter, WindowStats
+from warehouse.rate_limiting.interfaces import (
+    IRateLimiter,
+    RateLimitResult,
+    WindowStats,
+)
+from warehouse.rate_limiting.local import LocalRateLimits
 
 logger = structlog.get_logger(__name__)
 
+# Hits (or tests) every policy of a RateLimiter and reads back their moving
+# windows in a single round trip. This operates on the same lists of
+# timestamps that limits' MovingWindowRateLimiter keeps in Redis, so that it
+# can be used interchangeably with the rest of the RateLimiter methods.
+#
+# KEYS: The (prefixed) key for each policy.
+# ARGV: The current timestamp, "1" to consume an entry or "0" to only test for
+#       room for one, followed by the amount and expiry of each policy.
+#
+# Returns whether the action is allowed, followed by the start of the window
+# and the number of entries in it for each policy.
+_HIT_AND_STATS_SCRIPT = """
+local timestamp = tonumber(ARGV[1])
+local consume = ARGV[2] == "1"
+local allowed = 1
+local result = {}
+
+for i, key in ipairs(KEYS) do
+    local amount = tonumber(ARGV[1 + i * 2])
+    local expiry = tonumber(ARGV[2 + i * 2])
+    local start = timestamp - expiry
+
+    -- Like MovingWindowRateLimiter.hit, stop consuming from the remaining
+    -- policies as soon as one of them is exhausted.
+    if allowed == 1 then
+        local entry = redis.call("lindex", key, amount - 1)
+        if entry and tonumber(entry) >= start then
+            allowed = 0
+        elseif consume then
+            redis.call("lpush", key, ARGV[1])
+            redis.call("ltrim", key, 0, amount - 1)
+            redis.call("expire", key, expiry)
+        end
+    end
+
+    -- The list is ordered newest first, so binary search for the oldest
+    -- entry that is still within the window.
+    local low, high, index = 0, amount - 1, nil
+    while low <= high do
+        local mid = math.floor((low + high) / 2)
+        local value = tonumber(redis.call("lindex", key, mid))
+        if value and value >= start then
+            index = mid
+            low = mid + 1
+        else
+            high = mid - 1
+        end
+    end
+
+    if index then
+        table.insert(result, redis.call("lindex", key, index))
+        table.insert(result, index + 1)
+    else
+        table.insert(result, ARGV[1])
+        table.insert(result, 0)
+    end
+end
+
+table.insert(result, 1, allowed)
+return result
+"""
+
 
 def _return_on_exception(rvalue, *exceptions):
     def deco(fn):
@@ -30,6 +98,12 @@ def _return_on_exception(rvalue, *exceptions):
                 self._metrics.increment(
                     "warehouse.ratelimiter.error", tags=[f"call:{fn.__name__}"]
                 )
+
+                # If we have a local approximation of our limits, then rather
+                # than failing open, we'll use it until Redis has recovered.
+                if self._fallback is not None:
+                    return getattr(self._fallback, fn.__name__)(*args, **kwargs)
+
                 return rvalue
 
         return wrapper
@@ -39,7 +113,7 @@ def _return_on_exception(rvalue, *exceptions):
 
 @implementer(IRateLimiter)
 class RateLimiter:
-    def __init__(self, storage, limit, *, identifiers=None, metrics):
+    def __init__(self, storage, limit, *, identifiers=None, metrics, local=None):
         if identifiers is None:
             identifiers = []
 
@@ -49,25 +123,158 @@ class RateLimiter:
         self._identifiers = identifiers
         self._metrics = metrics
 
+        # Only Redis can do a hit and fetch the stats for every policy at once,
+        # anything else falls back to doing them one at a time.
+        self._hit_and_stats_script = None
+        if isinstance(storage, RedisStorage):
+            self._hit_and_stats_script = storage.get_connection().register_script(
+                _HIT_AND_STATS_SCRIPT
+            )
+
+        # When we have been given the per-process LocalRateLimits, we keep a
+        # worker local copy of our limits to fall back to if Redis fails.
+        self._local = local
+        self._fallback = None
+        if local is not None:
+            self._fallback = RateLimiter(
+                local.storage, limit, identifiers=identifiers, metrics=metrics
+            )
+
     def _get_identifiers(self, identifiers):
         return [str(i) for i in list(self._identifiers) + list(identifiers)]
 
+    def _local_key(self, identifiers):
+        return tuple(
+            limit.key_for(*self._get_identifiers(identifiers)) for limit in self._limits
+        )
+
+    def _locally_blocked(self, identifiers, call):
+        if self._local is None:
+            return None
+
+        result = self._local.get(self._local_key(identifiers))
+        if result is not None:
+            self._metrics.increment(
+                "warehouse.ratelimiter.local.rejected", tags=[f"call:{call}"]
+            )
+        return result
+
     @_return_on_exception(True, redis.RedisError)
     def test(self, *identifiers):
-        return all(
+        if self._locally_blocked(identifiers, "test") is not None:
+            return False
+
+        allowed = all(
             self._window.test(limit, *self._get_identifiers(identifiers))
             for limit in self._limits
         )
 
+        # We need to know when the limit resets to know how long we can block
+        # it locally for, which hit_and_stats will find out and block for us.
+        if not allowed and self._local is not None:
+            self.hit_and_stats(*identifiers, consume=False)
+
+        return allowed
+
     @_return_on_exception(True, redis.RedisError)
     def hit(self, *identifiers):
-        return all(
+        if self._locally_blocked(identifiers, "hit") is not None:
+            return False
+
+        allowed = all(
             self._window.hit(limit, *self._get_identifiers(identifiers))
             for limit in self._limits
         )
 
+        if self._local is not None:
+            if allowed:
+                self._fallback.hit(*identifiers)
+            else:
+                self.hit_and_stats(*identifiers, consume=False)
+
+        return allowed
+
+    @_return_on_exception(
+        RateLimitResult(allowed=True, stats=[], resets_in=None), redis.RedisError
+    )
+    def hit_and_stats(self, *identifiers, consume=True):
+        if (result := self._locally_blocked(identifiers, "hit_and_stats")) is not None:
+            return result
+
+        result = self._hit_and_stats(*identifiers, consume=consume)
+
+        if self._local is not None:
+            if not result.allowed:
+                self._local.block(self._local_key(identifiers), result)
+            elif consume:
+                self._fallback.hit(*identifiers)
+
+        return result
+
+    def _hit_and_stats(self, *identifiers, consume):
+        identifiers = self._get_identifiers(identifiers)
+        timestamp = time.time()
+
+        if self._hit_and_stats_script is not None:
+            allowed, *windows = self._hit_and_stats_script(
+                keys=[
+                    self._storage.prefixed_key(limit.key_for(*identifiers))
+                    for limit in self._limits
+                ],
+                args=[
+                    timestamp,
+                    int(consume),
+                    *(
+                        arg
+                        for limit in self._limits
+                        for arg in (limit.amount, limit.get_expiry())
+                    ),
+                ],
+            )
+            allowed = bool(allowed)
+            windows = [
+                (float(start) + limit.get_expiry(), limit.amount - count)
+                for limit, start, count in zip(
+                    self._limits, windows[::2], windows[1::2], strict=True
+                )
+            ]
+        else:
+            check = self._window.hit if consume else self._window.test
+            allowed = all(check(limit, *identifiers) for limit in self._limits)
+            windows = [
+                self._window.get_window_stats(limit, *identifiers)
+                for limit in self._limits
+            ]
+
+        now = datetime.fromtimestamp(timestamp, tz=UTC)
+        stats = []
+        resets = []
+        for limit, (resets_at, remaining) in zip(self._limits, windows, strict=True):
+            reset = datetime.fromtimestamp(resets_at, tz=UTC)
+            stats.append(
+                WindowStats(
+                    amount=limit.amount,
+                    window_seconds=limit.get_expiry(),
+                    remaining=remaining,
+                    resets_in_seconds=max(0, int((reset - now).total_seconds())),
+                )
+            )
+
+            # Same as resets_in, only exhausted limits that haven't reset yet
+            # tell us when this action might be allowed again.
+            if remaining <= 0 and reset > now:
+                resets.append(reset - now)
+
+        return RateLimitResult(
+            allowed=allowed, stats=stats, resets_in=first_true(sorted(resets))
+        )
+
     @_return_on_exception(None, redis.RedisError)
     def clear(self, *identifiers):
+        if self._local is not None:
+            self._local.unblock(self._local_key(identifiers))
+            self._fallback.clear(*identifiers)
+
         for limit in self._limits:
             self._storage.clear(limit.key_for(*self._get_identifiers(identifiers)))
 
@@ -130,6 +337,9 @@ class DummyRateLimiter:
     def hit(self, *identifiers):
         return True
 
+    def hit_and_stats(self, *identifiers, consume=True):
+        return RateLimitResult(allowed=True, stats=[], resets_in=None)
+
     def clear(self, *identifiers):
         return None
 
@@ -152,6 +362,7 @@ class RateLimit:
             limit=self.limit,
             identifiers=self.identifiers,
             metrics=request.find_service(IMetricsService, context=None),
+            local=request.registry.get("ratelimiter.local"),
         )
 
     def __repr__(self):
@@ -185,4 +396,6 @@ def includeme(config):
     config.registry["ratelimiter.storage"] = storage_from_string(
         config.registry.settings["ratelimit.url"]
     )
+    if local_ttl := config.registry.settings.get("ratelimit.local_ttl"):
+        config.registry["ratelimiter.local"] = LocalRateLimits(ttl=local_ttl)
     config.add_tween("warehouse.rate_limiting.headers.rate_limit_headers_tween_factory")
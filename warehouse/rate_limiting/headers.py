@@ -33,6 +33,7 @@ def record_rate_limit(
     *,
     identifiers,
     partition_key: PartitionKey,
+    stats: list[WindowStats] | None = None,
 ) -> None:
     """
     Capture a snapshot of the limiter's current state for the given identifiers
@@ -41,8 +42,12 @@ def record_rate_limit(
     Safe to call multiple times per request; each call appends a snapshot.
     `partition_key` is an opaque label (e.g. "ip", "user") describing what the
     limiter is keyed on — never the raw identifier value.
+
+    Callers that already have the stats in hand (e.g. from `hit_and_stats`)
+    can pass them as `stats` to avoid another round trip to the limiter.
     """
-    stats = limiter.get_window_stats(*identifiers)
+    if stats is None:
+        stats = limiter.get_window_stats(*identifiers)
     if not stats:
         return
     snapshots = request.__dict__.setdefault("_rate_limit_snapshots", [])
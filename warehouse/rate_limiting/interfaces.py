@@ -1,6 +1,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from dataclasses import dataclass
+from datetime import timedelta
 
 from zope.interface import Interface
 
@@ -15,6 +16,20 @@ class WindowStats:
     resets_in_seconds: int
 
 
+@dataclass(frozen=True)
+class RateLimitResult:
+    """
+    The outcome of a combined hit (or test) and window stats lookup.
+
+    `resets_in` is the timedelta until the soonest exhausted policy resets, or
+    None if no policy is currently exhausted.
+    """
+
+    allowed: bool
+    stats: list[WindowStats]
+    resets_in: timedelta | None
+
+
 class IRateLimiter(Interface):
     def test(*identifiers):
         """
@@ -36,6 +51,17 @@ class IRateLimiter(Interface):
         by identifiers will reset.
         """
 
+    def hit_and_stats(*identifiers, consume=True):
+        """
+        Registers a hit for the rate limit identified by the identifiers (or,
+        if consume is False, only checks if there is room for one), and returns
+        a RateLimitResult with whether or not to allow the action, along with
+        the WindowStats and reset time for every policy as of that hit.
+
+        This is equivalent to calling hit (or test), get_window_stats, and
+        resets_in, but is done in a single round trip to the backing storage.
+        """
+
     def clear(*identifiers):
         """
         Clears the rate limiter identified by the identifiers.
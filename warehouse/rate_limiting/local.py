@@ -0,0 +1,102 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+An optional, per-process layer in front of the Redis backed rate limiters.
+
+Every check of a RateLimiter is a round trip to Redis, which during an abuse
+spike means that the clients we are trying to turn away generate most of our
+Redis traffic, and if Redis becomes saturated we fail open and stop limiting
+anyone at all. When enabled, this layer lets each worker:
+
+* Remember the identifiers that Redis has told it are over their limit, and
+  keep rejecting them locally until either their limit resets, or a short TTL
+  passes and we go back to Redis to find out if anything has changed (e.g. the
+  limit was cleared by another worker).
+* Keep an approximate, worker local copy of every limit that we fall back to
+  when Redis is unavailable, rather than failing open.
+"""
+
+import collections
+import dataclasses
+import threading
+import time
+
+from datetime import timedelta
+
+from limits.storage import MemoryStorage
+
+from warehouse.rate_limiting.interfaces import RateLimitResult
+
+# The most over limit identifiers that a single worker will remember at once,
+# the least recently rejected are forgotten first.
+MAX_BLOCKED = 100_000
+
+
+@dataclasses.dataclass(frozen=True)
+class _Block:
+    blocked_at: float
+    until: float
+    result: RateLimitResult
+
+
+class LocalRateLimits:
+    """
+    Per-process rate limiting state, shared by every RateLimiter in a worker.
+    """
+
+    def __init__(self, ttl, *, max_blocked=MAX_BLOCKED):
+        self.ttl = ttl
+        self.max_blocked = max_blocked
+        self.storage = MemoryStorage()
+        self._blocked = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the RateLimitResult that blocked key, as of now, or None if
+        key isn't (or is no longer) blocked locally.
+        """
+        now = time.time()
+        with self._lock:
+            if (block := self._blocked.get(key)) is None:
+                return None
+            if block.until <= now:
+                del self._blocked[key]
+                return None
+            self._blocked.move_to_end(key)
+
+        elapsed = now - block.blocked_at
+        return dataclasses.replace(
+            block.result,
+            stats=[
+                dataclasses.replace(
+                    s, resets_in_seconds=max(0, s.resets_in_seconds - int(elapsed))
+                )
+                for s in block.result.stats
+            ],
+            resets_in=(
+                block.result.resets_in - timedelta(seconds=elapsed)
+                if block.result.resets_in is not None
+                else None
+            ),
+        )
+
+    def block(self, key, result):
+        """
+        Blocks key locally with the given (denied) RateLimitResult, until the
+        limit resets or our TTL passes, whichever is sooner.
+        """
+        now = time.time()
+        ttl = self.ttl
+        if result.resets_in is not None:
+            ttl = min(ttl, result.resets_in.total_seconds())
+
+        with self._lock:
+            self._blocked.pop(key, None)
+            self._blocked[key] = _Block(blocked_at=now, until=now + ttl, result=result)
+            while len(self._blocked) > self.max_blocked:
+                self._blocked.popitem(last=False)
+
+    def unblock(self, key):
+        with self._lock:
+            self._blocked.pop(key, None)
@@ -631,6 +631,7 @@ def includeme(config):
     # API URLs
     config.add_route("api.billing.webhook", "/billing/webhook/", domain=warehouse)
     config.add_route("api.simple.index", "/simple/", domain=warehouse)
+    config.add_route("api.changes", "/api/changes/", domain=warehouse)
     config.add_route(
         "api.simple.detail",
         "/simple/{name}/",
@@ -1,16 +1,123 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import base64
+import collections
+import functools
 import hashlib
+import threading
 
 from collections.abc import Sequence
 
-ENCODINGS = ["identity", "gzip"]
+from webob.response import gzip_app_iter
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    from compression import zstd
+except ImportError:  # pragma: no cover
+    zstd = None
+
+# The order of these is our preference when a client accepts several of them
+# equally, with identity first so that it is used when the client has no
+# preference at all.
+ENCODINGS = [
+    "identity",
+    *(["br"] if brotli is not None else []),
+    *(["zstd"] if zstd is not None else []),
+    "gzip",
+]
 DEFAULT_ENCODING = "identity"
 BUFFER_MAX = 1 * 1024 * 1024  # We'll buffer up to 1MB
+CACHE_MAX_BYTES = 64 * 1024 * 1024  # We'll cache up to 64MB of compressed variants
+
+BROTLI_QUALITY = 6
+ZSTD_LEVEL = 9
+
+
+def _brotli_app_iter(app_iter):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for chunk in app_iter:
+        if data := compressor.process(chunk):
+            yield data
+    yield compressor.finish()
+
+
+def _zstd_app_iter(app_iter):
+    compressor = zstd.ZstdCompressor(level=ZSTD_LEVEL)
+    for chunk in app_iter:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
+
+
+_APP_ITER_ENCODERS = {
+    "gzip": gzip_app_iter,
+    "br": _brotli_app_iter,
+    "zstd": _zstd_app_iter,
+}
+
+
+def _encode_body(body, encoding):
+    if encoding == "identity":
+        return body
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "zstd":
+        return zstd.compress(body, level=ZSTD_LEVEL)
+    return b"".join(_APP_ITER_ENCODERS[encoding]([body]))
+
+
+class CompressedVariantCache:
+    """
+    A bounded, in-process LRU of compressed response bodies.
+
+    Entries are keyed by the ETag of the uncompressed response and the content
+    encoding, so that each version of a cacheable page is only compressed once
+    per encoding, rather than once per request.
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag, encoding):
+        with self._lock:
+            body = self._entries.get((etag, encoding))
+            if body is not None:
+                self._entries.move_to_end((etag, encoding))
+            return body
+
+    def set(self, etag, encoding, body):
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            if (previous := self._entries.pop((etag, encoding), None)) is not None:
+                self.size -= len(previous)
+            self._entries[(etag, encoding)] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+def _is_cacheable(response):
+    # We only cache compressed variants of responses that have a validator that
+    # identifies their content, and that are allowed to be stored in a shared
+    # cache anyways.
+    return (
+        response.etag is not None
+        and not response.cache_control.private
+        and not response.cache_control.no_store
+    )
 
 
-def _compressor(request, response):
+def _compressor(request, response, *, cache=None):
     # Skip items with a Vary: Cookie/Authorization Header because we don't know
     # if they are safe from the CRIME attack.
     if response.vary is not None and (set(response.vary) & {"Cookie", "Authorization"}):
@@ -45,7 +152,9 @@ def _compressor(request, response):
         streaming = False
 
     if streaming:
-        response.encode_content(encoding=target_encoding, lazy=True)
+        if target_encoding != "identity":
+            response.app_iter = _APP_ITER_ENCODERS[target_encoding](response.app_iter)
+            response.content_encoding = target_encoding
 
         # We need to remove the content_length from this response, since
         # we no longer know what the length of the content will be.
@@ -53,33 +162,44 @@ def _compressor(request, response):
 
         # If this has a streaming response, then we need to adjust the ETag
         # header, if it has one, so that it reflects this. We don't just append
-        # ;gzip to this because we don't want people to try and use it to infer
-        # any information about it.
+        # the encoding to this because we don't want people to try and use it
+        # to infer any information about it.
         if response.etag is not None:
             md5_digest = hashlib.md5(
-                (response.etag + ";gzip").encode("utf8"), usedforsecurity=False
+                (response.etag + f";{target_encoding}").encode("utf8"),
+                usedforsecurity=False,
             )
             md5_digest = md5_digest.digest()
             md5_digest = base64.b64encode(md5_digest)
             md5_digest = md5_digest.replace(b"\n", b"").decode("utf8")
             response.etag = md5_digest.strip("=")
-    else:
-        original_length = len(response.body)
-        response.encode_content(encoding=target_encoding, lazy=False)
+    elif target_encoding != "identity":
+        body = response.body
+
+        if cache is not None and _is_cacheable(response):
+            etag = response.etag
+            encoded = cache.get(etag, target_encoding)
+            if encoded is None:
+                encoded = _encode_body(body, target_encoding)
+                cache.set(etag, target_encoding, encoded)
+        else:
+            encoded = _encode_body(body, target_encoding)
 
         # If the original length is less than our new, compressed length
-        # then we'll go back to the original. There is no reason to encode
-        # the content if it increases the length of the body.
-        if original_length < len(response.body):
-            response.decode_content()
-
-        # If we've added an encoding to the content, then we'll want to
-        # recompute the ETag.
-        if response.content_encoding is not None:
+        # then we'll keep the original. There is no reason to encode the
+        # content if it increases the length of the body.
+        if len(encoded) <= len(body):
+            response.body = encoded
+            response.content_encoding = target_encoding
+
+            # Since we've added an encoding to the content, we'll want to
+            # recompute the ETag.
             response.md5_etag()
 
 
 def compression_tween_factory(handler, registry):
+    cache = CompressedVariantCache()
+
     def compression_tween(request):
         response = handler(request)
 
@@ -87,7 +207,7 @@ def compression_tween_factory(handler, registry):
         # other response callbacks are called. This is important because
         # otherwise we won't be able to check Vary headers and such that are
         # set by response callbacks.
-        request.add_response_callback(_compressor)
+        request.add_response_callback(functools.partial(_compressor, cache=cache))
 
         return response
 
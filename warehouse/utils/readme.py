@@ -2,6 +2,11 @@
 
 """Utils for rendering and updating package descriptions (READMEs)."""
 
+import collections
+import functools
+import hashlib
+import threading
+
 from email.message import EmailMessage
 from importlib.metadata import distribution
 
@@ -17,8 +22,72 @@ _RENDERERS = {
     "text/markdown": readme_renderer.markdown,
 }
 
+_RENDER_CACHE_MAX_SIZE = 32 * 1024 * 1024  # We'll cache up to 32M characters
+# Every entry is charged for its key and bookkeeping as well, so that entries
+# with little or no output (like failed renders) still count towards the limit.
+_RENDER_CACHE_ENTRY_OVERHEAD = 256
+_MISSING = object()
+
+
+class _RenderCache:
+    """
+    A bounded, in-process LRU of rendered descriptions.
+
+    Entries are keyed by a digest of everything that affects the output of
+    ``render``, so the same README uploaded for many releases (or copied across
+    projects) is only rendered once.
+    """
+
+    def __init__(
+        self,
+        max_size=_RENDER_CACHE_MAX_SIZE,
+        entry_overhead=_RENDER_CACHE_ENTRY_OVERHEAD,
+    ):
+        self.max_size = max_size
+        self.entry_overhead = entry_overhead
+        self.size = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            rendered = self._entries.get(key, _MISSING)
+            if rendered is not _MISSING:
+                self._entries.move_to_end(key)
+            return rendered
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _size(self, rendered):
+        return self.entry_overhead + len(rendered or "")
+
+    def set(self, key, rendered):
+        size = self._size(rendered)
+        if size > self.max_size:
+            return
+
+        with self._lock:
+            if (previous := self._entries.pop(key, _MISSING)) is not _MISSING:
+                self.size -= self._size(previous)
+            self._entries[key] = rendered
+            self.size += size
+            while self.size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= self._size(evicted)
 
-def render(value, content_type=None, use_fallback=True):
+
+_render_cache = _RenderCache()
+
+
+def _cache_key(value, content_type, use_fallback):
+    digest = hashlib.sha256(value.encode("utf8", "surrogatepass"))
+    return (digest.hexdigest(), content_type, use_fallback, renderer_version())
+
+
+def render(value, content_type=None, use_fallback=True, *, metrics=None):
     if value is None:
         return value
 
@@ -29,6 +98,23 @@ def render(value, content_type=None, use_fallback=True):
         msg["content-type"] = content_type
         content_type = msg.get_content_type()
 
+    # Identical descriptions are common, so check whether we've already rendered
+    # this one with the same renderer before doing it all over again.
+    key = _cache_key(value, content_type, use_fallback)
+    rendered = _render_cache.get(key)
+    if rendered is not _MISSING:
+        if metrics is not None:
+            metrics.increment("warehouse.readme.render.cache_hit")
+        return rendered
+    if metrics is not None:
+        metrics.increment("warehouse.readme.render.cache_miss")
+
+    rendered = _render(value, content_type, use_fallback)
+    _render_cache.set(key, rendered)
+    return rendered
+
+
+def _render(value, content_type, use_fallback):
     # Get the appropriate renderer
     renderer = _RENDERERS.get(content_type, readme_renderer.txt)
 
@@ -50,5 +136,6 @@ def render(value, content_type=None, use_fallback=True):
     return rendered
 
 
+@functools.cache
 def renderer_version():
     return distribution("readme-renderer").version
@@ -1,10 +1,15 @@
 # SPDX-License-Identifier: Apache-2.0
 
+import bisect
+import collections
 import contextlib
+import hashlib
+import itertools
 import tarfile
 import typing
 import zipfile
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -23,11 +28,19 @@ _SCAN_EXTENSIONS = {".py", ".pye"}
 # Max size of individual file to scan inside archive (5 MiB)
 _SCAN_MAX_FILE_SIZE = 5 * 1024 * 1024
 
-# Max total scannable content for bulk pre-scan optimization (50 MiB).
-# Archives exceeding this fall back to per-file scanning to avoid
-# holding multiple copies of all file contents in memory.
+# Max total scannable content for bulk pre-scan optimization in
+# ``scan_archive`` (50 MiB). Archives exceeding this fall back to per-file
+# scanning to avoid holding multiple copies of all file contents in memory.
 _BULK_SCAN_MAX_TOTAL = 50 * 1024 * 1024
 
+# ``check_members`` concatenates members into chunks of roughly this size
+# (8 MiB) and bulk scans each chunk. Archives with more than one chunk have
+# their chunks scanned concurrently, which works because YARA-X releases the
+# GIL while scanning. At most ``_SCAN_MAX_WORKERS`` chunks are in flight at
+# once, which bounds how much of the archive is held in memory.
+_SCAN_CHUNK_SIZE = 8 * 1024 * 1024
+_SCAN_MAX_WORKERS = 4
+
 
 @dataclass(frozen=True)
 class YaraMatch:
@@ -69,8 +82,25 @@ def compile_rules(rules_dir: Path = _RULES_DIR) -> yara_x.Rules | None:
         return None
 
 
+def rules_fingerprint(rules_dir: Path = _RULES_DIR) -> str | None:
+    """Fingerprint the YARA rule sources that ``compile_rules`` compiles.
+
+    Cached verdicts are scoped to this fingerprint, so that any change to the
+    rules invalidates them. Returns None if the rules can't be read.
+    """
+    digest = hashlib.sha256()
+    try:
+        for rule_file in sorted(rules_dir.glob("*.yar")):
+            digest.update(rule_file.name.encode() + b"\0")
+            digest.update(rule_file.read_bytes() + b"\0")
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
 # Module-level compiled rules (compiled once at import time)
 _rules = compile_rules()
+_rules_fingerprint = rules_fingerprint()
 
 
 def iter_zip_members(zfp: zipfile.ZipFile) -> typing.Iterator[tuple[str, int, bytes]]:
@@ -121,6 +151,113 @@ def _timed_scan(yx_scanner, data, *, metrics, check_type):
         return yx_scanner.scan(data)
 
 
+def _iter_chunks(
+    members: typing.Iterable[tuple[str, int, bytes]], *, archive_name: str
+) -> typing.Iterator[list[tuple[str, bytes]]]:
+    """Group scannable members into chunks of about ``_SCAN_CHUNK_SIZE`` bytes."""
+    chunk: list[tuple[str, bytes]] = []
+    chunk_size = 0
+    for name, size, data in members:
+        if size > _SCAN_MAX_FILE_SIZE:
+            logger.info(
+                "Skipping oversized file in YARA scan",
+                member=name,
+                member_size=size,
+                archive=archive_name,
+                max_size=_SCAN_MAX_FILE_SIZE,
+            )
+            continue
+
+        chunk.append((name, data))
+        chunk_size += len(data)
+        if chunk_size >= _SCAN_CHUNK_SIZE:
+            yield chunk
+            chunk, chunk_size = [], 0
+
+    if chunk:
+        yield chunk
+
+
+def _attribution_candidates(
+    chunk: list[tuple[str, bytes]], matching_rules
+) -> list[tuple[str, bytes]]:
+    """Return the members of a chunk that a bulk scan's matches fall within.
+
+    Rules that matched without any pattern matches (e.g. a condition only on
+    ``filesize``) can't be attributed by offset, so every member is returned.
+    """
+    starts = list(itertools.accumulate((len(data) for _, data in chunk), initial=0))
+    candidates = set()
+    for matched_rule in matching_rules:
+        offsets = [
+            match.offset
+            for pattern in matched_rule.patterns
+            for match in pattern.matches
+        ]
+        if not offsets:
+            return chunk
+        candidates.update(bisect.bisect_right(starts, offset) - 1 for offset in offsets)
+    return [chunk[index] for index in sorted(candidates)]
+
+
+def _scan_chunk(
+    rules: yara_x.Rules,
+    chunk: list[tuple[str, bytes]],
+    *,
+    metrics,
+    verdict_cache=None,
+) -> YaraMatch | None:
+    """Bulk scan a chunk of members, and attribute any match to a member.
+
+    If a ``verdict_cache`` is given, members whose contents are already known
+    to be clean under the current rules are skipped, and the contents of a
+    chunk which scans clean are recorded as such.
+    """
+    digests: list[str] = []
+    if verdict_cache is not None:
+        digests = [hashlib.sha256(data).hexdigest() for _, data in chunk]
+        clean = verdict_cache.get_clean(_rules_fingerprint, digests)
+        if metrics is not None and clean:
+            metrics.increment("warehouse.upload.yara.verdict_cache.hit", len(clean))
+        unscanned = [
+            (member, digest)
+            for member, digest in zip(chunk, digests, strict=True)
+            if digest not in clean
+        ]
+        if not unscanned:
+            return None
+        chunk = [member for member, _ in unscanned]
+        digests = [digest for _, digest in unscanned]
+
+    yx_scanner = yara_x.Scanner(rules)
+    bulk = b"".join(data for _, data in chunk)
+    bulk_results = _timed_scan(yx_scanner, bulk, metrics=metrics, check_type="bulk")
+    if not bulk_results.matching_rules:
+        if verdict_cache is not None:
+            verdict_cache.set_clean(_rules_fingerprint, digests)
+        return None
+
+    # Something matched — rescan only the members the matches fall within.
+    for name, data in _attribution_candidates(chunk, bulk_results.matching_rules):
+        results = _timed_scan(
+            yx_scanner,
+            data,
+            metrics=metrics,
+            check_type="per_file_attribution",
+        )
+        for matched_rule in results.matching_rules:
+            return YaraMatch(
+                rule=matched_rule.identifier,
+                member=name,
+                message=_get_rule_message(matched_rule),
+            )
+    # Bulk matched across file boundaries but no individual file
+    # triggered — a harmless false positive from concatenation.
+    if verdict_cache is not None:
+        verdict_cache.set_clean(_rules_fingerprint, digests)
+    return None
+
+
 def check_members(
     members: typing.Iterable[tuple[str, int, bytes]],
     rules: yara_x.Rules | None = None,
@@ -128,12 +265,17 @@ def check_members(
     archive_name: str = "",
     archive_type: str = "unknown",
     metrics=None,
+    verdict_cache=None,
 ) -> YaraMatch | None:
     """Scan archive members and return the first YARA match.
 
     Returns ``YaraMatch`` on the first match, ``None`` otherwise.
     Fails open: returns ``None`` on scan errors.
 
+    If ``verdict_cache`` (an ``IVerdictCache``) is provided, members whose
+    contents were previously scanned clean by the module-level rules are not
+    scanned again. It is ignored when scanning with any other rules.
+
     If ``metrics`` is provided, the whole scan (member read + YARA match) is
     timed under ``warehouse.upload.yara.scan``, tagged with ``archive_type``.
     This is the single umbrella metric for all YARA work per upload; emitting
@@ -142,6 +284,8 @@ def check_members(
     rules = rules or _rules
     if rules is None:
         return None
+    if rules is not _rules or _rules_fingerprint is None:
+        verdict_cache = None
 
     timer_cm = (
         metrics.timed(
@@ -152,94 +296,55 @@ def check_members(
         else contextlib.nullcontext()
     )
 
-    yx_scanner = yara_x.Scanner(rules)
-    materialized: list[tuple[str, int, bytes]] = []
-    total_size = 0
-    overflow = False
-
     try:
-        with timer_cm:
-            for name, size, data in members:
-                if size > _SCAN_MAX_FILE_SIZE:
-                    logger.info(
-                        "Skipping oversized file in YARA scan",
-                        member=name,
-                        member_size=size,
-                        archive=archive_name,
-                        max_size=_SCAN_MAX_FILE_SIZE,
-                    )
-                    continue
+        with timer_cm, contextlib.ExitStack() as stack:
+            chunks = _iter_chunks(members, archive_name=archive_name)
+            first, second = next(chunks, None), next(chunks, None)
+            if first is None:
+                return None
+            if second is None:
+                # The common case: everything fits in a single chunk, so scan
+                # it on this thread rather than paying for a thread pool.
+                return _scan_chunk(
+                    rules, first, metrics=metrics, verdict_cache=verdict_cache
+                )
 
-                if overflow:
-                    # Over the size cap — scan each file individually.
-                    results = _timed_scan(
-                        yx_scanner,
-                        data,
-                        metrics=metrics,
-                        check_type="per_file_overflow",
-                    )
-                    for matched_rule in results.matching_rules:
-                        return YaraMatch(
-                            rule=matched_rule.identifier,
-                            member=name,
-                            message=_get_rule_message(matched_rule),
-                        )
-                    continue
-
-                materialized.append((name, size, data))
-                total_size += len(data)
-
-                if total_size > _BULK_SCAN_MAX_TOTAL:
-                    overflow = True
-                    # Exceeded size cap — scan materialized files individually.
-                    for m_name, _, m_data in materialized:
-                        results = _timed_scan(
-                            yx_scanner,
-                            m_data,
-                            metrics=metrics,
-                            check_type="per_file_overflow",
-                        )
-                        for matched_rule in results.matching_rules:
-                            return YaraMatch(
-                                rule=matched_rule.identifier,
-                                member=m_name,
-                                message=_get_rule_message(matched_rule),
-                            )
-                    materialized.clear()
-
-            if not overflow:
-                # Under the size cap — use bulk pre-scan optimization.
-                bulk = b"".join(data for _, _, data in materialized)
-                bulk_results = _timed_scan(
-                    yx_scanner, bulk, metrics=metrics, check_type="bulk"
+            executor = stack.enter_context(
+                ThreadPoolExecutor(
+                    max_workers=_SCAN_MAX_WORKERS, thread_name_prefix="yara-scan"
                 )
-                if not bulk_results.matching_rules:
-                    return None
-                # Something matched — scan individual files for attribution.
-                for name, _size, data in materialized:
-                    results = _timed_scan(
-                        yx_scanner,
-                        data,
+            )
+            # Don't start scanning chunks queued behind a match once we return.
+            stack.callback(executor.shutdown, cancel_futures=True)
+
+            # Results are consumed in archive order, so the first match is
+            # still the first matching member, while later chunks are read
+            # from the archive and scanned in the background.
+            pending: collections.deque = collections.deque()
+            for chunk in itertools.chain([first, second], chunks):
+                pending.append(
+                    executor.submit(
+                        _scan_chunk,
+                        rules,
+                        chunk,
                         metrics=metrics,
-                        check_type="per_file_attribution",
+                        verdict_cache=verdict_cache,
                     )
-                    for matched_rule in results.matching_rules:
-                        return YaraMatch(
-                            rule=matched_rule.identifier,
-                            member=name,
-                            message=_get_rule_message(matched_rule),
-                        )
-                # Bulk matched across file boundaries but no individual file
-                # triggered — a harmless false positive from concatenation.
-                return None
+                )
+                if (
+                    len(pending) >= _SCAN_MAX_WORKERS
+                    and (match := pending.popleft().result()) is not None
+                ):
+                    return match
+            while pending:
+                if (match := pending.popleft().result()) is not None:
+                    return match
+            return None
 
     except yara_x.ScanError:
         logger.exception("YARA-X scan failed", archive=archive_name)
         return None
 
-    # Overflow path completed with no matches found.
-    return None
-
 
 def scan_archive(
     filename: str, rules: yara_x.Rules | None = None
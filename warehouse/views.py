@@ -405,21 +405,22 @@ def search(request):
     ratelimiter = request.find_service(IRateLimiter, name="search", context=None)
     metrics = request.find_service(IMetricsService, context=None)
 
-    ratelimiter.hit(request.remote_addr)
+    ratelimit = ratelimiter.hit_and_stats(request.remote_addr)
     record_rate_limit(
         request,
         "search",
         ratelimiter,
         identifiers=(request.remote_addr,),
         partition_key="ip",
+        stats=ratelimit.stats,
     )
-    if not ratelimiter.test(request.remote_addr):
+    if not ratelimit.allowed:
         metrics.increment("warehouse.search.ratelimiter.exceeded")
         message = (
             "Your search query could not be performed because there were too "
             "many requests by the client."
         )
-        _resets_in = ratelimiter.resets_in(request.remote_addr)
+        _resets_in = ratelimit.resets_in
         if _resets_in is not None:
             _resets_in = max(1, int(_resets_in.total_seconds()))
             message += f" Limit may reset in {_resets_in} seconds."